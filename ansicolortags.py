@@ -20,6 +20,13 @@ The names of the colors follow these conventions:
 
 * for the other special effects (``nocolors``, ``default``, ``Default``, ``clear``, ``el``), the effect is **immediate** (and seems to be well supported).
 
+* for the 256 colors and the true colors, the tags have parameters: ``fg:208`` or ``bg:208`` (index in the 256 colors palette),
+  ``fg:#ff8000`` or ``bg:#ff8000`` (hexadecimal), ``rgb(255,128,0)`` or ``bg:rgb(255,128,0)`` (decimal; foreground by default).
+  They are downsampled to the nearest color the terminal supports (see :py:func:`color_depth`).
+
+* every tag can also be closed, like in HTML: ``<red>red <u>and underlined</u> text</red>``. The closing tag restores the style of before the opening tag,
+  and a closing tag without an opening tag is dropped. A ``<reset>`` closes all the tags.
+
 
 List of functions
 =================
@@ -29,7 +36,17 @@ To print a string
 
 * :py:func:`sprint`: give a string,
 * :py:func:`printc`: like :py:func:`print`, but with interpreting tags to put colors. **This is the most useful function in this module !**
-* :py:func:`writec`: like printc, but using any file object (and no new line added at the end of the string).
+* :py:func:`writec`: like printc, but using any file object (and no new line added at the end of the string),
+* :py:func:`compile`: parse a string once, to render it many times (see :py:class:`ColorTemplate`),
+* :py:func:`iter_sprint`, :py:class:`ColorizingWriter`: to color a text given by chunks (e.g. a huge file, or a pipe),
+* :py:class:`ColorWriter`: like :py:func:`writec`, but buffered, with many flush policies (useful in hot loops),
+* :py:class:`LiveLine`: a status line redrawn in place, writing only what changed (useful for progress indicators),
+* :py:func:`sprint_bytes`, :py:func:`erase_bytes`: like :py:func:`sprint` and :py:func:`erase`, but for bytes (without decoding them),
+* :py:func:`sprint_file`, :py:func:`erase_file`: like :py:func:`sprint` and :py:func:`erase`, but for huge files (mapped in memory),
+* :py:func:`sprint_many`, :py:func:`erase_many`: like :py:func:`sprint` and :py:func:`erase`, but for big batches of strings,
+* :py:func:`render_parallel`, :py:func:`iter_render_parallel`: to render huge texts in parallel, with many processes,
+* :py:func:`aprintc`, :py:class:`AsyncColorWriter`: like :py:func:`printc` and :py:class:`ColorWriter`, but for :py:mod:`asyncio` programs,
+* :py:class:`SharedColorWriter`: to write from many threads to the same output, without mixing their colors.
 
 To clean the terminal or the line
 ---------------------------------
@@ -38,9 +55,26 @@ To clean the terminal or the line
 * :py:func:`clearLine`, :py:func:`clearScreen`: to clear the current line or screen,
 * :py:func:`Reset`: to return to default foreground and background, and stopping all *fancy* effects (like blinking or reverse video).
 
+To go faster
+------------
+
+* :py:func:`enable_cache`, :py:func:`disable_cache`, :py:func:`cache_info`, :py:func:`cache_clear`: to memoize :py:func:`sprint` and :py:func:`erase`.
+
+To write less
+-------------
+
+* :py:func:`optimize_escapes`: drop the useless escapes of a colored string, and merge the others,
+* :py:func:`enable_optimizer`, :py:func:`disable_optimizer`, :py:func:`optimizer_info`: to do it for all the outputs.
+
 Others functions
 ----------------
 
+* :py:func:`from_ansi`, :py:func:`strip_ansi`: convert the escapes of a colored text (e.g. from another program) back to tags, or remove them,
+* :py:func:`color_depth`: the number of colors used for the tags like ``<fg:208>`` (16, 256 or :py:data:`TRUECOLOR`), see also :py:data:`ColorDepth`,
+* :py:func:`sprint_html`, :py:func:`iter_sprint_html`: render the tags to HTML (e.g. to publish logs on the web), see also :py:func:`html_stylesheet`,
+* :py:class:`Backend`: the output backends (:py:class:`ANSIBackend`, :py:class:`PlainBackend`, :py:class:`HTMLBackend`, :py:class:`WindowsConsoleBackend`, or your own),
+  to choose how the tags are rendered for each call (e.g. ``sprint(text, backend=HTMLBackend())``) or for each writer,
+* :py:func:`export_colors`: export the table of colors for other languages (sh, zsh, fish, JSON, Python), see also :py:data:`colorTable`,
 * :py:func:`notify`: try to display a *system* notification. **Only on GNU/Linux with notify-send installed.**
 * :py:func:`xtitle`: try to set the *title* of the terminal. Warning: **not always supported**.
 
@@ -93,6 +127,10 @@ Example of use (script)
 
 * To run a test :code:`$ ansicolortags.py --test`;
 
+* To color a text with tags :code:`$ ansicolortags.py --render < in.txt > out.txt` (or :code:`$ ansicolortags.py --render in.txt`), or to erase them :code:`$ ansicolortags.py --strip in.txt`;
+
+* To render it to HTML :code:`$ ansicolortags.py --html in.txt > out.html` (with CSS classes, see :py:func:`html_stylesheet`, or with inline styles with :code:`--html-mode style`);
+
 * To produce a `GNU Bash color aliases file <https://bitbucket.org/lbesson/bin/src/master/.color.sh>`_ :code:`$ ansicolortags.py --generate --file ~/.color_aliases.sh`.
 
 
@@ -105,7 +143,12 @@ This script can normally detect if ANSI codes are supported :
   2. ``$ ansicolortags.py --help --noANSI`` : will print without any colors, even if it is possible;
   3. ``$ ansicolortags.py --help --ANSI`` : will force the use of colors, even if they seems to be not supported.
 
+The ``NO_COLOR`` and ``FORCE_COLOR`` environment variables are also honored.
+
 And, the module part behaves exactly like the script part.
+The detection is done lazily, for each output (see :py:func:`supports_ansi`): for instance :code:`writec(text, out=my_file)` can write without colors in a file,
+while :py:func:`printc` still prints with colors in the terminal.
+Set :py:data:`ANSISupported` to ``True`` or ``False`` to force or disable the ANSI codes everywhere.
 
 ------------------------------------------------------------------------------
 
@@ -139,16 +182,19 @@ from __future__ import print_function, absolute_import
 
 # %% Usual Modules
 # Should we make them hidden from the interface of the script. Idea : remove from __all__ ?
+# Only the modules needed by the renderer are imported here, to import this module as fast as possible:
+# the others (subprocess, time, argparse etc) are imported by the functions using them.
 import os
+import re
 import sys
-from subprocess import Popen
+import weakref
+from collections import deque, namedtuple, OrderedDict
+
 
 try:
-    from time import sleep
-except ImportError:
-    def sleep(f):
-        """ Replacement of time.sleep()."""
-        print("time.sleep({}) should have been used.".format(f))
+    _stringTypes = (str, unicode)  # Python 2
+except NameError:
+    _stringTypes = (str, )  # Python 3
 
 
 __author__ = 'Lilian Besson'
@@ -273,19 +319,113 @@ def _parser_default(description=_default_description,
 
 # %% Auto detection ?
 
-ANSISupported = True
-try:
-    #: If false, the module do almost NOTHING.
-    ANSISupported = 'TERM' in os.environ and os.environ['TERM'] != 'unknown'
-    if ('--noANSI' in sys.argv) or (not sys.stdout.isatty()):
-        ANSISupported = False
-    if '--ANSI' in sys.argv:
-        ANSISupported = True
-except Exception as e:
-    print("I failed badly when trying to detect if ansicolortags are supported, reason = %s" % e)
-    ANSISupported = False
-
-# print("DEBUG: ANSISupported =", ANSISupported)
+#: If ``True`` (or ``False``), the ANSI codes are used (or not) for every output, without any detection.
+#: If ``None`` (default), it is detected for each output, see :py:func:`supports_ansi`.
+ANSISupported = None
+
+#: Results of the detection, for each output (weakly referenced), as a pair ``(fileno, supported)``.
+_ANSIDetected = weakref.WeakKeyDictionary()
+
+
+def _detect_ansi(out):
+    """ _detect_ansi(out) -> bool
+
+    Detect if ANSI codes are supported by the file object ``out``, in this order:
+
+    1. ``--noANSI`` (or ``--ANSI``) in the command line disable (or force) the ANSI codes,
+    2. a non-empty ``NO_COLOR`` environment variable disables them, a ``FORCE_COLOR`` variable (not ``0``) forces them,
+    3. otherwise, they are used if the ``TERM`` environment variable is set (and not ``unknown``), and if ``out`` is a terminal.
+    """
+    try:
+        if '--noANSI' in sys.argv:
+            return False
+        if '--ANSI' in sys.argv:
+            return True
+        if os.environ.get('NO_COLOR'):
+            return False
+        if os.environ.get('FORCE_COLOR', '0') != '0':
+            return True
+        isatty = getattr(out, 'isatty', None)
+        return os.environ.get('TERM', 'unknown') != 'unknown' and isatty is not None and isatty()
+    except Exception as e:
+        print("I failed badly when trying to detect if ansicolortags are supported, reason = %s" % e)
+        return False
+
+
+def supports_ansi(out=None):
+    """ supports_ansi(out=sys.stdout) -> bool
+
+    Return :py:data:`ANSISupported` if it is ``True`` or ``False``, or detect if the file object ``out`` supports ANSI codes (see :py:func:`_detect_ansi`).
+
+    The detection is lazy: it is done the first time an output is used, and then cached for this output (and its file descriptor),
+    so many outputs can be used at the same time (e.g. a terminal and a file), and ``sys.stdout`` can be redirected after importing the module.
+    Use :py:func:`reset_ansi_detection` to forget the cached results.
+    """
+    if ANSISupported is not None:
+        return ANSISupported
+    if out is None:
+        out = sys.stdout
+    try:
+        fileno = out.fileno()
+    except Exception:
+        fileno = None
+    try:
+        detectedFileno, supported = _ANSIDetected[out]
+        if detectedFileno == fileno:
+            return supported
+    except (KeyError, TypeError):
+        pass
+    supported = _detect_ansi(out)
+    try:
+        _ANSIDetected[out] = (fileno, supported)
+    except TypeError:  # Not weakly referenceable, so not cached
+        pass
+    return supported
+
+
+def reset_ansi_detection():
+    """ reset_ansi_detection() -> unit
+
+    Forget all the results of :py:func:`supports_ansi` and :py:func:`color_depth`, for instance after changing the ``NO_COLOR`` environment variable.
+    """
+    global _detectedDepth
+    _ANSIDetected.clear()
+    _detectedDepth = None
+
+
+#: If ``16``, ``256`` or ``TRUECOLOR``, the number of colors used for the tags like ``<fg:208>`` or ``<rgb(255,128,0)>``, without any detection.
+#: If ``None`` (default), it is detected, see :py:func:`color_depth`.
+ColorDepth = None
+
+#: Number of colors of a terminal with true colors (24 bits).
+TRUECOLOR = 1 << 24
+
+#: Result of the detection of :py:func:`color_depth`.
+_detectedDepth = None
+
+
+def color_depth():
+    """ color_depth() -> int
+
+    Return :py:data:`ColorDepth` if it is set, or detect the number of colors supported by the terminal (once, from the environment):
+
+    - :py:data:`TRUECOLOR` if the ``COLORTERM`` environment variable is ``truecolor`` or ``24bit``,
+    - ``256`` if the ``TERM`` environment variable contains ``256`` (like ``xterm-256color``),
+    - ``16`` otherwise.
+
+    The tags like ``<fg:208>`` or ``<rgb(255,128,0)>`` are rendered with the nearest color available, see :py:func:`sprint`.
+    """
+    global _detectedDepth
+    if ColorDepth is not None:
+        return ColorDepth
+    if _detectedDepth is None:
+        if os.environ.get('COLORTERM', '').lower() in ('truecolor', '24bit'):
+            _detectedDepth = TRUECOLOR
+        elif '256' in os.environ.get('TERM', ''):
+            _detectedDepth = 256
+        else:
+            _detectedDepth = 16
+    return _detectedDepth
 
 # colors bold
 black = "\033[01;30m"    #: :black:`Black` and bold.
@@ -355,8 +495,65 @@ WARNING = "%s%sWARNING%s" % (reset, yellow, reset)    #: A well colored WARNING
 INFO = "%s%sINFO%s" % (reset, blue, reset)    #: A well colored INFO word, in :blue:`blue`.
 
 
-#: List of all authorized colors. The dictionary :py:data:`colorDict` is more used.
-colorList = ['black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan', 'white', 'Bblack', 'Bred', 'Bgreen', 'Byellow', 'Bblue', 'Bmagenta', 'Bcyan', 'Bwhite', 'Black', 'Red', 'Green', 'Yellow', 'Blue', 'Magenta', 'Cyan', 'White', 'blink', 'Blink', 'nocolors', 'default', 'Default', 'italic', 'Italic', 'b', 'B', 'u', 'U', 'neg', 'Neg', 'clear', 'el', 'reset', 'bell', 'title', 'warning', 'question', 'ERROR', 'WARNING', 'INFO']
+#: The registry of all the tags, as ``(name, ANSI code)`` pairs: the **only** authoritative list, all the others are built from it.
+_tagRegistry = (
+    ('black', black),
+    ('red', red),
+    ('green', green),
+    ('yellow', yellow),
+    ('blue', blue),
+    ('magenta', magenta),
+    ('cyan', cyan),
+    ('white', white),
+    ('Bblack', Bblack),
+    ('Bred', Bred),
+    ('Bgreen', Bgreen),
+    ('Byellow', Byellow),
+    ('Bblue', Bblue),
+    ('Bmagenta', Bmagenta),
+    ('Bcyan', Bcyan),
+    ('Bwhite', Bwhite),
+    ('Black', Black),
+    ('Red', Red),
+    ('Green', Green),
+    ('Yellow', Yellow),
+    ('Blue', Blue),
+    ('Magenta', Magenta),
+    ('Cyan', Cyan),
+    ('White', White),
+    ('blink', blink),
+    ('Blink', Blink),
+    ('nocolors', nocolors),
+    ('default', default),
+    ('Default', Default),
+    ('italic', italic),
+    ('Italic', Italic),
+    ('b', b),
+    ('B', B),
+    ('u', u),
+    ('U', U),
+    ('neg', neg),
+    ('Neg', Neg),
+    ('clear', clear),
+    ('el', el),
+    ('reset', reset),
+    ('bell', bell),
+    ('title', title),
+    ('warning', warning),
+    ('question', question),
+    ('ERROR', ERROR),
+    ('WARNING', WARNING),
+    ('INFO', INFO),
+)
+
+#: Frozen set of the names of all the tags. Used (with :py:data:`colorDict`) by all the functions parsing tags.
+tagNames = frozenset(name for name, _ in _tagRegistry)
+
+#: Length of the longest name of a tag.
+_maxTagNameLength = max(len(name) for name in tagNames)
+
+#: List of all authorized colors, kept for backward compatibility (:py:data:`tagNames` and :py:data:`colorDict` are more used).
+colorList = [name for name, _ in _tagRegistry]
 #: List of all simple colors.
 simpleColorList = ['black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan', 'white']
 
@@ -365,68 +562,154 @@ simpleColorList = ['black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan',
 #     exec('_%s = %s' % (name, name))  # Bad to use exec !
 #     # exec('colorDict["%s"] = %s' % (name, name))
 
+class _ColorDict(dict):
+    """ A :py:class:`dict` counting its own modifications (in ``version``), so the cache of :py:func:`sprint` can notice them."""
+
+    version = 0
+
+    def __setitem__(self, key, value):
+        self.version += 1
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self.version += 1
+        dict.__delitem__(self, key)
+
+    def clear(self):
+        self.version += 1
+        dict.clear(self)
+
+    def pop(self, *args):
+        self.version += 1
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self.version += 1
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        self.version += 1
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        self.version += 1
+        dict.update(self, *args, **kwargs)
+
+
 # FIXED I could avoid this exec by building the colorDict manually
 #: The key element of my script... A dictionary mapping color names to ANSI color code. Used in :py:func:`tocolor`.
-colorDict = {
-    'black': black,
-    'red': red,
-    'green': green,
-    'yellow': yellow,
-    'blue': blue,
-    'magenta': magenta,
-    'cyan': cyan,
-    'white': white,
-    'Bblack': Bblack,
-    'Bred': Bred,
-    'Bgreen': Bgreen,
-    'Byellow': Byellow,
-    'Bblue': Bblue,
-    'Bmagenta': Bmagenta,
-    'Bcyan': Bcyan,
-    'Bwhite': Bwhite,
-    'Black': Black,
-    'Red': Red,
-    'Green': Green,
-    'Yellow': Yellow,
-    'Blue': Blue,
-    'Magenta': Magenta,
-    'Cyan': Cyan,
-    'White': White,
-    'blink': blink,
-    'Blink': Blink,
-    'nocolors': nocolors,
-    'default': default,
-    'Default': Default,
-    'italic': italic,
-    'Italic': Italic,
-    'b': b,
-    'B': B,
-    'u': u,
-    'U': U,
-    'neg': neg,
-    'Neg': Neg,
-    'clear': clear,
-    'el': el,
-    'reset': reset,
-    'bell': bell,
-    'title': title,
-    'warning': warning,
-    'question': question,
-    'ERROR': ERROR,
-    'WARNING': WARNING,
-    'INFO': INFO
-}
-
-
-# Turn off color tags interpretation if they are not supported
-if not ANSISupported:
-    # for name in colorList:
-    #     exec('%s = \"\"' % name)  # Bad to use exec !
-    # print("DEBUG: removing colors!")
-    for key in colorDict:
-        colorDict[key] = ''
-
-# print("DEBUG: colorDict =", colorDict)
+colorDict = _ColorDict(_tagRegistry)
+
+try:
+    from types import MappingProxyType
+except ImportError:  # Python 2
+    MappingProxyType = dict
+
+#: The frozen table of the default escapes, mapping the names of the tags to their ANSI codes: read-only (on Python 3), and never changed by the detection of the outputs.
+colorTable = MappingProxyType(dict(_tagRegistry))
+
+
+# %% 256 colors and true colors
+
+#: A number from 0 to 255 (maybe with leading zeros, like ``008``), in the tags with parameters.
+_byteNumber = '(?:[01]?[0-9]{1,2}|2[0-4][0-9]|25[0-5])'
+
+#: The tags with parameters (in :py:func:`_tag_pattern`): ``fg:N`` and ``bg:N`` (N from 0 to 255), ``fg:#rrggbb`` and ``bg:#rrggbb``, ``rgb(r,g,b)``, ``fg:rgb(r,g,b)`` and ``bg:rgb(r,g,b)``.
+#: The ones out of range (like ``fg:256`` or ``rgb(300,0,0)``) are not tags, and are kept unmodified.
+_parametricTags = '(?:fg|bg):(?:{0}|#[0-9a-fA-F]{{6}})|(?:fg:|bg:)?rgb\\({0}, ?{0}, ?{0}\\)'.format(_byteNumber)
+_parametricPattern = re.compile('(?:(fg|bg):)?(?:({0})|#([0-9a-fA-F]{{6}})|rgb\\(({0}), ?({0}), ?({0})\\))$'.format(_byteNumber))
+
+# The longest tag with parameters is 'bg:rgb(255, 255, 255)', and a closing tag adds a '/'
+_maxTagNameLength = max(_maxTagNameLength, len('bg:rgb(255, 255, 255)')) + len('/')
+
+#: The RGB values of the 16 basic colors (like xterm), then of the 6x6x6 cube and of the 24 grays of the 256 colors.
+_palette256 = (
+    [(0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0), (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+     (127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0), (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255)]
+    + [(red, green, blue) for red in (0, 95, 135, 175, 215, 255) for green in (0, 95, 135, 175, 215, 255) for blue in (0, 95, 135, 175, 215, 255)]
+    + [(8 + 10 * gray, ) * 3 for gray in range(24)]
+)
+
+#: The tables, built at the first use by :py:func:`_color_tables`.
+_colorTables = None
+
+
+def _color_tables():
+    """ _color_tables() -> (fg256, bg256, fg16, bg16, to16, cube, gray)
+
+    The precomputed tables (built once): the 256 escapes of the foreground and of the background colors, the same for the 16 basic colors,
+    the nearest basic color of each of the 256 colors, and for each value from 0 to 255, the nearest level of the cube and the nearest gray.
+    """
+    global _colorTables
+    if _colorTables is None:
+        fg256 = tuple('\033[38;5;%dm' % index for index in range(256))
+        bg256 = tuple('\033[48;5;%dm' % index for index in range(256))
+        fg16 = tuple('\033[%dm' % (30 + index if index < 8 else 82 + index) for index in range(16))
+        bg16 = tuple('\033[%dm' % (40 + index if index < 8 else 92 + index) for index in range(16))
+
+        def nearest(rgb, candidates):
+            return min(candidates, key=lambda index: sum((a - b) ** 2 for a, b in zip(rgb, _palette256[index])))
+        to16 = tuple(index if index < 16 else nearest(_palette256[index], range(16)) for index in range(256))
+        levels = (0, 95, 135, 175, 215, 255)
+        cube = tuple(min(range(6), key=lambda level: abs(levels[level] - value)) for value in range(256))
+        gray = tuple(min(range(24), key=lambda level: abs(8 + 10 * level - value)) for value in range(256))
+        _colorTables = (fg256, bg256, fg16, bg16, to16, cube, gray)
+    return _colorTables
+
+
+def _nearest256(red, green, blue):
+    """ _nearest256(red, green, blue) -> int
+
+    Index of the nearest color of the 256 colors: the nearest color of the cube or the nearest gray (found with the tables of :py:func:`_color_tables`).
+    """
+    cube, gray = _color_tables()[5:]
+    inCube = 16 + 36 * cube[red] + 6 * cube[green] + cube[blue]
+    inGray = 232 + gray[(red + green + blue) // 3]
+    distance = lambda index: sum((a - b) ** 2 for a, b in zip((red, green, blue), _palette256[index]))  # noqa: E731
+    return inCube if distance(inCube) <= distance(inGray) else inGray
+
+
+#: Cache of the escapes of the tags with parameters, for each color depth.
+_parametricEscapes = {}
+
+
+def _parametric_escape(name, depth=None):
+    """ _parametric_escape(name, depth=None) -> string
+
+    The escape of the tag with parameters ``name`` (like ``'fg:208'`` or ``'rgb(255,128,0)'``), for the color ``depth`` (default is the one of the terminal, see :py:func:`color_depth`),
+    or ``''`` for an unknown name. The escapes are cached.
+    """
+    if depth is None:
+        depth = color_depth()
+    key = (name, depth)
+    try:
+        return _parametricEscapes[key]
+    except KeyError:
+        pass
+    match = _parametricPattern.match(name)
+    escape = ''
+    if match is not None:
+        layer, index, hexadecimal = match.group(1, 2, 3)
+        fg256, bg256, fg16, bg16, to16 = _color_tables()[:5]
+        if hexadecimal:
+            rgb = (int(hexadecimal[0:2], 16), int(hexadecimal[2:4], 16), int(hexadecimal[4:6], 16))
+        elif index is None:
+            rgb = tuple(int(value) for value in match.group(4, 5, 6))
+        else:
+            rgb, index = None, int(index)
+        if rgb is not None and depth >= TRUECOLOR:
+            escape = '\033[%d;2;%d;%d;%dm' % (((48 if layer == 'bg' else 38), ) + rgb)
+        else:
+            if rgb is not None:
+                index = _nearest256(*rgb)
+            if depth >= 256:
+                escape = (bg256 if layer == 'bg' else fg256)[index]
+            else:
+                escape = (bg16 if layer == 'bg' else fg16)[to16[index]]
+    if len(_parametricEscapes) >= 4096:
+        _parametricEscapes.clear()
+    _parametricEscapes[key] = escape
+    return escape
 
 
 def tocolor(mystring):
@@ -447,8 +730,32 @@ def tocolor(mystring):
     return res
 
 
-def sprint(chainWithTags, left='<', right='>', verbose=False):
-    """ sprint(chainWithTags, left='<', right='>', verbose=False) -> string
+#: Cache of the compiled tag scanners, one for each pair of delimiters ``(left, right)``.
+_tagPatterns = {}
+
+
+def _tag_pattern(left='<', right='>'):
+    """ _tag_pattern(left='<', right='>') -> compiled regular expression
+
+    Return the (cached) regular expression matching any tag of :py:data:`tagNames`, or any tag with parameters (like ``fg:208``), or any closing tag (like ``/red``), delimited by ``left`` and ``right``.
+    Its only group captures the name of the tag (starting with ``/`` for a closing tag), so ``_tag_pattern().split(chainWithTags)`` alternates plain text (even indexes) and names of tags (odd indexes).
+
+    The input is then scanned **only once**, in linear time, by the :py:mod:`re` engine.
+    """
+    try:
+        return _tagPatterns[(left, right)]
+    except KeyError:
+        if not left or not right:
+            raise ValueError("empty separator")
+        # Longest names first, so a name is never shadowed by one of its prefixes
+        names = '|'.join(re.escape(name) for name in sorted(tagNames, key=lambda name: (-len(name), name)))
+        pattern = re.compile('%s(/?(?:%s|%s))%s' % (re.escape(left), names, _parametricTags, re.escape(right)))
+        _tagPatterns[(left, right)] = pattern
+        return pattern
+
+
+def sprint(chainWithTags, left='<', right='>', verbose=False, backend=None):
+    """ sprint(chainWithTags, left='<', right='>', verbose=False, backend=None) -> string
 
     Parse a string containing color tags, when color is one of the previous define name,
     and then return it, with color tags changed to concrete ANSI color codes.
@@ -461,7 +768,7 @@ def sprint(chainWithTags, left='<', right='>', verbose=False):
     .. warning::
 
        It is more prudent to put nothing else than ANSI Colors (i.e. values in :py:data:`colorList`) between ``'<'`` and ``'>'`` in ``chainWithTags``.
-       The behavior of the function in case of false tags **is not perfect**.
+       False tags, and lonely ``'<'`` or ``'>'``, are kept unmodified, but they can be confusing to read.
        Moreover, a good idea could be to try not to use '<' or '>' for anything else than tags.
        I know, it's not perfect.
        But, the syntax of color tags is so simple and so beautiful with this limitation that you will surely forgive me this, *won't you* ;) ?
@@ -473,34 +780,31 @@ def sprint(chainWithTags, left='<', right='>', verbose=False):
         This is blue. And <this> is white. Now this is red because I am <angry> !
 
 
+    The 256 colors and the true colors are also tags, with parameters (downsampled if the terminal supports less colors, see :py:func:`color_depth`): ::
+
+        >>> print(sprint("<fg:208>Orange<reset>, <bg:#005f87>on blue<reset>, <rgb(255, 0, 128)>pink<reset>."))
+        Orange, on blue, pink.
+
+    The tags can be closed, like in HTML, and then the style of before the opening tag is restored, with only the codes needed
+    (the string is supposed to start with the default style, and a tag not closed is closed by the closing of a tag opened before it): ::
+
+        >>> print(sprint("<blue>Blue, <u>underlined</u>, <red>red</red>, blue again</blue>, and default."))
+        Blue, underlined, red, blue again, and default.
+
+    Each string is rendered on its own: a tag opened in a string can not be closed in another one.
+    But the chunks of a text given by pieces (to :py:func:`iter_sprint`, :py:class:`ColorizingWriter`, :py:func:`render_parallel`, :py:func:`sprint_file` etc) are one text,
+    and a tag opened in a chunk can be closed in a later one.
+
     This function is used in all the following, so all other function can also use ``left`` and ``right`` arguments.
+
+    .. note:: The tags are erased (like with :py:func:`erase`) if the standard output does not support ANSI codes, see :py:func:`supports_ansi`.
+
+    With a ``backend`` (see :py:class:`Backend`), the tags are rendered by it instead, e.g. to HTML with :py:class:`HTMLBackend`, whatever the standard output supports.
     """
-    # TODO improve efficiency of this core algorithm?
-    ls = chainWithTags.split(left)
-    if verbose:
-        print("\tls =", ls)
-    lls = list()
-    for s2 in ls:
-        if verbose:
-            print("\ts2 =", s2)
-        inte = s2.split(right)
-        if verbose:
-            print("\tinte =", inte)
-        if inte[0] in colorList:
-            inte[0] = tocolor(inte[0])
-        else:
-            if len(inte) > 1:
-                inte[0] = left + inte[0] + right
-        if verbose:
-            print("\tinte =", inte)
-        lls.append(inte)
     if verbose:
-        print("\tlls =", lls)
-    res = ""
-    for _, llsii in enumerate(lls):
-        for _, llsiij in enumerate(llsii):
-            res += llsiij
-    return res
+        print("\tpattern =", _tag_pattern(left, right).pattern)
+        print("\tparts =", _tag_pattern(left, right).split(chainWithTags))
+    return _render(chainWithTags, left, right, _colors() if backend is None else _substitution_of(backend))
 
 
 def erase(chainWithTags, left='<', right='>', verbose=False):
@@ -516,244 +820,2799 @@ def erase(chainWithTags, left='<', right='>', verbose=False):
 
     This example seems exactly the same that the previous one in the documentation, but it's not (it is impossible to put color in the output of a Python example in Sphinx documentation, so there is **no color in output** in the examples... but be sure there is the real output !).
 
-    .. warning:: This function can mess up a string which has unmatched opening and closing tags (``<`` without a ``>`` or ``>`` without a ``<``), use it carefully.
+    .. note:: Unmatched opening and closing delimiters (``<`` without a ``>`` or ``>`` without a ``<``) are kept unmodified.
     """
-    ls = chainWithTags.split(left)
-    if verbose:
-        print("\tls =", ls)
-    lls = list()
-    for s2 in ls:
-        if verbose:
-            print("\ts2 =", s2)
-        inte = s2.split(right)
-        if verbose:
-            print("\tinte =", inte)
-        if inte[0] in colorList:
-            inte[0] = ''  #: Here the 'erasure' is made.
-        else:
-            if len(inte) > 1:
-                inte[0] = left + inte[0] + right
-        if verbose:
-            print("\tinte =", inte)
-        lls.append(inte)
     if verbose:
-        print("\tlls =", lls)
-    res = ""
-    for _, llsii in enumerate(lls):
-        for _, llsiij in enumerate(llsii):
-            res += llsiij
-    return res
+        print("\tpattern =", _tag_pattern(left, right).pattern)
+    return _render(chainWithTags, left, right, _eraseDict)
 
 
-# FIXED how to add this *objects in Python 2 ?
-# def printc(chainWithTags, *objects, left='<', right='>', sep=' ', end='\n', erase=False, **kwargs):
-# I removed the keywords arguments
-#          left='<', right='>', sep=' ', end='\n', erase=False,
-# and define them manually by poping keys from kwargs...
-# Cf. https://www.python.org/dev/peps/pep-3102/
-# https://docs.python.org/3/tutorial/controlflow.html#arbitrary-argument-lists
+# %% Render engine
 
-def printc(chainWithTags, *objects, **kwargs):
-    """ printc(chainWithTags, *objects, left='<', right='>', sep=' ', end='\\n', erase=False, **kwargs) -> unit
+#: Substitution used to erase all the tags (see :py:func:`erase`).
+_eraseDict = dict.fromkeys(tagNames, '')
 
-    Basically a shortcut to ``print(sprint(chainWithTags))`` : it analyzes all tags (i.e., it converts the tags like ``<red>`` to their ANSI code value, like :py:data:`red`), and then it prints the result.
 
-    Example (in a terminal the colors, and the bold and underlining effects would be there):
+def _colors(out=None):
+    """ _colors(out=sys.stdout) -> mapping
 
-    >>> printc("<reset><white>« <u>Fifty shades of <red>red<white><U> » could be a <green>good<white> book, <b>if it existed<B>.<reset>")
-    « Fifty shades of red » could be a good book, if it existed.
+    The substitution to use to write to ``out``: :py:data:`colorDict` if it supports ANSI codes (see :py:func:`supports_ansi`), ``_eraseDict`` otherwise.
+    """
+    return colorDict if supports_ansi(out) else _eraseDict
 
 
-    It accepts one or more "things" to print, exactly like :py:func:`print`: for each value ``arg_i`` in ``*objects``:
+def _tag_values(parts, substitution, parametric=True, style=None):
+    """ _tag_values(parts, substitution, parametric=True, style=None) -> list of strings
 
-     - if ``arg_i`` is a string, it is converted using ``sprint(arg_i, left=left, right=right)`` (:py:func:`sprint`), and then passed to :py:func:`print`.
-     - otherwise ``arg_i`` is passed to :py:func:`print` without modification (in the same order, of course).
+    The values in ``substitution`` of the names of the tags of ``parts`` (a string split by :py:func:`_tag_pattern`).
+    The tags with parameters (like ``fg:208``) are rendered by :py:func:`_parametric_escape` if ``parametric``, and erased otherwise,
+    and the closing tags (like ``/red``) by :py:func:`_close_tags`, from the :py:class:`_StyleStack` ``style`` if it is given
+    (for a text rendered by pieces, the style is then followed from one piece to the next), or from the default style.
+    """
+    # Even indexes are plain text, odd indexes are names of known tags
+    values = [substitution.get(name) for name in parts[1::2]]
+    if None in values:
+        names = parts[1::2]
+        values = [value if value is not None else _parametric_escape(name) if parametric else ''
+                  for name, value in zip(names, values)]
+        if any(name[:1] == '/' for name in names):
+            return _close_tags(names, values, parts[::2] if style is None else None, style)
+    if style is not None and values:
+        style.follow(parts[1::2], values)
+    return values
+
+
+def _join(parts, substitution, style=None, parametric=None):
+    """ _join(parts, substitution, style=None, parametric=None) -> string
+
+    Join the ``parts`` of a string split by :py:func:`_tag_pattern` (the list is modified), replacing the names of the tags by their value in ``substitution``
+    (see :py:func:`_tag_values`, the tags with parameters are rendered if ``parametric``, by default only if ``substitution`` is :py:data:`colorDict`).
+    """
+    parts[1::2] = _tag_values(parts, substitution, substitution is colorDict if parametric is None else parametric, style)
+    return ''.join(parts)
 
-    Example with more than one object:
 
-    >>> print("OK n =", 17, "and z =", 1 + 5j, ".")
-    OK n = 17 and z = (1+5j) .
-    >>> printc("<reset><green>OK<white> n =<magenta>", 17, "<white>and z =<blue>", 1 + 5j, "<reset>.")  # in a terminal, the output will have colors:
-    OK n = 17 and z = (1+5j) .
+def _substitute(chainWithTags, left='<', right='>', substitution=None, style=None, parametric=None):
+    """ _substitute(chainWithTags, left='<', right='>', substitution=None, style=None, parametric=None) -> string
 
+    Core of :py:func:`_render`, without the cache. The ``substitution`` is a mapping, or a :py:class:`Backend` without a substitution.
+    A piece of a longer text is rendered from the :py:class:`_StyleStack` ``style`` left by the previous pieces (see :py:func:`_tag_values`).
+    """
+    if substitution is None:
+        substitution = colorDict
+    pattern = _tag_pattern(left, right)
+    if substitution is _eraseDict:
+        return pattern.sub('', chainWithTags)  #: Here the 'erasure' is made.
+    if substitution is not colorDict and isinstance(substitution, Backend):
+        return substitution.render(chainWithTags, left, right)
+    if _optimizer is not None:
+        return _optimizer(_join(pattern.split(chainWithTags), substitution, style, parametric))
+    return _join(pattern.split(chainWithTags), substitution, style, parametric)
 
-    This is the more useful function in this package.
 
-    - If ``erase = True``, then :py:func:`erase` is used instead of :py:func:`sprint`
+def _render(chainWithTags, left='<', right='>', substitution=None):
+    """ _render(chainWithTags, left='<', right='>', substitution=None) -> string
 
-    .. hint::
+    The render engine used by all the functions of the module (:py:func:`sprint`, :py:func:`erase`, :py:func:`printc`, :py:func:`writec` etc),
+    replacing every tag by its value in the mapping ``substitution``:
 
-       I suggest to use `ansicolortags.py <https://pypi.python.org/pypi/ansicolortags>`_ in your own project with the following piece of code:
+    - :py:data:`colorDict` (default) to use ANSI codes, like :py:func:`sprint`,
+    - ``_eraseDict`` to erase the tags, like :py:func:`erase`,
+    - or any custom mapping (tags not in it are erased).
 
-       .. code:: python
+    The cache (see :py:func:`enable_cache`) is only used with the two first ones, and with the one of :py:class:`ANSIBackend` (with :py:data:`colorDict`).
+    """
+    if substitution is None:
+        substitution = colorDict
+    if _cache is not None and (substitution is colorDict or substitution is _eraseDict or substitution is _trueColorDict):
+        return _cache.lookup(chainWithTags, left, right, substitution)
+    return _substitute(chainWithTags, left, right, substitution)
 
-           try:
-               from ansicolortags import printc
-           except ImportError:
-               print("WARNING: ansicolortags was not found, disabling colors instead.\\nPlease install it with 'pip install ansicolortags'")
-               def printc(*a, **kwargs):
-                   print(*a, **kwargs)
 
+# %% Memoization of sprint() and erase()
 
-    .. hint::
+#: Statistics of the cache, as returned by :py:func:`cache_info`.
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize', 'maxbytes', 'nbytes'])
 
-       During the last 4 years, `a lot of the small Python scripts I wrote <https://bitbucket.org/lbesson/bin/src/master/>`_ try to use this module to add some colors:
-       for example, `FreeSMS.py <https://bitbucket.org/lbesson/bin/src/master/FreeSMS.py>`_,
-       `plotnotes.py <https://bitbucket.org/lbesson/bin/src/master/plotnotes.py>`_,
-       `strapdown2html.py <https://bitbucket.org/lbesson/bin/src/master/strapdown2html.py>`_,
-       `calc_interets.py <https://bitbucket.org/lbesson/bin/src/master/calc_interets.py>`_...
+
+class _LRUCache(object):
+    """ Bounded cache of the results of :py:func:`sprint` and :py:func:`erase`, evicting the least recently used entries first.
+
+    It is bounded by a number of entries (``maxsize``) and by a total length of keys and values (``maxbytes``, in characters).
+    All the entries are dropped as soon as :py:data:`colorDict`, :py:data:`ANSISupported` or the color depth (:py:data:`ColorDepth`, or the detected one, see :py:func:`color_depth`) is changed,
+    or the optimizer is enabled or disabled.
+
+    It can be used by many threads (like the ones of :py:class:`SharedColorWriter`): the entries are only read and changed with a lock,
+    but the strings are rendered without it.
     """
-    left = kwargs.pop('left') if 'left' in kwargs else '<'
-    right = kwargs.pop('right') if 'right' in kwargs else '>'
-    sep = kwargs.pop('sep') if 'sep' in kwargs else ' '
-    end = kwargs.pop('end') if 'end' in kwargs else '\n'
-    doerase = kwargs.pop('erase') if 'erase' in kwargs else False
-    # # DEBUG
-    # print("chainWithTags:")
-    # print(chainWithTags)
-    # print("objects:")
-    # print(objects)
-    # print("kwargs:")
-    # print(kwargs)
-    # print("left:", left)
-    # print("right:", right)
-    # print("sep:", sep)
-    # print("end:", end)
-    # print("doerase:", doerase)
-    # DONE for argument handling
-    if len(objects) == 0:
-        print(sprint(chainWithTags, left=left, right=right), sep=sep, end=end, **kwargs)
-    else:
-        fullargs = (chainWithTags,) + objects
-        # DEBUG
-        # print("fullargs:")
-        # print(fullargs)
-        if doerase:  # XXX cannot be called erase, it is already the function
-            print(*(erase(s, left=left, right=right) if isinstance(s, str) else s for s in fullargs), sep=sep, end=end, **kwargs)
-        else:
-            print(*(sprint(s, left=left, right=right) if isinstance(s, str) else s for s in fullargs), sep=sep, end=end, **kwargs)
 
+    def __init__(self, maxsize=1024, maxbytes=1 << 20):
+        import threading
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = self.misses = 0
+        self.clear()
+
+    def clear(self):
+        """ Drop all the entries (but keep the statistics)."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        """ Drop all the entries, with the lock held."""
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._state = None
+
+    def info(self):
+        """ Statistics of the cache, as a :py:data:`CacheInfo`."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries), self.maxbytes, self._nbytes)
+
+    def lookup(self, chainWithTags, left, right, substitution):
+        """ Return the cached value of ``_substitute(chainWithTags, left, right, substitution)``, or compute and store it."""
+        state = (id(colorDict), getattr(colorDict, 'version', None), ANSISupported, _optimizer is not None, color_depth())
+        key = (chainWithTags, left, right, 'erase' if substitution is _eraseDict else 'ansi' if substitution is _trueColorDict else 'sprint')
+        with self._lock:
+            if state != self._state:
+                self._clear()
+                self._state = state
+            entries = self._entries
+            try:
+                # Move the entry to the end, i.e. the most recently used
+                value = entries.pop(key)
+                entries[key] = value
+                self.hits += 1
+                return value
+            except KeyError:
+                self.misses += 1
+        value = _substitute(chainWithTags, left, right, substitution)
+        size = len(chainWithTags) + len(value)
+        if size <= self.maxbytes:
+            with self._lock:
+                if state != self._state:
+                    # Rendered with an older state, or the cache was cleared meanwhile
+                    return value
+                entries = self._entries
+                if key in entries:
+                    # Stored by another thread meanwhile
+                    return value
+                entries[key] = value
+                self._nbytes += size
+                while len(entries) > self.maxsize or self._nbytes > self.maxbytes:
+                    (oldChain, _, _, _), oldValue = entries.popitem(last=False)
+                    self._nbytes -= len(oldChain) + len(oldValue)
+        return value
+
+
+#: The cache used by :py:func:`sprint` and :py:func:`erase`, ``None`` if disabled (default). See :py:func:`enable_cache`.
+_cache = None
+
+
+def enable_cache(maxsize=1024, maxbytes=1 << 20):
+    """ enable_cache(maxsize=1024, maxbytes=1 << 20) -> unit
+
+    Enable the memoization of :py:func:`sprint` and :py:func:`erase` (and so of :py:func:`printc` and :py:func:`writec`),
+    useful when the same strings are colored again and again (status banners, progress prefixes etc).
+
+    - At most ``maxsize`` results are kept, and at most ``maxbytes`` characters (for the inputs and results together),
+    - The least recently used results are evicted first,
+    - The cache is emptied automatically when :py:data:`colorDict` or :py:data:`ANSISupported` is changed.
+
+    Calling it again replaces the current cache by an empty one.
+    """
+    global _cache
+    _cache = _LRUCache(maxsize=maxsize, maxbytes=maxbytes)
 
-def writec(chainWithTags="", out=sys.stdout, left='<', right='>', flush=True):
-    """ writec(chainWithTags="", out=sys.stdout, left='<', right='>', flush=True) -> unit
 
-    Useful to print colored text **to a file**, represented by the object ``out``.
-    Also useful to print colored text, but without any trailing '\\n' character.
+def disable_cache():
+    """ disable_cache() -> unit
 
-    In this example, before the long computation begin, it prints 'Computing 2**(2**(2**4)).....',
-    and when the computation is done, erases the current line (with ``<el>`` tag, :py:data:`el`),
-    and prints ' Done !' in green, and the result of the computation: ::
+    Disable (and drop) the cache enabled by :py:func:`enable_cache`.
+    """
+    global _cache
+    _cache = None
 
-         >>> writec("<red>Computing<reset> 2**(2**(2**4))....."); tmp = 2**(2**(2**4)); writec("<el><green>Done !<reset>")
-         Done !
 
+def cache_info():
+    """ cache_info() -> :py:data:`CacheInfo` or None
 
-    This example show how to use this module to write colored data in a file.
-    Be aware that this file now contains ANSI escape sequences.
-    For example, :code:`$ cat /tmp/colored-text.txt` will well print the colors, but editing the file will show *hard values* of escape code: ::
+    Statistics of the cache (``hits``, ``misses``, ``maxsize``, ``currsize``, ``maxbytes``, ``nbytes``), or ``None`` if it is disabled.
+    """
+    if _cache is None:
+        return None
+    return _cache.info()
 
-        >>> my_file = open('/tmp/colored-text.txt', mode = 'w')  # Open an random file.
-        >>> write("<reset><blue>this is blue.<white>And <this> is white.<red>Now this is red because I am <angry> !<green><reset>", file = my_file)
-        >>> # Now this file '/tmp/colored-text.txt' has some ANSI colored text in it.
 
-    Remark:
-    It can also be used to simply reinitialize the ANSI colors buffer, but the function :py:func:`Reset` is here for this: ::
+def cache_clear():
+    """ cache_clear() -> unit
 
-        >>> writec("<reset>")
+    Empty the cache (if enabled), and reset its statistics.
+    """
+    if _cache is not None:
+        with _cache._lock:
+            _cache._clear()
+            _cache.hits = _cache.misses = 0
 
 
-    .. warning::
+# %% Optimization of the escapes
 
-       The file ``out`` **will be flushed** by this function if ``flush`` is set to ``True`` (this is default behavior).
-       If you prefer no to, use ``flush=False`` option: ::
+#: Statistics of the optimizer, as returned by :py:func:`optimizer_info` (lengths in characters, i.e. in bytes, as the escapes are ASCII).
+OptimizerInfo = namedtuple('OptimizerInfo', ['calls', 'before', 'after', 'saved'])
 
-           >>> writec(chainWithTags_1, out=my_file, flush=False)
-           >>> # many things...
-           >>> writec(chainWithTags_n, out=my_file, flush=False)
-           >>> my_file.flush()  # only flush here!
-"""
-    out.write(sprint(chainWithTags, left=left, right=right))
-    if flush:
-        out.flush()
+#: The attributes of the SGR state, and the codes of their default values.
+_sgrDefaults = (('bold', '22'), ('faint', '22'), ('italic', '23'), ('underline', '24'), ('blink', '25'), ('negative', '27'), ('foreground', '39'), ('background', '49'))
 
+#: For each SGR code, the index of the attribute it changes in the state (``22`` changes both bold and faint, see :py:func:`_sgr_apply`).
+_sgrAttributes = dict(
+    [(1, 0), (2, 1)] + [(code, 2) for code in (3, 23)] + [(code, 3) for code in (4, 24)]
+    + [(code, 4) for code in (5, 6, 25)] + [(code, 5) for code in (7, 27)]
+    + [(code, 6) for code in list(range(30, 38)) + [39] + list(range(90, 98))]
+    + [(code, 7) for code in list(range(40, 48)) + [49] + list(range(100, 108))]
+)
 
-def clearScreen():
-    """ clearScreen() -> unit
+#: A sequence of consecutive SGR escapes (``\\033[...m``), or a NUL character (separating independent strings, see :py:func:`_render_many`).
+_sgrPattern = re.compile('(?:\033\\[[0-9;]*m)+|\0')
+_sgrSplit = re.compile('\033\\[([0-9;]*)m')
 
-    **Try to** clear the screen using ANSI code :py:data:`clear`.
+
+def _sgr_apply(state, parameters):
+    """ _sgr_apply(state, parameters) -> bool
+
+    Change the list ``state`` according to the codes in the string ``parameters`` (e.g. ``'01;31'``), and return ``True``,
+    or return ``False`` if one code is unknown (e.g. ``8`` to conceal the text), as its effect on the state can not be known.
+
+    The state has one value (a code, or ``None`` if unknown) for each attribute of :py:data:`_sgrDefaults`,
+    then ``True`` if the other attributes (the unknown codes) are known to be reset, ``None`` otherwise.
     """
-    writec("<clear>")
+    codes = parameters.split(';')
+    index = 0
+    while index < len(codes):
+        code = int(codes[index] or 0)
+        if code == 0:
+            state[:] = [default for _, default in _sgrDefaults] + [True]
+        elif code in _sgrAttributes:
+            state[_sgrAttributes[code]] = str(code)
+        elif code == 22:
+            # Bold and faint are independent, but only one code resets both
+            state[0] = state[1] = '22'
+        elif code in (38, 48):
+            # Extended colors: 38;5;n or 38;2;r;g;b
+            length = {'5': 3, '2': 5}.get(codes[index + 1] if index + 1 < len(codes) else None)
+            if length is None or index + length > len(codes):
+                return False
+            state[6 if code == 38 else 7] = ';'.join(codes[index:index + length])
+            index += length - 1
+        else:
+            return False
+        index += 1
+    return True
 
 
-def clearLine():
-    """ clearLine() -> unit
+def _sgr_codes(before, after):
+    """ _sgr_codes(before, after) -> list of strings
 
-    **Try to** clear the current line using ANSI code :py:data:`el`.
+    The shortest list of codes changing the state ``before`` into ``after``: only the changed attributes, or a reset followed by the attributes which are not the default ones.
+    A reset is needed if the other attributes were reset, but were not known to be, and possible only if all the attributes are known after.
+    As ``22`` resets both bold and faint, the one still set after it is set again.
     """
-    writec("<el>")
+    if any(value == '22' and old != '22' for value, old in zip(after[:2], before[:2])):
+        changes = ['22'] + [value for value in after[:2] if value not in (None, '22')]
+    else:
+        changes = [value for value, old in zip(after[:2], before[:2]) if value is not None and value != old]
+    changes += [value for value, old in zip(after[2:-1], before[2:]) if value is not None and value != old]
+    if after[-1] and None not in after:
+        fromReset = ['0'] + [value for value, (_, default) in zip(after, _sgrDefaults) if value != default]
+        if not before[-1] or len(';'.join(fromReset)) < len(';'.join(changes)):
+            return fromReset
+    return changes
 
 
-def Reset():
-    """ Reset() -> unit
+class _SGROptimizer(object):
+    """ Optimizer of the SGR escapes (colors and effects) in a rendered string, see :py:func:`optimize_escapes`.
 
-    **Try to** reset the current ANSI codes buffer, using :py:data:`reset`.
+    It keeps the number of strings optimized, and their lengths before and after, for :py:func:`optimizer_info`,
+    and the optimized sequences of escapes (for each state before them), as the same ones come again and again.
     """
-    writec("<reset>")
 
+    #: At most that many optimized sequences are kept.
+    maxsize = 4096
+
+    def __init__(self):
+        self.calls = self.before = self.after = 0
+        self._memo = {}
+
+    def info(self):
+        """ Statistics of the optimizer, as an :py:data:`OptimizerInfo`."""
+        return OptimizerInfo(self.calls, self.before, self.after, self.before - self.after)
+
+    def __call__(self, text):
+        """ Return ``text`` with its SGR escapes optimized."""
+        # Nothing is known about the state of the terminal when the string starts
+        unknown = (None, ) * (len(_sgrDefaults) + 1)
+        state = [unknown]
+        memo = self._memo
+
+        def optimize(match):
+            run = match.group(0)
+            if run == '\0':
+                state[0] = unknown
+                return run
+            key = (state[0], run)
+            try:
+                state[0], output = memo[key]
+                return output
+            except KeyError:
+                pass
+            after = list(state[0])
+            for parameters in _sgrSplit.findall(run):
+                if not _sgr_apply(after, parameters):
+                    after, output = unknown, run
+                    break
+            else:
+                codes = _sgr_codes(state[0], after)
+                after, output = tuple(after), '\033[%sm' % ';'.join(codes) if codes else ''
+            if len(memo) >= self.maxsize:
+                memo.clear()
+            memo[key] = (after, output)
+            state[0] = after
+            return output
+
+        output = _sgrPattern.sub(optimize, text)
+        self.count(len(text), len(output))
+        return output
+
+    def count(self, before, after):
+        """ Count a string optimized elsewhere (like in a worker process of :py:func:`iter_render_parallel`), from the length ``before`` to ``after``."""
+        self.calls += 1
+        self.before += before
+        self.after += after
+
+
+def optimize_escapes(text):
+    """ optimize_escapes(text) -> string
+
+    Optimize the SGR escapes (colors and effects) of a rendered string, so it is shorter but looks exactly the same in a terminal:
+
+    - the escapes which do not change the current state (foreground, background, bold, italic, underline, blink, negative) are dropped,
+    - consecutive escapes are merged into one ``\\033[...m`` sequence, with only the codes needed to get the final state.
+
+    As nothing is known about the state of the terminal when the string starts, an escape is dropped only if it repeats one from the string itself.
+    The escapes with unknown codes are kept unchanged. ::
+
+        >>> optimize_escapes(colorDict['reset'] + colorDict['white'] + "a" + colorDict['white'] + "b" + colorDict['reset'] + colorDict['reset'])
+        '\\x1b[0;1;37mab\\x1b[0m'
+    """
+    return _escapesOptimizer(text)
 
-# Other tools for the interface
 
-def notify(msg="", obj="Notification sent by ansicolortags.notify", icon=None, verb=False):
-    """ notify(msg='', obj='Notification sent by ansicolortags.notify', icon=None, verb=False) -> bool
+#: The optimizer used by :py:func:`optimize_escapes`.
+_escapesOptimizer = _SGROptimizer()
 
-    Notification using :py:mod:`subprocess` and ``notify-send`` (GNU/Linux command-line program).
-    Also print the informations directly to the screen (only if verb=True).
 
-    .. warning::
+#: The optimizer used by the render engine, ``None`` if disabled (default). See :py:func:`enable_optimizer`.
+_optimizer = None
 
-       This does not use any *ANSI escape* codes, but the common *notify-send* GNU/Linux command line program.
-       It will probably fail (but cleanly) on Windows or Mac OS X.
 
-    - Return True if and only if the title have been correctly changed.
-    - Fails simply if ``notify-send`` is not found.
+def enable_optimizer():
+    """ enable_optimizer() -> unit
+
+    Optimize the escapes of all the outputs of :py:func:`sprint` (and so of :py:func:`printc`, :py:func:`writec` etc), with :py:func:`optimize_escapes`.
+    This costs some time when rendering, but saves bytes to write, useful for slow terminals (e.g. through SSH).
+    The bytes saved are counted, see :py:func:`optimizer_info`.
+
+    Calling it again resets the statistics.
     """
-    try:
-        if icon:
-            Popen(['notify-send', obj, msg, "--icon = %s/%s" % (os.getcwd(), icon)])
-            if verb:
-                print("ansicolortags.notify(): A notification have been sent, with obj = %s, msg = %s, and icon = %s." % (obj, msg, icon))
-        else:
-            Popen(['notify-send', obj, msg])
-            if verb:
-                print("ansicolortags.notify(): A notification have been sent, with obj = %s, and msg = %s." % (obj, msg))
-        return 0
-    except Exception as e:
-        if verb:
-            print("ansicolortags.notify(): notify-send : not-found ! Returned exception is %s." % e)
-        return -1
+    global _optimizer
+    _optimizer = _SGROptimizer()
 
 
-def xtitle(new_title="", verb=False):
-    """ xtitle(new_title="", verb=False) -> 0 or 1
+def disable_optimizer():
+    """ disable_optimizer() -> unit
 
-    **Modify the current terminal title**.
-    Returns 0 if one of the two solutions worked, 1 otherwise.
+    Disable the optimizer enabled by :py:func:`enable_optimizer`.
+    """
+    global _optimizer
+    _optimizer = None
 
-    An experimental try is with **ANSI escape code**,
-    if the simple way by calling the ``xtitle`` program does not work (or if it is not installed).
 
-    .. note::
+def optimizer_info():
+    """ optimizer_info() -> :py:data:`OptimizerInfo` or None
 
-       The second solution simply uses the two *ANSI* Tags ``<title>`` (:py:data:`title`) and ``<bell>`` (:py:data:`bell`).
-       So, you can also do it with: ::
+    Statistics of the optimizer (``calls``, ``before``, ``after``, and the number of bytes ``saved``), or ``None`` if it is disabled.
+    """
+    if _optimizer is None:
+        return None
+    return _optimizer.info()
 
-           >>> ansicolortags.writec("<title>This is the new title of the terminal<bell>")
 
+# %% Closing tags
 
-    But this function *xtitle* is better: it tries two ways, and returns a signal to inform about his success.
+#: The state assumed at the start of a string with closing tags (see :py:func:`_sgr_apply`): all the attributes have their default value.
+_sgrDefaultState = tuple(default for _, default in _sgrDefaults) + (True, )
+
+#: Cache of the effects of the escapes on the states, see :py:func:`_sgr_effect`, and of the escapes going back to a previous state, see :py:func:`_sgr_restore`.
+_sgrEffects = {}
+_sgrRestores = {}
+
+
+def _sgr_effect(state, escape):
+    """ _sgr_effect(state, escape) -> (state, bool) or None
+
+    The state after ``escape`` (a tuple, see :py:func:`_sgr_apply`) and ``True`` if it contains a reset (code ``0``),
+    or ``None`` if ``escape`` does not change the style (e.g. :py:data:`el`). The effects are cached.
     """
+    key = (state, escape)
     try:
-        Popen(['xtitle', new_title])
+        return _sgrEffects[key]
+    except KeyError:
+        pass
+    runs = _sgrSplit.findall(escape)
+    effect = None
+    if runs:
+        after = list(state)
+        after[-1] = False  # Only a reset sets it to True
+        known = True
+        for parameters in runs:
+            known = _sgr_apply(after, parameters) and known
+        reset = after[-1] is True
+        if not known:
+            after = [None] * len(state)
+        elif not reset:
+            after[-1] = state[-1]
+        effect = (tuple(after), reset)
+    if len(_sgrEffects) >= 4096:
+        _sgrEffects.clear()
+    _sgrEffects[key] = effect
+    return effect
+
+
+#: Cache of :py:func:`_sgr_resets`.
+_sgrResets = {}
+
+
+def _sgr_resets(escape):
+    """ _sgr_resets(escape) -> bool
+
+    ``True`` if ``escape`` (a string, or bytes encoded in UTF-8) contains a reset (code ``0``), so the style after it does not depend on the style before it. Cached.
+    """
+    try:
+        return _sgrResets[escape]
+    except KeyError:
+        pass
+    effect = _sgr_effect(_sgrDefaultState, escape if isinstance(escape, _stringTypes) else escape.decode('utf-8'))
+    if len(_sgrResets) >= 4096:
+        _sgrResets.clear()
+    _sgrResets[escape] = resets = effect is not None and effect[1]
+    return resets
+
+
+def _last_reset(values):
+    """ _last_reset(values) -> int
+
+    Index of the last of the escapes ``values`` containing a reset (see :py:func:`_sgr_resets`), or ``0``:
+    the stack of the style only depends on the opening tags from there.
+    """
+    index = len(values) - 1
+    while index > 0 and not _sgr_resets(values[index]):
+        index -= 1
+    return max(index, 0)
+
+
+def _sgr_restore(state, before):
+    """ _sgr_restore(state, before) -> string
+
+    The shortest escape changing the state ``state`` back into ``before`` (see :py:func:`_sgr_codes`). The escapes are cached.
+    """
+    key = (state, before)
+    try:
+        return _sgrRestores[key]
+    except KeyError:
+        pass
+    codes = _sgr_codes(state, before)
+    escape = '\033[%sm' % ';'.join(codes) if codes else ''
+    if len(_sgrRestores) >= 4096:
+        _sgrRestores.clear()
+    _sgrRestores[key] = escape
+    return escape
+
+
+class _StyleStack(object):
+    """ The current style (a state, see :py:func:`_sgr_apply`) and the stack of the opened tags, to interpret the closing tags.
+
+    - each tag changing the style is pushed on the stack, with the state before it,
+    - a closing tag pops the last tag of the same name, and the ones opened after it and not closed yet (like in HTML),
+    - a closing tag without an opening tag is ignored,
+    - a reset (e.g. :py:data:`reset`) empties the stack,
+    - only the last ``maxdepth`` tags not closed are kept (so the memory is bounded for a text never closing its tags).
+
+    The style starts as the default style.
+    """
+
+    #: At most that many tags are kept in the stack.
+    maxdepth = 1024
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """ Go back to the default style, with no tag opened."""
+        #: The current state.
+        self.state = _sgrDefaultState
+        self._stack = []
+
+    def is_clear(self):
+        """ ``True`` if the style is the default style, with no tag opened."""
+        return self.state == _sgrDefaultState and not self._stack
+
+    def snapshot(self):
+        """ A copy of the style and of the stack (which can be pickled), see :py:meth:`restore`."""
+        return self.state, tuple(self._stack)
+
+    def restore(self, snapshot):
+        """ Go back to the style and the stack of a :py:meth:`snapshot`."""
+        self.state, stack = snapshot
+        self._stack = list(stack)
+
+    def follow(self, names, escapes):
+        """ Apply the ``escapes`` of the tags ``names`` (none of them is a closing tag): only the ones from the last reset change the stack."""
+        start = _last_reset(escapes)
+        for name, escape in zip(names[start:], escapes[start:]):
+            self.open(name, escape)
+
+    def open(self, name, escape, push=True):
+        """ Apply the ``escape`` of the tag ``name`` (only changing the current style if not ``push``, for the next escapes of the same tag)."""
+        effect = _sgr_effect(self.state, escape)
+        if effect is not None:
+            after, reset = effect
+            if reset:
+                del self._stack[:]
+            elif push:
+                self._stack.append((name, self.state))
+                if len(self._stack) > self.maxdepth:
+                    del self._stack[0]
+            self.state = after
+
+    def close(self, name):
+        """ Close the tag ``name``, and return ``True``, or ``False`` if it is not opened."""
+        stack = self._stack
+        position = len(stack) - 1
+        while position >= 0 and stack[position][0] != name:
+            position -= 1
+        if position < 0:
+            return False
+        self.state = stack[position][1]
+        del stack[position:]
+        return True
+
+
+def _close_tags(names, values, texts=None, style=None):
+    """ _close_tags(names, values, texts=None, style=None) -> list of strings
+
+    The ``values`` of the tags ``names``, where each closing tag (like ``/red``) gets the escape restoring the style as it was before the matching opening tag
+    (see :py:class:`_StyleStack`), with only the codes that changed since (see :py:func:`_sgr_restore`), instead of a reset followed by all the tags opened before.
+    A closing tag without an opening tag is dropped.
+
+    The string is supposed to start with the default style, and so does each string separated by a ``'\\0'`` in the plain ``texts`` (see :py:func:`_render_many`),
+    unless the :py:class:`_StyleStack` ``style`` left by the previous piece of the text is given (it is then updated).
+    """
+    if style is None:
+        style = _StyleStack()
+    output = []
+    for index, (name, value) in enumerate(zip(names, values)):
+        if texts is not None and '\0' in texts[index]:
+            style.clear()
+        if name[:1] == '/':
+            state = style.state
+            output.append(_sgr_restore(state, style.state) if style.close(name[1:]) else '')
+        else:
+            output.append(value)
+            style.open(name, value)
+    return output
+
+
+# %% From ANSI codes back to tags
+
+#: Any escape sequence: CSI (like the SGR ones, ``\\033[...m``), OSC (like the title, ``\\033]0;...\\007``), or of two characters (like ``\\033(B``).
+_ansiPattern = re.compile('\033(?:\\[[0-?]*[ -/]*[@-~]|\\][^\007\033]*(?:\007|\033\\\\)?|[ -/]*[0-~])')
+
+#: The reverse index of :py:data:`colorDict`, with the state of :py:data:`colorDict` it comes from, see :py:func:`_reverse_index`.
+_reverseIndex = (None, {}, {}, {}, _ansiPattern, ())
+
+
+def _reverse_index():
+    """ _reverse_index() -> (dict, dict, dict, regexp, tuple)
+
+    The reverse index of :py:data:`colorDict`, used by :py:func:`from_ansi`. Built again only when :py:data:`colorDict` is modified.
+
+    - a mapping of its escapes to their names (only the ones made of one escape sequence),
+    - a mapping of the tuples of SGR codes (like ``('1', '31')`` for ``\\033[01;31m``) to their names,
+    - a mapping of the others made of control characters, with at most one escape sequence (like :py:data:`el` and :py:data:`bell`), to their names,
+    - and the pattern matching these others (longest first) or an escape sequence (see :py:data:`_ansiPattern`), so they are all found in only one pass,
+      and a control character inside an escape sequence (like the ``BEL`` ending an OSC sequence) is not taken for a tag,
+    - and the first characters of these others: without them in a text, :py:data:`_ansiPattern` is enough, and faster.
+    """
+    global _reverseIndex
+    state = (id(colorDict), getattr(colorDict, 'version', None))
+    if _reverseIndex[0] != state:
+        escapes, codes, others = {}, {}, {}
+        for name, value in colorDict.items():
+            match = _ansiPattern.search(value)
+            if name == 'title' or not value:
+                continue
+            elif match is not None and match.span() == (0, len(value)):
+                escapes.setdefault(value, name)
+                if value.endswith('m') and value.startswith('\033['):
+                    codes.setdefault(tuple(str(int(code or 0)) for code in value[2:-1].split(';')), name)
+            elif len(_ansiPattern.findall(value)) <= 1 and all(character < ' ' for character in _ansiPattern.sub('', value)):
+                others.setdefault(value, name)
+        pattern = re.compile('|'.join([re.escape(value) for value in sorted(others, key=lambda value: -len(value))] + [_ansiPattern.pattern]))
+        firsts = tuple(set(value[0] for value in others))
+        _reverseIndex = (state, escapes, codes, others, pattern, firsts)
+    return _reverseIndex[1:]
+
+
+def _from_escape(escape, escapes, codes, left='<', right='>'):
+    """ _from_escape(escape, escapes, codes, left='<', right='>') -> string
+
+    The tags for one escape sequence, using the reverse index ``escapes`` and ``codes``. The parts which have no tag are kept as escapes.
+    """
+    if escape in escapes:
+        return left + escapes[escape] + right
+    if escape.startswith('\033]0;') and escape.endswith('\007'):
+        return left + 'title' + right + escape[4:-1] + left + 'bell' + right
+    if not (escape.startswith('\033[') and escape.endswith('m')):
+        return escape
+    try:
+        sgr = [str(int(code or 0)) for code in escape[2:-1].split(';')]
+    except ValueError:  # Like 38:5:208
+        return escape
+    # Longest known groups of codes first (like 0;39;49 for reset, or 1;31 for red), the others are kept in an escape
+    output, unknown = [], []
+    index = 0
+    while index < len(sgr):
+        for length in (3, 2, 1):
+            name = codes.get(tuple(sgr[index:index + length])) if index + length <= len(sgr) else None
+            if name is not None:
+                if unknown:
+                    output.append('\033[%sm' % ';'.join(unknown))
+                    unknown = []
+                output.append(left + name + right)
+                index += length
+                break
+        else:
+            # Extended colors (38;5;n or 38;2;r;g;b) are kept together
+            length = {'5': 3, '2': 5}.get(sgr[index + 1] if index + 1 < len(sgr) else None, 1) if sgr[index] in ('38', '48') else 1
+            unknown.extend(sgr[index:index + length])
+            index += length
+    if unknown:
+        output.append('\033[%sm' % ';'.join(unknown))
+    return ''.join(output)
+
+
+def from_ansi(text, left='<', right='>'):
+    """ from_ansi(text, left='<', right='>') -> string
+
+    The reverse of :py:func:`sprint`: replace the escape sequences of ``text`` (e.g. the colored output of another program) by the tags of :py:data:`colorDict`.
+
+    - the escapes of :py:data:`colorDict` are replaced by their tag (e.g. ``\\033[01;31m`` by ``<red>``),
+    - the other SGR escapes (``\\033[...m``) are split in known codes (e.g. ``\\033[1;31;44m`` gives ``<red><Red>``),
+    - the title (``\\033]0;...\\007``) gives ``<title>...<bell>``,
+    - and the escapes (or the SGR codes) which have no tag are kept unchanged, so :py:func:`sprint` can render them again.
+
+    The text is scanned only once (with a regular expression), and each different escape is converted only once. ::
+
+        >>> from_ansi("\\033[01;32mOK\\033[0;39;49m in \\033[1;34;4m12 ms\\033[0m")
+        '<green>OK<reset> in <blue><u>12 ms<nocolors>'
+
+    .. warning:: The text between the escapes is kept as it is, so if it contains tags (like ``<red>``), they will be interpreted by :py:func:`sprint`.
+    """
+    escapes, codes, others, pattern, firsts = _reverse_index()
+    converted = {}
+
+    def convert(match):
+        escape = match.group(0)
+        try:
+            return converted[escape]
+        except KeyError:
+            if escape in others:
+                # Like el, made of control characters and of an escape
+                tags = converted[escape] = left + others[escape] + right
+            else:
+                tags = converted[escape] = _from_escape(escape, escapes, codes, left, right)
+            return tags
+
+    if not any(first in text for first in firsts):
+        pattern = _ansiPattern
+    return pattern.sub(convert, text)
+
+
+def strip_ansi(text):
+    """ strip_ansi(text) -> string
+
+    Remove all the escape sequences of ``text`` (colors and effects, cursor moves, titles etc), whether they come from this module or not. ::
+
+        >>> strip_ansi("\\033[01;32mOK\\033[0m in \\033[38;5;208m12 ms\\033[K")
+        'OK in 12 ms'
+    """
+    return _ansiPattern.sub('', text)
+
+
+# %% Batches of strings
+
+def _render_many(chainsWithTags, left='<', right='>', substitution=None):
+    """ _render_many(chainsWithTags, left='<', right='>', substitution=None) -> list of strings
+
+    Like ``[_render(chainWithTags, left, right, substitution) for chainWithTags in chainsWithTags]``, but faster:
+    the identical strings are rendered only once, and all the different strings are joined to be rendered with only one call to the tag scanner.
+    """
+    if substitution is None:
+        substitution = colorDict
+    if isinstance(substitution, Backend):  # Its output can not be split
+        return [_render(chainWithTags, left, right, substitution) for chainWithTags in chainsWithTags]
+    # Position of each string in the list of different strings
+    positions = {}
+    indexes = [positions.setdefault(chainWithTags, len(positions)) for chainWithTags in chainsWithTags]
+    unique = sorted(positions, key=positions.__getitem__)
+    # A tag can not contain the separator, so it can not be cut by it
+    separator = '\0'
+    if separator not in left and separator not in right:
+        text = _substitute(separator.join(unique), left, right, substitution)
+        rendered = text.split(separator)
+        if len(rendered) != len(unique):  # A string (or a substitution) contains the separator
+            rendered = [_substitute(chainWithTags, left, right, substitution) for chainWithTags in unique]
+    else:
+        rendered = [_substitute(chainWithTags, left, right, substitution) for chainWithTags in unique]
+    return [rendered[index] for index in indexes]
+
+
+def sprint_many(chainsWithTags, left='<', right='>', out=None):
+    """ sprint_many(chainsWithTags, left='<', right='>', out=None) -> list of strings or unit
+
+    Like ``[sprint(chainWithTags, left, right) for chainWithTags in chainsWithTags]``, but faster for big batches (e.g. all the cells of a table):
+    identical strings are rendered only once, and the tag scanner is used only once for all the others.
+
+    If ``out`` is given, the results are written to this file object (one after the other), and nothing is returned: ::
+
+        >>> sprint_many(["<green>OK<reset>", "<red>KO<reset>", "<green>OK<reset>"]) == [sprint("<green>OK<reset>"), sprint("<red>KO<reset>"), sprint("<green>OK<reset>")]
+        True
+    """
+    results = _render_many(chainsWithTags, left, right, _colors(out))
+    if out is None:
+        return results
+    out.writelines(results)
+
+
+def erase_many(chainsWithTags, left='<', right='>', out=None):
+    """ erase_many(chainsWithTags, left='<', right='>', out=None) -> list of strings or unit
+
+    Like ``[erase(chainWithTags, left, right) for chainWithTags in chainsWithTags]``, but faster for big batches, see :py:func:`sprint_many`.
+    """
+    results = _render_many(chainsWithTags, left, right, _eraseDict)
+    if out is None:
+        return results
+    out.writelines(results)
+
+
+# %% Bytes
+
+#: Cache of the compiled tag scanners for bytes, one for each pair of delimiters ``(left, right)``.
+_tagPatternsBytes = {}
+
+
+def _as_text(delimiter):
+    """ Delimiter given as bytes or as a string, as a string."""
+    return delimiter.decode('utf-8') if isinstance(delimiter, bytes) and bytes is not str else delimiter
+
+
+def _tag_pattern_bytes(left='<', right='>'):
+    """ _tag_pattern_bytes(left='<', right='>') -> compiled regular expression
+
+    Like :py:func:`_tag_pattern`, but to scan bytes (encoded in UTF-8, or any encoding compatible with ASCII). The delimiters can be strings or bytes.
+    """
+    try:
+        return _tagPatternsBytes[(left, right)]
+    except KeyError:
+        pattern = re.compile(_tag_pattern(_as_text(left), _as_text(right)).pattern.encode('utf-8'))
+        _tagPatternsBytes[(left, right)] = pattern
+        return pattern
+
+
+#: The escapes of :py:data:`colorDict`, encoded once, with the state of :py:data:`colorDict` they come from.
+_encodedColors = (None, {})
+
+
+def _encoded_colors(substitution):
+    """ _encoded_colors(substitution) -> dict
+
+    :py:data:`colorDict` (or any other ``substitution``) as a mapping from names of tags to escapes, both encoded in UTF-8.
+    The encoding of :py:data:`colorDict` is done once, and again only when it is modified.
+    """
+    global _encodedColors
+    if substitution is not colorDict:
+        return dict((name.encode('utf-8'), value.encode('utf-8')) for name, value in substitution.items())
+    state = (id(colorDict), getattr(colorDict, 'version', None))
+    if _encodedColors[0] != state:
+        _encodedColors = (state, _encoded_colors(dict(colorDict)))
+    return _encodedColors[1]
+
+
+def _render_bytes(data, left='<', right='>', escapes=None, out=None, style=None):
+    """ _render_bytes(data, left='<', right='>', escapes=None, out=None, style=None) -> bytes or int
+
+    Engine of :py:func:`sprint_bytes` and :py:func:`erase_bytes`: replace every tag by its value in ``escapes`` (a mapping of encoded names to encoded escapes),
+    or erase them if ``escapes`` is ``None``, and return the output or write it to ``out``.
+    A piece of a longer text is rendered from the :py:class:`_StyleStack` ``style`` left by the previous pieces (see :py:func:`_close_tags`).
+    """
+    pattern = _tag_pattern_bytes(left, right)
+    if escapes is None:
+        output = pattern.sub(b'', data)  #: Here the 'erasure' is made.
+    else:
+        # Like _join(), on bytes: even indexes are plain text, odd indexes are names of known tags
+        parts = pattern.split(data)
+        values = [escapes.get(name) for name in parts[1::2]]
+        if style is not None and values and None not in values:
+            # Nothing to close: the style is only followed, from the last reset
+            start = _last_reset(values)
+            style.follow([name.decode('utf-8') for name in parts[2 * start + 1::2]], [value.decode('utf-8') for value in values[start:]])
+        elif None in values:  # Tags with parameters, closing tags
+            names = [name.decode('utf-8') for name in parts[1::2]]
+            values = [value.decode('utf-8') if value is not None else _parametric_escape(name) for name, value in zip(names, values)]
+            if style is not None:
+                values = _close_tags(names, values, style=style)
+            elif any(name[:1] == '/' for name in names):
+                values = _close_tags(names, values)
+            values = [value.encode('utf-8') for value in values]
+        parts[1::2] = values
+        output = b''.join(parts)
+    if out is None:
+        return output
+    if isinstance(out, bytearray):
+        out += output
+    elif isinstance(out, memoryview):
+        if len(output) > len(out):
+            raise ValueError("the output buffer is too small (%d bytes, %d needed)" % (len(out), len(output)))
+        out[:len(output)] = output
+    else:
+        if hasattr(out, 'buffer'):  # A text file, like sys.stdout
+            out.flush()
+            out = out.buffer
+        out.write(output)
+    return len(output)
+
+
+def sprint_bytes(data, left='<', right='>', out=None):
+    """ sprint_bytes(data, left='<', right='>', out=None) -> bytes or int
+
+    Like :py:func:`sprint`, but for ``data`` given as :py:class:`bytes`, :py:class:`bytearray` or :py:class:`memoryview` (encoded in UTF-8, or any encoding compatible with ASCII),
+    without decoding and encoding it again: the plain text between the tags is never decoded,
+    and the ANSI codes are encoded only once (and again only when :py:data:`colorDict` is modified).
+    The delimiters ``left`` and ``right`` can be strings or bytes.
+
+    The output is returned as bytes if ``out`` is ``None``. Otherwise it is written, and its length (in bytes) is returned:
+
+    - appended to ``out`` if it is a :py:class:`bytearray`,
+    - copied at the beginning of ``out`` if it is a writable :py:class:`memoryview` (e.g. on a preallocated buffer), or :py:exc:`ValueError` if it is too small,
+    - written to ``out`` if it is a binary file, or to its ``buffer`` if it is a text file (like ``sys.stdout``).
+
+    Example: ::
+
+        >>> sprint_bytes(b"<red>Red<reset> bytes") == sprint("<red>Red<reset> bytes").encode('utf-8')
+        True
+        >>> buffer = bytearray(b"Log: ")
+        >>> erase_bytes(memoryview(b"<blue>OK<reset>"), out=buffer)
+        2
+        >>> bytes(buffer) == b"Log: OK"
+        True
+
+    .. note:: The tags are erased if the output does not support ANSI codes, see :py:func:`supports_ansi`.
+    """
+    colors = _colors(out if out is not None and not isinstance(out, (bytearray, memoryview)) else None)
+    return _render_bytes(data, left, right, None if colors is _eraseDict else _encoded_colors(colors), out)
+
+
+def erase_bytes(data, left='<', right='>', out=None):
+    """ erase_bytes(data, left='<', right='>', out=None) -> bytes or int
+
+    Like :py:func:`erase`, but for ``data`` given as :py:class:`bytes`, :py:class:`bytearray` or :py:class:`memoryview`, see :py:func:`sprint_bytes`.
+
+        >>> erase_bytes(b"<green>Bytes <b>without<B> colors.<reset>") == b"Bytes without colors."
+        True
+    """
+    return _render_bytes(data, left, right, None, out)
+
+
+# %% Memory-mapped files
+
+def _render_file(file_name, out=None, left='<', right='>', escapes=None, blocksize=1 << 18):
+    """ _render_file(file_name, out=None, left='<', right='>', escapes=None, blocksize=1 << 18) -> int
+
+    Engine of :py:func:`sprint_file` and :py:func:`erase_file`: map the file ``file_name`` in memory,
+    and render it by pieces of about ``blocksize`` bytes (see :py:func:`_render_bytes`), cut between two tags, and written to ``out`` one after the other.
+    Return the number of bytes written.
+    """
+    import io
+    import mmap
+    # The delimiters can be bytes, like for sprint_bytes
+    left, right = _as_text(left), _as_text(right)
+    pattern = _tag_pattern_bytes(left, right)
+    maxlen = len(left.encode('utf-8')) + _maxTagNameLength + len(right.encode('utf-8'))
+    # A piece must be longer than a tag, so the cuts always progress
+    blocksize = max(blocksize, 2 * maxlen)
+    outputFile = None
+    if out is None:
+        out = sys.stdout
+    elif isinstance(out, _stringTypes):
+        out = outputFile = io.open(out, 'wb', buffering=blocksize)
+    written = 0
+    # The tags can be closed in a later piece
+    style = None if escapes is None else _StyleStack()
+    try:
+        with io.open(file_name, 'rb') as inputFile:
+            size = os.fstat(inputFile.fileno()).st_size
+            if size == 0:  # An empty file can not be mapped
+                return 0
+            mapping = mmap.mmap(inputFile.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapping)
+            try:
+                position = 0
+                while position < size:
+                    end = min(size, position + blocksize)
+                    # The tag which may overlap the end of this piece goes to the next one
+                    cut = position + _safe_cut(view[position:end], pattern, maxlen) if end < size else end
+                    written += _render_bytes(view[position:cut], left, right, escapes, out, style)
+                    position = cut
+            finally:
+                view.release()
+                mapping.close()
+    finally:
+        if outputFile is not None:
+            outputFile.close()
+    return written
+
+
+def sprint_file(file_name, out=None, left='<', right='>', blocksize=1 << 18):
+    """ sprint_file(file_name, out=sys.stdout, left='<', right='>', blocksize=1 << 18) -> int
+
+    Like :py:func:`sprint`, but for a whole file, which can be much bigger than the memory: the file ``file_name`` is mapped in memory (with :py:mod:`mmap`),
+    scanned by pieces of about ``blocksize`` bytes (never cutting a tag), and each piece is rendered as bytes (see :py:func:`sprint_bytes`) and written to ``out``
+    (a binary file, a text file like ``sys.stdout``, or the name of the file to write). Return the number of bytes written.
+
+    So the memory used is bounded by about ``2 * blocksize``, whatever the size of the file.
+
+    .. note:: The tags are erased if ``out`` is a file object which does not support ANSI codes, see :py:func:`supports_ansi`.
+    """
+    colors = colorDict if isinstance(out, _stringTypes) else _colors(out)
+    return _render_file(file_name, out, left, right, None if colors is _eraseDict else _encoded_colors(colors), blocksize)
+
+
+def erase_file(file_name, out=None, left='<', right='>', blocksize=1 << 18):
+    """ erase_file(file_name, out=sys.stdout, left='<', right='>', blocksize=1 << 18) -> int
+
+    Like :py:func:`erase`, but for a whole file, which can be much bigger than the memory, see :py:func:`sprint_file`. ::
+
+        >>> erase_file('archive.log', 'archive-without-colors.log')  # doctest: +SKIP
+        5368709120
+    """
+    return _render_file(file_name, out, left, right, None, blocksize)
+
+
+# %% Compiled templates
+
+class ColorTemplate(object):
+    """ ColorTemplate(template, left='<', right='>') -> compiled template.
+
+    A string containing color tags, **parsed only once** (see :py:func:`compile`), and then rendered as many times as needed.
+
+    The template stores the plain text segments and the names of the tags, which are resolved with :py:data:`colorDict` when rendering,
+    so changes made to :py:data:`colorDict` or to :py:data:`ANSISupported` after the compilation are still honored.
+    Like :py:func:`sprint`, the tags are erased if the output does not support ANSI codes.
+    """
+
+    def __init__(self, template, left='<', right='>'):
+        #: The original string, with its color tags.
+        self.template = template
+        self.left = left
+        self.right = right
+        self._parts = _tag_pattern(left, right).split(template)
+        self._plain = ''.join(self._parts[::2])
+
+    def __repr__(self):
+        return "%s(%r, left=%r, right=%r)" % (self.__class__.__name__, self.template, self.left, self.right)
+
+    def render(self, out=None):
+        """ render(out=sys.stdout) -> string
+
+        Like ``sprint(template, left, right)``, but without parsing the template again.
+        The tags are erased if the output ``out`` does not support ANSI codes (see :py:func:`supports_ansi`).
+        """
+        if not supports_ansi(out):
+            return self._plain
+        if _optimizer is not None:
+            return _optimizer(_join(self._parts[:], colorDict))
+        return _join(self._parts[:], colorDict)
+
+    def plain(self):
+        """ plain() -> string
+
+        Like ``erase(template, left, right)``, but without parsing the template again.
+        """
+        return self._plain
+
+    def format(self, *args, **kwargs):
+        """ format(*args, **kwargs) -> string
+
+        Render the template, then fill it with :py:meth:`str.format`: ::
+
+            >>> compile("<green>OK<reset> {} in <blue>{:d} ms<reset>").format('/index', 12)  # doctest: +SKIP
+
+        The arguments are never interpreted as color tags.
+        """
+        return self.render().format(*args, **kwargs)
+
+    def __mod__(self, args):
+        """ template % args -> string
+
+        Render the template, then fill it with the ``%`` operator: ::
+
+            >>> compile("<green>OK<reset> %s in <blue>%d ms<reset>") % ('/index', 12)  # doctest: +SKIP
+        """
+        return self.render() % args
+
+
+def compile(template, left='<', right='>'):
+    """ compile(template, left='<', right='>') -> :py:class:`ColorTemplate`
+
+    Parse once a string containing color tags, and return a :py:class:`ColorTemplate` object,
+    with the methods ``render()`` (like :py:func:`sprint`), ``plain()`` (like :py:func:`erase`) and ``format(*args, **kwargs)``.
+
+    Useful for format strings used again and again (e.g. in a logger): ::
+
+        >>> okTemplate = compile("<green>OK<reset> %s in <blue>%d ms<reset>")
+        >>> print(okTemplate % ('/index', 12))  # the tags are not parsed again
+        OK /index in 12 ms
+    """
+    return ColorTemplate(template, left=left, right=right)
+
+
+# %% Streaming
+
+def _safe_cut(text, pattern, maxlen):
+    """ _safe_cut(text, pattern, maxlen) -> int
+
+    Position (maybe negative) where ``text`` can be cut, as close as possible to its end, such that what follows may be the beginning of a tag
+    but no tag (matched by ``pattern``, and at most ``maxlen`` long) is cut in two.
+    """
+    cut = len(text) - maxlen + 1
+    if cut <= 0:
+        return cut
+    # Tags starting before the cut are complete, but the last one can overlap it
+    match = pattern.search(text, max(0, cut - maxlen + 1))
+    while match is not None and match.start() < cut:
+        if match.end() > cut:
+            return match.end()
+        match = pattern.search(text, match.end())
+    return cut
+
+
+class _StreamRenderer(object):
+    """ Incremental version of :py:func:`sprint` (or :py:func:`erase`), for a text given by chunks.
+
+    The end of the text received so far is kept (in ``_pending``) as long as it may be the beginning of a tag,
+    so tags cut between two chunks are still recognized, and the memory used is bounded by the size of the chunks.
+    The style is followed from one chunk to the next (with a :py:class:`_StyleStack`), so a tag opened in a chunk can be closed in another one.
+    """
+
+    def __init__(self, left='<', right='>', substitution=None):
+        self.left = left
+        self.right = right
+        self._substitution = colorDict if substitution is None else substitution
+        self._pattern = _tag_pattern(left, right)
+        #: No tag is longer than that.
+        self._maxlen = len(left) + _maxTagNameLength + len(right)
+        self._pending = ''
+        # The erased closing tags do not need it
+        self._style = None if self._substitution is _eraseDict else _StyleStack()
+
+    def feed(self, chunk):
+        """ feed(chunk) -> string
+
+        Give the next chunk of text, and return the part of the output which is now known for sure.
+        """
+        text = self._pending + chunk
+        cut = _safe_cut(text, self._pattern, self._maxlen)
+        if cut <= 0:
+            self._pending = text
+            return ''
+        self._pending = text[cut:]
+        return _substitute(text[:cut], self.left, self.right, self._substitution, self._style)
+
+    def finish(self):
+        """ finish() -> string
+
+        Return the end of the output, once the text is over.
+        """
+        text, self._pending = self._pending, ''
+        output = _substitute(text, self.left, self.right, self._substitution, self._style)
+        if self._style is not None:
+            self._style.clear()
+        return output
+
+
+def iter_sprint(chunks, left='<', right='>', erase=False, backend=None):
+    """ iter_sprint(chunks, left='<', right='>', erase=False, backend=None) -> generator of strings
+
+    Like :py:func:`sprint` (or :py:func:`erase` if ``erase=True``, or with the ``backend``, see :py:class:`Backend`), but for a text given by successive ``chunks``,
+    which can be any iterable of strings: a list, a generator, a file object (read line by line) etc.
+
+    The output is produced incrementally, with a constant memory, and tags cut between two chunks are correctly interpreted: ::
+
+        >>> ''.join(iter_sprint(["<re", "d>This is red.<res", "et>"])) == sprint("<red>This is red.<reset>")
+        True
+    """
+    renderer = _stream_renderer(left=left, right=right, substitution=_eraseDict if erase else _substitution_of(backend))
+    for chunk in chunks:
+        output = renderer.feed(chunk)
+        if output:
+            yield output
+    output = renderer.finish()
+    if output:
+        yield output
+
+
+# %% Output backends
+
+#: A style, as given to the backends (see :py:class:`Backend`): ``bold``, ``faint``, ``italic``, ``underline``, ``blink`` and ``negative`` are booleans,
+#: ``foreground`` and ``background`` are ``None`` for the default color, an index in the 256 colors (0 to 15 for the 16 basic colors), or a ``(red, green, blue)`` tuple.
+Style = namedtuple('Style', ['bold', 'faint', 'italic', 'underline', 'blink', 'negative', 'foreground', 'background'])
+
+#: The default style.
+defaultStyle = Style(False, False, False, False, False, False, None, None)
+
+#: Cache of the styles of the states, see :py:func:`_style_of`.
+_styles = {}
+
+
+def _style_color(code):
+    """ _style_color(code) -> int or tuple or None
+
+    The color (as in :py:data:`Style`) of the SGR code of a foreground or background color (like ``'31'``, ``'38;5;208'`` or ``'48;2;255;128;0'``).
+    """
+    if code is None:
+        return None
+    codes = [int(value) for value in code.split(';')]
+    if codes[0] in (38, 48):
+        return tuple(codes[2:5]) if codes[1] == 2 else codes[2]
+    if 30 <= codes[0] <= 37 or 40 <= codes[0] <= 47:
+        return codes[0] % 10
+    if 90 <= codes[0] <= 97 or 100 <= codes[0] <= 107:
+        return 8 + codes[0] % 10
+    return None  # 39 or 49
+
+
+def _style_of(state):
+    """ _style_of(state) -> :py:data:`Style`
+
+    The style of a state (see :py:func:`_sgr_apply`), where the unknown attributes have their default value. The styles are cached.
+    """
+    try:
+        return _styles[state]
+    except KeyError:
+        pass
+    bold, faint, italic, underline, blink, negative, foreground, background = state[:8]
+    style = Style(bold == '1', faint == '2', italic == '3', underline == '4', blink in ('5', '6'), negative == '7',
+                  _style_color(foreground), _style_color(background))
+    if len(_styles) >= 4096:
+        _styles.clear()
+    _styles[state] = style
+    return style
+
+
+def _sgr_of(style):
+    """ _sgr_of(style) -> list of strings
+
+    The SGR codes giving the :py:data:`Style` ``style``, from the default style.
+    """
+    codes = [code for flag, code in zip(style[:6], ('1', '2', '3', '4', '5', '7')) if flag]
+    for color, base, extended in ((style.foreground, 30, '38'), (style.background, 40, '48')):
+        if isinstance(color, tuple):
+            codes.append('%s;2;%d;%d;%d' % ((extended, ) + color))
+        elif color is not None and color < 16:
+            codes.append(str(base + color if color < 8 else base + 60 + color - 8))
+        elif color is not None:
+            codes.append('%s;5;%d' % (extended, color))
+    return codes
+
+
+class Backend(object):
+    """ Base class of the output backends, which render a text with color tags (e.g. to ANSI codes, to plain text, to HTML etc).
+
+    The tags are parsed (once) by the engine, which follows the style (with the closing tags, see :py:func:`sprint`), and calls these methods of the backend,
+    each returning the string to output:
+
+    - :py:meth:`text`, for each plain text (between the tags),
+    - :py:meth:`style`, when the style changes before a text (with the :py:data:`Style` ``before`` and ``after``),
+    - :py:meth:`control`, for each tag which does not change the style (like :py:data:`el` or :py:data:`bell`),
+    - :py:meth:`finish`, at the end of the text.
+
+    This base class outputs the plain text, so a new backend just has to change some of these methods. For example, to use Markdown for the bold text: ::
+
+        >>> class MarkdownBackend(Backend):
+        ...     def style(self, before, after):
+        ...         return '**' if before.bold != after.bold else ''
+        ...     def finish(self, style):
+        ...         return '**' if style.bold else ''
+        >>> sprint("Some <b>bold</b> text, and <b>more", backend=MarkdownBackend())
+        'Some **bold** text, and **more**'
+
+    A backend can be given to :py:func:`sprint`, :py:func:`printc`, :py:func:`writec` and :py:func:`iter_sprint`, and to the writers (like :py:class:`ColorWriter`),
+    so different outputs can use different backends at the same time, without changing :py:data:`colorDict`.
+    The values of the tags are the ones of :py:data:`colorDict`, with all the colors (see :py:data:`TRUECOLOR`), whatever the terminal supports.
+
+    A backend must not keep a state between two calls, as it can be used by many threads, see :py:class:`SharedColorWriter`
+    (but a backend which writes the text itself, see :py:attr:`writes`, can not be used by the writers with a background thread).
+    """
+
+    #: The mapping of the names of the tags to their value, used to render the text without the events (faster), or ``None`` to use the events.
+    substitution = None
+
+    #: ``True`` if the backend writes the text itself to its output ``out`` (like :py:class:`WindowsConsoleBackend`), instead of returning it.
+    writes = False
+
+    def text(self, text):
+        """ text(text) -> string
+
+        The output for a plain text (between two tags).
+        """
+        return text
+
+    def style(self, before, after):
+        """ style(before, after) -> string
+
+        The output when the style changes, from the :py:data:`Style` ``before`` to ``after``, before a text.
+        """
+        return ''
+
+    def control(self, name, escape):
+        """ control(name, escape) -> string
+
+        The output for the tag ``name`` which does not change the style (like :py:data:`el`), whose ANSI code is ``escape``.
+        """
+        return ''
+
+    def finish(self, style):
+        """ finish(style) -> string
+
+        The output at the end of the text, when the style is ``style``.
+        """
+        return ''
+
+    def render(self, chainWithTags, left='<', right='>'):
+        """ render(chainWithTags, left='<', right='>') -> string
+
+        Render a string containing color tags, like :py:func:`sprint`.
+        """
+        if self.substitution is not None:
+            return _render(chainWithTags, left, right, self.substitution)
+        renderer = _EventRenderer(self, left=left, right=right)
+        return renderer.render(chainWithTags) + renderer.finish()
+
+    def stream(self, left='<', right='>'):
+        """ stream(left='<', right='>') -> renderer
+
+        A renderer for a text given by chunks (like :py:func:`iter_sprint`), with the methods ``feed(chunk)`` and ``finish()``, which return strings.
+        """
+        if self.substitution is not None:
+            return _StreamRenderer(left=left, right=right, substitution=self.substitution)
+        return _EventRenderer(self, left=left, right=right)
+
+    def __repr__(self):
+        return "%s()" % self.__class__.__name__
+
+
+class PlainBackend(Backend):
+    """ PlainBackend() -> backend.
+
+    The backend erasing all the tags, like :py:func:`erase`. ::
+
+        >>> sprint("<red>Not in red<reset>", backend=PlainBackend())
+        'Not in red'
+    """
+
+    substitution = _eraseDict
+
+
+class _TrueColors(object):
+    """ _TrueColors(colors=colorDict) -> mapping
+
+    The substitution of :py:class:`ANSIBackend`: the values of the mapping ``colors`` (default is :py:data:`colorDict`, even if it is replaced),
+    and the tags with parameters (like ``fg:208``) rendered with all the colors (see :py:data:`TRUECOLOR`), whatever the terminal supports.
+    """
+
+    def __init__(self, colors=None):
+        self.colors = colors
+
+    def get(self, name, default=None):
+        value = (colorDict if self.colors is None else self.colors).get(name)
+        if value is None and name[:1] != '/':
+            # '' for a name which is not a tag with parameters
+            value = _parametric_escape(name, TRUECOLOR) or None
+        return default if value is None else value
+
+    def items(self):
+        return (colorDict if self.colors is None else self.colors).items()
+
+
+#: The substitution of :py:class:`ANSIBackend` with :py:data:`colorDict`, used by the cache of :py:func:`sprint` (see :py:func:`enable_cache`).
+_trueColorDict = _TrueColors()
+
+
+class ANSIBackend(Backend):
+    """ ANSIBackend(colors=None) -> backend.
+
+    The backend replacing the tags by ANSI codes, like :py:func:`sprint`, but even if the output does not support them (see :py:func:`supports_ansi`).
+    The values of the tags are the ones of the mapping ``colors`` (default is :py:data:`colorDict`),
+    and the tags with parameters are rendered with all the colors (see :py:data:`TRUECOLOR`), whatever the terminal supports.
+    The values are looked up by a Python method (so a bit slower than :py:func:`sprint`), but with the default ``colors``, the results are cached like the ones of :py:func:`sprint`
+    (see :py:func:`enable_cache`). ::
+
+        >>> sprint("<red>In red<reset>", backend=ANSIBackend(colors=dict(colorDict, red='[RED]', reset='[/]')))
+        '[RED]In red[/]'
+        >>> sprint("<fg:208>In orange", backend=ANSIBackend())
+        '\\x1b[38;5;208mIn orange'
+    """
+
+    def __init__(self, colors=None):
+        self.colors = colors
+        #: Built once, so the default one can be cached.
+        self.substitution = _trueColorDict if colors is None else _TrueColors(colors)
+
+    def __repr__(self):
+        return "%s(colors=%r)" % (self.__class__.__name__, self.colors)
+
+
+#: An escape sequence (see :py:data:`_ansiPattern`) or a control character (but the tabulations and the new lines), in the value of a tag.
+_controlPattern = re.compile('%s|[\000-\010\013-\037\177]' % _ansiPattern.pattern)
+
+#: A SGR escape (``\\033[...m``).
+_sgrEscape = re.compile('\033\\[[0-9;]*m$')
+
+#: Cache of :py:func:`_value_events`.
+_valueEvents = {}
+
+
+def _value_events(value):
+    """ _value_events(value) -> tuple of (kind, string)
+
+    The value of a tag, cut in events for :py:class:`_EventRenderer`: ``'sgr'`` for consecutive SGR escapes, ``'text'`` for a plain text (like in :py:data:`ERROR`),
+    ``'control'`` for other escapes and control characters (like :py:data:`el`), and ``'osc'`` for an OSC sequence not terminated (like :py:data:`title`),
+    whose content goes on until a ``BEL`` or a ``ESC \\``. The events are cached.
+    """
+    try:
+        return _valueEvents[value]
+    except KeyError:
+        pass
+    events = []
+    position = 0
+    for match in _controlPattern.finditer(value):
+        if match.start() > position:
+            events.append(('text', value[position:match.start()]))
+        piece = match.group(0)
+        if _sgrEscape.match(piece):
+            kind = 'sgr'
+        elif piece[:2] == '\033]' and not piece.endswith(('\007', '\033\\')):
+            kind = 'osc'
+        else:
+            kind = 'control'
+        if events and events[-1][0] == kind and kind != 'osc':
+            events[-1] = (kind, events[-1][1] + piece)
+        else:
+            events.append((kind, piece))
+        position = match.end()
+    if position < len(value):
+        events.append(('text', value[position:]))
+    events = tuple(events)
+    if len(_valueEvents) >= 4096:
+        _valueEvents.clear()
+    _valueEvents[value] = events
+    return events
+
+
+#: The end of an OSC sequence: ``BEL`` or ``ESC \\``.
+_oscEnd = re.compile('\007|\033\\\\')
+
+
+class _EventRenderer(object):
+    """ The engine of the backends without a substitution (see :py:class:`Backend`), for a text given at once or by chunks.
+
+    The style is followed from one chunk to the next (with a :py:class:`_StyleStack`, so the closing tags are interpreted),
+    and the changes of style are given to the backend only before a text, so the consecutive tags give only one change.
+
+    The values of the tags are cut by :py:func:`_value_events`: their plain text (like in :py:data:`ERROR`) is given to the backend as a text,
+    and the content of an OSC sequence (like the text after :py:data:`title`, until :py:data:`bell`) is dropped, as a terminal does not show it.
+    """
+
+    def __init__(self, backend, left='<', right='>'):
+        self.backend = backend
+        self.left = left
+        self.right = right
+        self._pattern = _tag_pattern(left, right)
+        #: No tag is longer than that.
+        self._maxlen = len(left) + _maxTagNameLength + len(right)
+        self._pending = ''
+        self._style = _StyleStack()
+        #: The style of the output.
+        self._shown = defaultStyle
+        #: ``True`` in an OSC sequence, until its end.
+        self._inOSC = False
+
+    def _text(self, text, output):
+        """ Give a plain text to the backend, after the change of style (if any)."""
+        shown = _style_of(self._style.state)
+        if shown != self._shown:
+            output.append(self.backend.style(self._shown, shown))
+            self._shown = shown
+        output.append(self.backend.text(text))
+
+    def render(self, text):
+        """ render(text) -> string
+
+        Render a text (containing only complete tags), and return the output.
+        """
+        parts = self._pattern.split(text)
+        # All the colors, whatever the terminal supports
+        values = [colorDict.get(name) for name in parts[1::2]]
+        values = [value if value is not None else _parametric_escape(name, TRUECOLOR) for name, value in zip(parts[1::2], values)]
+        backend = self.backend
+        style = self._style
+        output = []
+        for index, part in enumerate(parts):
+            if not index % 2:
+                if part and not self._inOSC:
+                    self._text(part, output)
+                continue
+            if part[:1] == '/':
+                style.close(part[1:])
+                continue
+            value = values[index // 2]
+            if self._inOSC:
+                # The content of the OSC sequence is dropped, until its end
+                end = _oscEnd.search(value)
+                if end is None:
+                    continue
+                self._inOSC = False
+                value = value[end.end():]
+            opened = False
+            for kind, event in _value_events(value):
+                if kind == 'sgr':
+                    style.open(part, event, push=not opened)
+                    opened = True
+                elif kind == 'text':
+                    self._text(event, output)
+                else:
+                    output.append(backend.control(part, event))
+                    if kind == 'osc':
+                        self._inOSC = True
+                        break
+        return ''.join(output)
+
+    def feed(self, chunk):
+        """ feed(chunk) -> string
+
+        Give the next chunk of text, and return the part of the output which is now known for sure.
+        """
+        text = self._pending + chunk
+        cut = _safe_cut(text, self._pattern, self._maxlen)
+        if cut <= 0:
+            self._pending = text
+            return ''
+        self._pending = text[cut:]
+        return self.render(text[:cut])
+
+    def finish(self):
+        """ finish() -> string
+
+        Return the end of the output, once the text is over.
+        """
+        text, self._pending = self._pending, ''
+        output = self.render(text) + self.backend.finish(self._shown)
+        self._style.clear()
+        self._shown = defaultStyle
+        self._inOSC = False
+        return output
+
+
+def _stream_renderer(left='<', right='>', substitution=None):
+    """ _stream_renderer(left='<', right='>', substitution=None) -> renderer
+
+    A renderer for a text given by chunks, with the ``substitution`` (a mapping, or a :py:class:`Backend`).
+    """
+    if isinstance(substitution, Backend):
+        return substitution.stream(left=left, right=right)
+    return _StreamRenderer(left=left, right=right, substitution=substitution)
+
+
+def _check_output(backend, out=None, writer=None):
+    """ _check_output(backend, out=None, writer=None) -> unit
+
+    Raise :py:exc:`ValueError` if the ``backend`` writes the text itself (see :py:attr:`Backend.writes`) and cannot be used for the output ``out``
+    (which has to be its own output, if it is given) or by the ``writer`` (the name of a writer writing from a background thread, if it is given).
+    """
+    if backend is None or not getattr(backend, 'writes', False):
+        return
+    if writer is not None:
+        raise ValueError("%s cannot use %r, which writes from the calling thread" % (writer, backend))
+    if out is not None and out is not backend.out:
+        raise ValueError("%r writes only to its own output %r, not to %r" % (backend, backend.out, out))
+
+
+def _substitution_of(backend=None, out=None):
+    """ _substitution_of(backend=None, out=sys.stdout) -> mapping or :py:class:`Backend`
+
+    What the render engine uses for the ``backend``: its substitution, or the backend itself (see :py:class:`Backend`),
+    or if it is ``None``, :py:data:`colorDict` if ``out`` supports ANSI codes and ``_eraseDict`` otherwise (see :py:func:`_colors`).
+    """
+    if backend is None:
+        return _colors(out)
+    substitution = backend.substitution
+    return backend if substitution is None else substitution
+
+
+# %% HTML output
+
+#: The modes of :py:class:`HTMLBackend`: CSS classes (see :py:func:`html_stylesheet`), or inline styles.
+htmlModes = ('class', 'style')
+
+#: The names of the 8 colors, used in the CSS classes.
+_htmlColorNames = ('black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan', 'white')
+
+#: Cache of the opening ``<span>`` of each style, for each mode and prefix, see :py:func:`_html_span`.
+_htmlSpans = {}
+
+
+def _html_escape(text):
+    """ _html_escape(text) -> string
+
+    Escape the characters ``&``, ``<`` and ``>`` of a plain text (the strings without them are returned as they are).
+    """
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+def _html_color(color):
+    """ _html_color(color) -> (string or None, string) or None
+
+    The name of the class (like ``'red'`` or ``'bright-red'``, or ``None`` for the 256 colors and true colors) and the RGB value (like ``'#cd0000'``)
+    of a color of a :py:data:`Style`, or ``None`` for the default color.
+    """
+    if color is None:
+        return None
+    if isinstance(color, tuple):
+        return None, '#%02x%02x%02x' % color
+    name = ('bright-' if color >= 8 else '') + _htmlColorNames[color % 8] if color < 16 else None
+    return name, '#%02x%02x%02x' % _palette256[color]
+
+
+def _html_span(style, mode='class', prefix='ansi-'):
+    """ _html_span(style, mode='class', prefix='ansi-') -> string
+
+    The opening ``<span>`` element showing the :py:data:`Style` ``style``, or ``''`` for the default style.
+
+    - with ``mode='class'``, it has CSS classes (like ``ansi-bold ansi-red``, see :py:func:`html_stylesheet`), and an inline style only for the 256 colors and the true colors,
+    - with ``mode='style'``, it has only an inline style.
+
+    In negative, the colors are swapped (the default colors become ``CanvasText`` and ``Canvas``, the CSS colors of the text and the background of the page).
+    The blinking text is animated in both modes, with the ``@keyframes`` rule of :py:func:`html_stylesheet`.
+    The spans are cached.
+    """
+    key = (style, mode, prefix)
+    try:
+        return _htmlSpans[key]
+    except KeyError:
+        pass
+    foreground, background = _html_color(style.foreground), _html_color(style.background)
+    if style.negative:
+        foreground, background = background or ('inverse', 'Canvas'), foreground or ('inverse', 'CanvasText')
+    # Names of the classes, and the same as styles
+    classes, styles = [], []
+    if style.bold:
+        classes.append('bold')
+        styles.append('font-weight: bold')
+    if style.faint:
+        classes.append('faint')
+        styles.append('opacity: 0.5')
+    if style.italic:
+        classes.append('italic')
+        styles.append('font-style: italic')
+    if style.underline:
+        classes.append('underline')
+        styles.append('text-decoration: underline')
+    if style.blink:
+        # The same animation as the class (text-decoration: blink is ignored by the browsers)
+        classes.append('blink')
+        styles.append('animation: %sblink 1s step-end infinite' % prefix)
+    # The 256 colors and the true colors have no class
+    inline = []
+    for color, layer, property in ((foreground, '', 'color'), (background, 'bg-', 'background-color')):
+        if color is not None:
+            name, value = color
+            (inline if name is None else styles).append('%s: %s' % (property, value))
+            if name is not None:
+                classes.append(layer + name)
+    if mode == 'style':
+        classes, inline = [], styles + inline
+    attributes = ''.join([' class="%s"' % ' '.join(prefix + name for name in classes) if classes else '', ' style="%s"' % '; '.join(inline) if inline else ''])
+    span = '<span%s>' % attributes if attributes else ''
+    if len(_htmlSpans) >= 4096:
+        _htmlSpans.clear()
+    _htmlSpans[key] = span
+    return span
+
+
+class HTMLBackend(Backend):
+    """ HTMLBackend(mode='class', prefix='ansi-') -> backend.
+
+    The backend rendering the tags to HTML: the text is escaped, and put in ``<span>`` elements showing its colors and effects,
+    with CSS classes (``mode='class'``, named with the ``prefix``, see :py:func:`html_stylesheet`) or inline styles (``mode='style'``).
+    A ``<span>`` is opened each time the style of the text changes, and closed before the next one: the spans are never nested,
+    so the output can be put directly in a ``<pre>`` element.
+    The tags which do not change the style (like :py:data:`el` or :py:data:`bell`) are erased, but the text of the tags (like the ``ERROR`` of :py:data:`ERROR`) is kept,
+    and the text of a terminal title (after :py:data:`title`, until :py:data:`bell`) is dropped.
+    The blinking text needs the ``@keyframes`` rule of :py:func:`html_stylesheet`, even with ``mode='style'``.
+
+    See :py:func:`sprint_html`.
+    """
+
+    def __init__(self, mode='class', prefix='ansi-'):
+        if mode not in htmlModes:
+            raise ValueError("unknown mode %r, it should be one of %s" % (mode, ', '.join(htmlModes)))
+        self.mode = mode
+        self.prefix = prefix
+
+    def text(self, text):
+        return _html_escape(text)
+
+    def style(self, before, after):
+        return ('</span>' if _html_span(before, self.mode, self.prefix) else '') + _html_span(after, self.mode, self.prefix)
+
+    def finish(self, style):
+        return '</span>' if _html_span(style, self.mode, self.prefix) else ''
+
+    def __repr__(self):
+        return "%s(mode=%r, prefix=%r)" % (self.__class__.__name__, self.mode, self.prefix)
+
+
+def sprint_html(chainWithTags, left='<', right='>', mode='class', prefix='ansi-'):
+    """ sprint_html(chainWithTags, left='<', right='>', mode='class', prefix='ansi-') -> string
+
+    Like :py:func:`sprint`, but the output is HTML (see :py:class:`HTMLBackend`): the text is escaped, and put in ``<span>`` elements showing its colors and effects,
+    with CSS classes (``mode='class'``, see :py:func:`html_stylesheet`) or inline styles (``mode='style'``): ::
+
+        >>> print(sprint_html("<green>OK<reset> <u>GET</u> /index.html & <fg:208>co</fg:208>"))
+        <span class="ansi-bold ansi-green">OK</span> <span class="ansi-underline">GET</span> /index.html &amp; <span style="color: #ff8700">co</span>
+        >>> print(sprint_html("<green>OK<reset> <u>GET</u>", mode='style'))
+        <span style="font-weight: bold; color: #00cd00">OK</span> <span style="text-decoration: underline">GET</span>
+
+    The tags are interpreted in only one pass, with the values of :py:data:`colorDict` and all the colors (see :py:data:`TRUECOLOR`),
+    whatever the terminal supports. The spans are not nested, so the output can be put directly in a ``<pre>`` element.
+    The tags which do not change the style (like :py:data:`el` or :py:data:`bell`) are erased, the text of the tags is kept, and the text of a terminal title is dropped: ::
+
+        >>> print(sprint_html("<ERROR> disk full<title>build<bell>"))
+        <span class="ansi-bold ansi-red">ERROR</span> disk full
+    """
+    return HTMLBackend(mode=mode, prefix=prefix).render(chainWithTags, left, right)
+
+
+def iter_sprint_html(chunks, left='<', right='>', mode='class', prefix='ansi-'):
+    """ iter_sprint_html(chunks, left='<', right='>', mode='class', prefix='ansi-') -> generator of strings
+
+    Like :py:func:`sprint_html`, but for a text given by successive ``chunks`` (like :py:func:`iter_sprint`): the output is produced incrementally, with a constant memory,
+    and the style (including the tags opened and not closed yet) is kept from one chunk to the next: ::
+
+        >>> ''.join(iter_sprint_html(["<re", "d>red, <u>under", "lined</u></red>."]))
+        '<span class="ansi-bold ansi-red">red, </span><span class="ansi-bold ansi-underline ansi-red">underlined</span>.'
+    """
+    return iter_sprint(chunks, left=left, right=right, backend=HTMLBackend(mode=mode, prefix=prefix))
+
+
+def html_stylesheet(prefix='ansi-'):
+    """ html_stylesheet(prefix='ansi-') -> string
+
+    The CSS rules of the classes used by :py:func:`sprint_html` (with ``mode='class'``), to put in a ``<style>`` element: ::
+
+        >>> print(html_stylesheet().splitlines()[1])
+        .ansi-red { color: #cd0000; }
+    """
+    rules = []
+    for index, name in enumerate(_htmlColorNames + tuple('bright-' + name for name in _htmlColorNames)):
+        rules.append('.%s%s { color: #%02x%02x%02x; }' % ((prefix, name) + _palette256[index]))
+        rules.append('.%sbg-%s { background-color: #%02x%02x%02x; }' % ((prefix, name) + _palette256[index]))
+    rules.sort(key=lambda rule: '-bg-' in rule)
+    rules += [
+        '.%sinverse { color: Canvas; }' % prefix,
+        '.%sbg-inverse { background-color: CanvasText; }' % prefix,
+        '.%sbold { font-weight: bold; }' % prefix,
+        '.%sfaint { opacity: 0.5; }' % prefix,
+        '.%sitalic { font-style: italic; }' % prefix,
+        '.%sunderline { text-decoration: underline; }' % prefix,
+        '.%sblink { animation: %sblink 1s step-end infinite; }' % (prefix, prefix),
+        '@keyframes %sblink { 50%% { opacity: 0; } }' % prefix,
+    ]
+    return '\n'.join(rules) + '\n'
+
+
+# %% Windows console
+
+def _windows_console(out):
+    """ _windows_console(out) -> (function, int)
+
+    The function setting the attributes of the Windows console ``out`` (``SetConsoleTextAttribute``, with its handle), and its current attributes.
+    Raise :py:exc:`OSError` if ``out`` is not a Windows console.
+    """
+    try:
+        import ctypes
+        import msvcrt
+        from ctypes import wintypes
+        kernel32 = ctypes.windll.kernel32
+    except (ImportError, AttributeError):
+        raise OSError("the Windows console is only available on Windows")
+
+    class ConsoleScreenBufferInfo(ctypes.Structure):
+        _fields_ = [('size', wintypes._COORD), ('cursor', wintypes._COORD), ('attributes', wintypes.WORD),
+                    ('window', wintypes.SMALL_RECT), ('maximumSize', wintypes._COORD)]
+
+    handle = msvcrt.get_osfhandle(out.fileno())
+    info = ConsoleScreenBufferInfo()
+    if not kernel32.GetConsoleScreenBufferInfo(handle, ctypes.byref(info)):
+        raise OSError("%r is not a Windows console" % (out, ))
+    return (lambda attributes: kernel32.SetConsoleTextAttribute(handle, attributes)), info.attributes
+
+
+def _console_color(color):
+    """ _console_color(color) -> int
+
+    The color of the Windows console (the bits blue, green, red and intensity) nearest to a color of a :py:data:`Style`.
+    """
+    if isinstance(color, tuple):
+        color = _nearest256(*color)
+    if color >= 16:
+        color = _color_tables()[4][color]
+    # The ANSI colors are red, green, blue (from the lowest bit), the console colors are blue, green, red
+    return (color & 1) << 2 | (color & 2) | (color & 4) >> 2 | (color & 8)
+
+
+class WindowsConsoleBackend(Backend):
+    """ WindowsConsoleBackend(out=sys.stdout) -> backend.
+
+    The backend for the consoles of Windows which do not support ANSI codes: the text is written directly to the console ``out``,
+    and its colors are set with the Windows API (``SetConsoleTextAttribute``), so :py:meth:`render` returns an empty string.
+    It can be used with :py:func:`printc`, :py:func:`writec`, :py:class:`ColorWriter` (whose buffer is then always empty) and :py:class:`ColorizingWriter`,
+    if their output is the same ``out`` (or not given), but not with :py:class:`SharedColorWriter` and :py:class:`AsyncColorWriter`, which write from another thread.
+
+    Only the 16 colors are available (the other colors are downsampled), bold is shown with the bright colors, negative swaps the colors,
+    and the other effects are not shown. At the end of each text, the attributes of the console are restored.
+    It raises :py:exc:`OSError` if ``out`` is not a Windows console.
+    """
+
+    #: The backend writes the text itself.
+    writes = True
+
+    def __init__(self, out=None):
+        self.out = sys.stdout if out is None else out
+        self._set, self._default = _windows_console(self.out)
+
+    def _attributes(self, style):
+        """ The attributes of the console showing the :py:data:`Style` ``style``."""
+        foreground = self._default & 0x0F if style.foreground is None else _console_color(style.foreground)
+        background = (self._default >> 4) & 0x0F if style.background is None else _console_color(style.background)
+        if style.bold:
+            foreground |= 8
+        if style.negative:
+            foreground, background = background, foreground
+        # 0x8000 is COMMON_LVB_UNDERSCORE, only shown by some consoles
+        return foreground | background << 4 | (0x8000 if style.underline else 0)
+
+    def text(self, text):
+        self.out.write(text)
+        return ''
+
+    def style(self, before, after):
+        self.out.flush()
+        self._set(self._attributes(after))
+        return ''
+
+    def finish(self, style):
+        if style != defaultStyle:
+            self.out.flush()
+            self._set(self._default)
+        return ''
+
+    def __repr__(self):
+        return "%s(out=%r)" % (self.__class__.__name__, self.out)
+
+
+# %% Parallel rendering
+
+def _iter_blocks(chunks, left='<', right='>', blocksize=1 << 22):
+    """ _iter_blocks(chunks, left='<', right='>', blocksize=1 << 22) -> generator of strings
+
+    Gather the ``chunks`` of a text in blocks of about ``blocksize`` characters, never cutting a tag in two, so each block can be rendered independently.
+    """
+    pattern = _tag_pattern(left, right)
+    maxlen = len(left) + _maxTagNameLength + len(right)
+    pending, size = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= blocksize:
+            text = ''.join(pending)
+            cut = _safe_cut(text, pattern, maxlen)
+            if cut > 0:
+                yield text[:cut]
+                text = text[cut:]
+            pending, size = [text], len(text)
+    text = ''.join(pending)
+    if text:
+        yield text
+
+
+def _render_block(args):
+    """ _render_block(args) -> (string, snapshot, int)
+
+    Render one block of text, in a worker process of :py:func:`iter_render_parallel` (with the ``colors`` and the color ``depth`` of the main process, or ``None`` to erase the tags,
+    and optimized if ``optimize``, as the optimizer of the main process is not in the worker with the *spawn* start method, see :py:func:`enable_optimizer`),
+    from the default style, and return the output, the :py:meth:`_StyleStack.snapshot` of the style after it (``None`` if there is no tag in the block),
+    and the length of the output before its optimization (``None`` if not optimized).
+    """
+    global ColorDepth
+    text, left, right, colors, depth, optimize = args
+    pattern = _tag_pattern(left, right)
+    if colors is None:
+        return pattern.sub('', text), None, None
+    parts = pattern.split(text)
+    snapshot = None
+    if len(parts) > 1:
+        ColorDepth = depth
+        style = _StyleStack()
+        text = _join(parts, colors, style, True)
+        snapshot = style.snapshot()
+    if not optimize:
+        return text, snapshot, None
+    return optimize_escapes(text), snapshot, len(text)
+
+
+def iter_render_parallel(chunks, left='<', right='>', erase=False, jobs=None, blocksize=1 << 22):
+    """ iter_render_parallel(chunks, left='<', right='>', erase=False, jobs=None, blocksize=1 << 22) -> generator of strings
+
+    Like :py:func:`iter_sprint`, but the text is gathered in blocks of about ``blocksize`` characters (never cutting a tag in two),
+    rendered by a pool of ``jobs`` processes (default is the number of processors), and given back in the right order.
+
+    At most ``2 * jobs`` blocks are waiting at the same time, so the memory used is bounded, even for a huge text (e.g. read from a file): ::
+
+        >>> with open('/tmp/huge-log-with-tags.txt') as log:  # doctest: +SKIP
+        ...     for output in iter_render_parallel(log, erase=True, jobs=32):
+        ...         sys.stdout.write(output)
+
+    With ``jobs=1``, no process is created.
+
+    Each block is rendered from the default style: if a tag opened before it is not closed yet, a block with tags is rendered again by the main process,
+    from the style left by the previous blocks (so the closing tags are always right).
+
+    With the optimizer (see :py:func:`enable_optimizer`), each block is optimized on its own, by the workers too (whatever their start method is):
+    the output looks the same as the one of :py:func:`sprint`, but the escapes on both sides of a cut between two blocks are not merged.
+    """
+    colors = None if erase or _colors() is _eraseDict else dict(colorDict)
+    substitution = _eraseDict if colors is None else colors
+    depth = color_depth()
+    style = _StyleStack()
+    if jobs is None:
+        from multiprocessing import cpu_count
+        jobs = cpu_count()
+    if jobs <= 1:
+        for block in _iter_blocks(chunks, left, right, blocksize):
+            yield _substitute(block, left, right, substitution, style, True)
+        return
+
+    def result(block, waiting):
+        output, snapshot, before = waiting.get()
+        if snapshot is not None and not style.is_clear():
+            return _substitute(block, left, right, substitution, style, True)
+        if snapshot is not None:
+            style.restore(snapshot)
+        if before is not None and _optimizer is not None:
+            _optimizer.count(before, len(output))
+        return output
+    from multiprocessing import Pool
+    pool = Pool(jobs)
+    try:
+        waiting = deque()
+        for block in _iter_blocks(chunks, left, right, blocksize):
+            waiting.append((block, pool.apply_async(_render_block, ((block, left, right, colors, depth, _optimizer is not None), ))))
+            if len(waiting) >= 2 * jobs:
+                yield result(*waiting.popleft())
+        while waiting:
+            yield result(*waiting.popleft())
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def render_parallel(chainWithTags, left='<', right='>', erase=False, jobs=None, blocksize=1 << 22):
+    """ render_parallel(chainWithTags, left='<', right='>', erase=False, jobs=None, blocksize=1 << 22) -> string
+
+    Like :py:func:`sprint` (or :py:func:`erase` if ``erase=True``), but for a very long string, rendered by blocks in ``jobs`` processes, see :py:func:`iter_render_parallel`.
+    """
+    return ''.join(iter_render_parallel([chainWithTags], left=left, right=right, erase=erase, jobs=jobs, blocksize=blocksize))
+
+
+class ColorizingWriter(object):
+    """ ColorizingWriter(out=sys.stdout, left='<', right='>', erase=False, backend=None) -> file-like object.
+
+    Wrap the file object ``out``: the text written to it (by chunks of any size) is given to :py:func:`sprint` (or :py:func:`erase` if ``erase=True``,
+    or to the ``backend``, see :py:class:`Backend`) on the fly, see :py:func:`iter_sprint`.
+
+    The end of the text is written when the writer is closed (``out`` itself is **not** closed), so it is better used as a context manager: ::
+
+        >>> with ColorizingWriter(open('/tmp/colored-log.txt', 'w')) as writer:  # doctest: +SKIP
+        ...     for line in open('/tmp/log-with-tags.txt'):
+        ...         writer.write(line)
+    """
+
+    def __init__(self, out=None, left='<', right='>', erase=False, backend=None):
+        _check_output(backend, out)
+        self.out = sys.stdout if out is None else out
+        self._renderer = _stream_renderer(left=left, right=right, substitution=_eraseDict if erase else _substitution_of(backend, self.out))
+        self.closed = False
+
+    def write(self, chunk):
+        """ Colorize and write a chunk of text (the end of it can be delayed, if it may be the beginning of a tag)."""
+        output = self._renderer.feed(chunk)
+        if output:
+            self.out.write(output)
+
+    def writelines(self, chunks):
+        """ Colorize and write some chunks of text."""
+        for chunk in chunks:
+            self.write(chunk)
+
+    def flush(self):
+        """ Flush ``out`` (the end of the text possibly kept by the writer is not written yet)."""
+        self.out.flush()
+
+    def close(self):
+        """ Write the end of the text, and flush ``out``."""
+        if not self.closed:
+            self.closed = True
+            self.out.write(self._renderer.finish())
+            self.out.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# FIXED how to add this *objects in Python 2 ?
+# def printc(chainWithTags, *objects, left='<', right='>', sep=' ', end='\n', erase=False, **kwargs):
+# I removed the keywords arguments
+#          left='<', right='>', sep=' ', end='\n', erase=False,
+# and define them manually by poping keys from kwargs...
+# Cf. https://www.python.org/dev/peps/pep-3102/
+# https://docs.python.org/3/tutorial/controlflow.html#arbitrary-argument-lists
+
+def printc(chainWithTags, *objects, **kwargs):
+    """ printc(chainWithTags, *objects, left='<', right='>', sep=' ', end='\\n', erase=False, backend=None, **kwargs) -> unit
+
+    Basically a shortcut to ``print(sprint(chainWithTags))`` : it analyzes all tags (i.e., it converts the tags like ``<red>`` to their ANSI code value, like :py:data:`red`), and then it prints the result.
+
+    Example (in a terminal the colors, and the bold and underlining effects would be there):
+
+    >>> printc("<reset><white>« <u>Fifty shades of <red>red<white><U> » could be a <green>good<white> book, <b>if it existed<B>.<reset>")
+    « Fifty shades of red » could be a good book, if it existed.
+
+
+    It accepts one or more "things" to print, exactly like :py:func:`print`: for each value ``arg_i`` in ``*objects``:
+
+     - if ``arg_i`` is a string, it is converted using ``sprint(arg_i, left=left, right=right)`` (:py:func:`sprint`), and then passed to :py:func:`print`.
+     - otherwise ``arg_i`` is passed to :py:func:`print` without modification (in the same order, of course).
+
+    Example with more than one object:
+
+    >>> print("OK n =", 17, "and z =", 1 + 5j, ".")
+    OK n = 17 and z = (1+5j) .
+    >>> printc("<reset><green>OK<white> n =<magenta>", 17, "<white>and z =<blue>", 1 + 5j, "<reset>.")  # in a terminal, the output will have colors:
+    OK n = 17 and z = (1+5j) .
+
+
+    This is the more useful function in this package.
+
+    - If ``erase = True``, then :py:func:`erase` is used instead of :py:func:`sprint`
+    - If ``backend`` is given (see :py:class:`Backend`), it renders the strings, whatever the output supports (e.g. ``backend=PlainBackend()`` to print without colors to a terminal).
+      A backend which writes the text itself (like :py:class:`WindowsConsoleBackend`) writes to its own output: ``file`` must then be this output (or not given), and ``flush`` flushes it.
+
+    .. hint::
+
+       I suggest to use `ansicolortags.py <https://pypi.python.org/pypi/ansicolortags>`_ in your own project with the following piece of code:
+
+       .. code:: python
+
+           try:
+               from ansicolortags import printc
+           except ImportError:
+               print("WARNING: ansicolortags was not found, disabling colors instead.\\nPlease install it with 'pip install ansicolortags'")
+               def printc(*a, **kwargs):
+                   print(*a, **kwargs)
+
+
+    .. hint::
+
+       During the last 4 years, `a lot of the small Python scripts I wrote <https://bitbucket.org/lbesson/bin/src/master/>`_ try to use this module to add some colors:
+       for example, `FreeSMS.py <https://bitbucket.org/lbesson/bin/src/master/FreeSMS.py>`_,
+       `plotnotes.py <https://bitbucket.org/lbesson/bin/src/master/plotnotes.py>`_,
+       `strapdown2html.py <https://bitbucket.org/lbesson/bin/src/master/strapdown2html.py>`_,
+       `calc_interets.py <https://bitbucket.org/lbesson/bin/src/master/calc_interets.py>`_...
+    """
+    left = kwargs.pop('left') if 'left' in kwargs else '<'
+    right = kwargs.pop('right') if 'right' in kwargs else '>'
+    sep = kwargs.pop('sep') if 'sep' in kwargs else ' '
+    end = kwargs.pop('end') if 'end' in kwargs else '\n'
+    doerase = kwargs.pop('erase') if 'erase' in kwargs else False
+    backend = kwargs.pop('backend') if 'backend' in kwargs else None
+    # # DEBUG
+    # print("chainWithTags:")
+    # print(chainWithTags)
+    # print("objects:")
+    # print(objects)
+    # print("kwargs:")
+    # print(kwargs)
+    # print("left:", left)
+    # print("right:", right)
+    # print("sep:", sep)
+    # print("end:", end)
+    # print("doerase:", doerase)
+    # DONE for argument handling
+    substitution = _eraseDict if doerase else _colors(kwargs.get('file')) if backend is None else _substitution_of(backend)  # XXX cannot be called erase, it is already the function
+    if getattr(substitution, 'writes', False):
+        # The backend writes by itself, so everything is given to it, in order
+        _check_output(substitution, kwargs.get('file'))
+        for index, s in enumerate((chainWithTags,) + objects):
+            if index:
+                substitution.text(sep)
+            substitution.render(s, left, right) if isinstance(s, _stringTypes) else substitution.text(str(s))
+        substitution.text(end)
+        if kwargs.get('flush'):
+            substitution.out.flush()
+        return
+    print(*_render_objects((chainWithTags,) + objects, left, right, substitution), sep=sep, end=end, **kwargs)
+
+
+def _render_objects(objects, left='<', right='>', substitution=None):
+    """ Render the strings in ``objects`` (the other objects are kept unmodified), as done by :py:func:`printc`."""
+    return [_render(s, left, right, substitution) if isinstance(s, _stringTypes) else s for s in objects]
+
+
+def writec(chainWithTags="", out=None, left='<', right='>', flush=True, backend=None):
+    """ writec(chainWithTags="", out=sys.stdout, left='<', right='>', flush=True, backend=None) -> unit
+
+    Useful to print colored text **to a file**, represented by the object ``out``.
+    Also useful to print colored text, but without any trailing '\\n' character.
+    The colors are used if ``out`` supports them, unless a ``backend`` is given (see :py:class:`Backend`).
+
+    In this example, before the long computation begin, it prints 'Computing 2**(2**(2**4)).....',
+    and when the computation is done, erases the current line (with ``<el>`` tag, :py:data:`el`),
+    and prints ' Done !' in green, and the result of the computation: ::
+
+         >>> writec("<red>Computing<reset> 2**(2**(2**4))....."); tmp = 2**(2**(2**4)); writec("<el><green>Done !<reset>")
+         Done !
+
+
+    This example show how to use this module to write colored data in a file.
+    Be aware that this file now contains ANSI escape sequences.
+    For example, :code:`$ cat /tmp/colored-text.txt` will well print the colors, but editing the file will show *hard values* of escape code: ::
+
+        >>> my_file = open('/tmp/colored-text.txt', mode = 'w')  # Open an random file.
+        >>> write("<reset><blue>this is blue.<white>And <this> is white.<red>Now this is red because I am <angry> !<green><reset>", file = my_file)
+        >>> # Now this file '/tmp/colored-text.txt' has some ANSI colored text in it.
+
+    Remark:
+    It can also be used to simply reinitialize the ANSI colors buffer, but the function :py:func:`Reset` is here for this: ::
+
+        >>> writec("<reset>")
+
+
+    ``chainWithTags`` can also be an iterable of strings (e.g. a file object), colored on the fly with :py:func:`iter_sprint`: ::
+
+        >>> writec(open('/tmp/log-with-tags.txt'), out=my_file)  # doctest: +SKIP
+
+
+    .. warning::
+
+       The file ``out`` **will be flushed** by this function if ``flush`` is set to ``True`` (this is default behavior).
+       If you prefer no to, use ``flush=False`` option: ::
+
+           >>> writec(chainWithTags_1, out=my_file, flush=False)
+           >>> # many things...
+           >>> writec(chainWithTags_n, out=my_file, flush=False)
+           >>> my_file.flush()  # only flush here!
+
+    A backend which writes the text itself (like :py:class:`WindowsConsoleBackend`) can only be used if ``out`` is its output (or not given).
+"""
+    _check_output(backend, out)
+    if out is None:
+        out = sys.stdout
+    substitution = _substitution_of(backend, out)
+    if isinstance(chainWithTags, _stringTypes):
+        out.write(_render(chainWithTags, left, right, substitution))
+    else:
+        renderer = _stream_renderer(left=left, right=right, substitution=substitution)
+        for chunk in chainWithTags:
+            out.write(renderer.feed(chunk))
+        out.write(renderer.finish())
+    if flush:
+        out.flush()
+
+
+class ColorWriter(object):
+    """ ColorWriter(out=sys.stdout, flush='always', size=65536, interval=0.05, left='<', right='>', erase=False, backend=None) -> writer object.
+
+    Like :py:func:`writec`, but the colored strings are **buffered**, and written to the file object ``out`` (with only one call to ``out.write`` and ``out.flush``)
+    according to the flush policy ``flush``:
+
+    - ``'always'``: after every call to :py:meth:`write` (like :py:func:`writec`),
+    - ``'newline'``: when a new line character is written,
+    - ``'size'``: when at least ``size`` characters are buffered,
+    - ``'time'``: when the last flush is older than ``interval`` seconds (this is checked only when writing),
+    - ``'manual'``: only when :py:meth:`flush` or :py:meth:`close` are called.
+
+    With the ``'newline'`` and ``'time'`` policies, the buffer is also flushed when it has more than ``size`` characters.
+
+    The colors are used if ``out`` supports them (see :py:func:`supports_ansi`), unless ``erase`` is ``True``, or a ``backend`` is given (see :py:class:`Backend`),
+    so a program can write ANSI codes to a terminal and plain text (or HTML) to a file at the same time: ::
+
+        >>> console, log = ColorWriter(backend=ANSIBackend()), ColorWriter(open('/tmp/log.txt', 'w'), backend=PlainBackend())  # doctest: +SKIP
+
+    It is also a context manager (flushing when leaving it), useful for hot loops: ::
+
+        >>> with ColorWriter(flush='manual') as writer:  # doctest: +SKIP
+        ...     for i in range(1000):
+        ...         writer.write("<el><green>%i<reset> iterations done..." % i)
+    """
+
+    #: The valid flush policies.
+    policies = ('always', 'newline', 'size', 'time', 'manual')
+
+    def __init__(self, out=None, flush='always', size=65536, interval=0.05, left='<', right='>', erase=False, backend=None):
+        if flush not in self.policies:
+            raise ValueError("unknown flush policy %r, should be one of %s" % (flush, ', '.join(self.policies)))
+        _check_output(backend, out)
+        from time import time as clock
+        self._clock = clock
+        self.out = sys.stdout if out is None else out
+        self.policy = flush
+        self.size = size
+        self.interval = interval
+        self.left = left
+        self.right = right
+        self.erase = erase
+        self.backend = backend
+        self._buffer = []
+        self._buffered = 0
+        self._lastFlush = clock()
+
+    def write(self, chainWithTags):
+        """ Color the string ``chainWithTags`` (like :py:func:`sprint`), and buffer it (or write it, depending on the flush policy)."""
+        output = _render(chainWithTags, self.left, self.right, _eraseDict if self.erase else _colors(self.out) if self.backend is None else _substitution_of(self.backend))
+        self._buffer.append(output)
+        self._buffered += len(output)
+        policy = self.policy
+        if policy == 'always' \
+                or (policy == 'newline' and '\n' in output) \
+                or (policy == 'time' and self._clock() - self._lastFlush >= self.interval) \
+                or (policy != 'manual' and self._buffered >= self.size):
+            self.flush()
+
+    def writelines(self, chainsWithTags):
+        """ Write some strings, see :py:meth:`write`."""
+        for chainWithTags in chainsWithTags:
+            self.write(chainWithTags)
+
+    def flush(self):
+        """ Write all the buffered strings to ``out`` (in one call), and flush it."""
+        if self._buffer:
+            self.out.write(''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+        self.out.flush()
+        self._lastFlush = self._clock()
+
+    def close(self):
+        """ Flush the buffered strings (``out`` itself is **not** closed)."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# %% Live status lines
+
+class LiveLine(object):
+    """ LiveLine(out=sys.stdout, fps=30, left='<', right='>', erase=None) -> status line object.
+
+    A status line (e.g. a progress indicator), redrawn in place on the current line of ``out``, like with ``writec("<el>...")``, but much cheaper:
+
+    - the previous content of the line is kept, and only the **changed part of the line** is written again
+      (the cursor is moved back to the first changed character, with ``\\033[nD``, and the colors are restored if needed),
+    - nothing is written if the content did not change,
+    - the line is redrawn at most ``fps`` times by second: the updates coming too fast are kept, and drawn by the next one (or by :py:meth:`refresh`).
+
+    So on a slow terminal (e.g. through SSH), a counter updated thousands of times by second costs only a few bytes for each redraw: ::
+
+        >>> with LiveLine() as line:  # doctest: +SKIP
+        ...     for i in range(100000):
+        ...         line.update("<green>Processing<reset> file %d/100000..." % (i + 1))
+
+    The line starts from the default colors (:py:data:`reset`), and every character is assumed to use one column.
+    The content must fit on one line: no new line, and no tag moving the cursor (``el`` and ``clear`` are ignored).
+
+    If ``out`` does not support ANSI codes (see :py:func:`supports_ansi`), or if ``erase`` is ``True``, the line can not be redrawn:
+    each new content is then written as a new line without colors (still at most ``fps`` times by second).
+    """
+
+    def __init__(self, out=None, fps=30, left='<', right='>', erase=None):
+        from time import time as clock
+        self._clock = clock
+        self.out = sys.stdout if out is None else out
+        self.interval = 1.0 / fps if fps else 0
+        self.left = left
+        self.right = right
+        if erase is None:
+            erase = not supports_ansi(self.out)
+        self.erase = erase
+        substitution = _eraseDict if erase else colorDict
+        #: Substitution of the tags, without the ones moving the cursor.
+        self._substitution = dict(substitution, el='', clear='')
+        self._reset = substitution.get('reset', '')
+        #: The content on the screen: list of (escapes before it, character), and the escapes after the last character.
+        self._drawn = None
+        self._pending = None
+        #: Position of the cursor, and escapes written since the start of the line (so the current colors).
+        self._cursor = 0
+        self._pen = ''
+        self._lastDraw = 0
+        #: Number of characters written to ``out`` so far.
+        self.written = 0
+
+    def _cells(self, chainWithTags):
+        """ Split the content in a list of (colors, escapes before it, character), and the (colors, escapes) after the last character.
+
+        The colors are all the escapes since the start of the line (or since the last :py:data:`reset`), so two characters with the same colors look the same.
+        """
+        parts = _tag_pattern(self.left, self.right).split(chainWithTags)
+        values = _tag_values(parts, self._substitution, not self.erase)
+        reset = self._reset
+        cells = []
+        pen = escapes = ''
+        for index, part in enumerate(parts):
+            if index % 2:
+                escape = values[index // 2]
+                if reset and escape == reset:
+                    pen = escapes = ''
+                escapes += escape
+                pen += escape
+            else:
+                for character in part:
+                    cells.append((pen, escapes, character))
+                    escapes = ''
+        return cells, (pen, escapes)
+
+    def update(self, chainWithTags):
+        """ Change the content of the line. It is drawn now, or later if the last redraw is too recent."""
+        self._pending = chainWithTags
+        if self._clock() - self._lastDraw >= self.interval:
+            self.refresh()
+
+    def refresh(self):
+        """ Draw the last content given to :py:meth:`update`, if it is not drawn yet."""
+        if self._pending is None:
+            return
+        chainWithTags, self._pending = self._pending, None
+        self._lastDraw = self._clock()
+        new = self._cells(chainWithTags)
+        old = self._drawn
+        if new == old:
+            return
+        self._drawn = new
+        cells, trailing = new
+        if self.erase:
+            output = ''.join(character for _, _, character in cells) + '\n'
+        elif old is None:
+            output = '\r\033[K' + self._reset + ''.join(escapes + character for _, escapes, character in cells) + trailing[1]
+            self._cursor, self._pen = len(cells), trailing[0]
+        else:
+            oldCells, oldTrailing = old
+            # First changed character
+            first = 0
+            common = min(len(cells), len(oldCells))
+            while first < common and cells[first] == oldCells[first]:
+                first += 1
+            # Move the cursor there
+            cursor = self._cursor
+            if first == 0:
+                output = '\r'
+            elif first < cursor:
+                output = '\033[%dD' % (cursor - first)
+            elif first > cursor:
+                output = '\033[%dC' % (first - cursor)
+            else:
+                output = ''
+            # Restore the colors before the first changed character, if needed
+            pen = cells[first - 1][0] if first else ''
+            if pen != self._pen:
+                output += self._reset + pen
+            if len(cells) == len(oldCells) and trailing == oldTrailing:
+                # Same length: only overwrite the changed characters, the end of the line is still there
+                last = len(cells)
+                while cells[last - 1] == oldCells[last - 1]:
+                    last -= 1
+                output += ''.join(escapes + character for _, escapes, character in cells[first:last])
+                self._cursor, self._pen = last, cells[last - 1][0]
+            else:
+                output += ''.join(escapes + character for _, escapes, character in cells[first:]) + trailing[1]
+                if len(cells) < len(oldCells):
+                    output += '\033[K'
+                self._cursor, self._pen = len(cells), trailing[0]
+        self.out.write(output)
+        self.out.flush()
+        self.written += len(output)
+
+    def close(self):
+        """ Draw the last content, and end the line (with :py:data:`reset` and a new line), so the next outputs are written below."""
+        self.refresh()
+        if self._drawn is not None and not self.erase:
+            self.out.write(self._reset + '\n')
+            self.out.flush()
+            self.written += len(self._reset) + 1
+        self._drawn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# %% Writing from many threads
+
+class SharedColorWriter(object):
+    """ SharedColorWriter(out=sys.stdout, left='<', right='>', erase=None, backend=None) -> writer object.
+
+    A writer to share one output (e.g. ``sys.stdout``) between many threads, without mixing their colors:
+
+    - the strings are colored in the calling thread (with the same engine as :py:func:`sprint`),
+    - every record (one call to :py:meth:`write` or :py:meth:`printc`) is followed by :py:data:`reset`, and put in a queue (a :py:class:`collections.deque`, so without any lock),
+    - one background thread writes the waiting records, all together, so a record is never cut by another one.
+
+    The colors are used if ``out`` supports them (see :py:func:`supports_ansi`), unless ``erase`` is ``True`` (or ``False``), or a ``backend`` is given (see :py:class:`Backend`). ::
+
+        >>> import threading
+        >>> writer = SharedColorWriter()  # doctest: +SKIP
+        >>> def work(n):
+        ...     writer.printc("<green>Thread", n, "<reset>is done.")
+        >>> threads = [threading.Thread(target=work, args=(n, )) for n in range(8)]
+        >>> for thread in threads:  # doctest: +SKIP
+        ...     thread.start()
+        >>> for thread in threads:  # doctest: +SKIP
+        ...     thread.join()
+        >>> writer.close()  # Write all the waiting records, and stop the background thread  # doctest: +SKIP
+
+    If writing to ``out`` fails, the background thread stops, and its exception is raised again by the next call to :py:meth:`flush` or :py:meth:`close`.
+    A backend which writes the text itself (like :py:class:`WindowsConsoleBackend`) cannot be used, as it would write from the calling threads: it raises :py:exc:`ValueError`.
+    """
+
+    def __init__(self, out=None, left='<', right='>', erase=None, backend=None):
+        _check_output(backend, writer='SharedColorWriter')
+        import threading
+        self._threading = threading
+        self.out = sys.stdout if out is None else out
+        self.left = left
+        self.right = right
+        if erase is None:
+            erase = backend is None and not supports_ansi(self.out)
+        self._substitution = _eraseDict if erase else colorDict if backend is None else _substitution_of(backend)
+        #: Appended after every record (a backend ends every record by itself).
+        self._reset = '' if isinstance(self._substitution, Backend) else self._substitution.get('reset', '')
+        self._records = deque()
+        self._wakeup = threading.Event()
+        self.closed = False
+        #: The exception raised in the background thread, if any.
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='SharedColorWriter')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        """ Background thread: write the waiting records, or keep the exception raised, for :py:meth:`flush` and :py:meth:`close`."""
+        try:
+            self._write_records()
+        except BaseException as e:
+            self._error = e
+            # Wake up the threads waiting in flush()
+            for record in list(self._records):
+                if not isinstance(record, _stringTypes):
+                    record.set()
+
+    def _write_records(self):
+        """ Loop of the background thread, writing the waiting records."""
+        records = self._records
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            batch = []
+            while records:
+                record = records.popleft()
+                if isinstance(record, _stringTypes):
+                    batch.append(record)
+                else:  # An event set by flush(), once the previous records are written
+                    self._commit(batch)
+                    batch = []
+                    record.set()
+            self._commit(batch)
+            if self.closed and not records:
+                return
+
+    def _commit(self, batch):
+        """ Write and flush a batch of records."""
+        if batch:
+            self.out.write(''.join(batch))
+            self.out.flush()
+
+    def write(self, chainWithTags):
+        """ Color the string ``chainWithTags`` in the calling thread, and queue it (followed by :py:data:`reset`)."""
+        self._records.append(_render(chainWithTags, self.left, self.right, self._substitution) + self._reset)
+        self._wakeup.set()
+
+    def printc(self, chainWithTags, *objects, **kwargs):
+        """ printc(chainWithTags, *objects, left='<', right='>', sep=' ', end='\\n', erase=False) -> unit
+
+        Like :py:func:`printc`, but the line is queued as one record (with :py:data:`reset` before its end).
+        """
+        left = kwargs.pop('left') if 'left' in kwargs else self.left
+        right = kwargs.pop('right') if 'right' in kwargs else self.right
+        sep = kwargs.pop('sep') if 'sep' in kwargs else ' '
+        end = kwargs.pop('end') if 'end' in kwargs else '\n'
+        doerase = kwargs.pop('erase') if 'erase' in kwargs else False
+        if kwargs:
+            raise TypeError("printc() got unexpected keyword arguments: %s" % ', '.join(sorted(kwargs)))
+        objects = _render_objects((chainWithTags,) + objects, left, right, _eraseDict if doerase else self._substitution)
+        self._records.append(sep.join(str(s) for s in objects) + self._reset + end)
+        self._wakeup.set()
+
+    def _raise_error(self):
+        """ Raise again the exception of the background thread, if any."""
+        if self._error is not None:
+            raise self._error
+
+    def flush(self):
+        """ Wait until all the records queued before are written.
+
+        Raise :py:exc:`ValueError` if the writer is closed, or the exception of the background thread if it failed.
+        """
+        self._raise_error()
+        if self.closed:
+            raise ValueError("flush of a closed SharedColorWriter")
+        written = self._threading.Event()
+        self._records.append(written)
+        self._wakeup.set()
+        # The background thread can die (or be closed by another thread) before writing them
+        while not written.wait(0.05) and self._thread.is_alive():
+            pass
+        self._raise_error()
+
+    def close(self):
+        """ Write all the waiting records, and stop the background thread (``out`` itself is **not** closed). The records queued after are lost.
+
+        Raise the exception of the background thread if it failed.
+        """
+        if not self.closed:
+            self.closed = True
+            self._wakeup.set()
+            self._thread.join()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# %% Asynchronous writing
+
+class AsyncColorWriter(object):
+    """ AsyncColorWriter(writer=None, out=sys.stdout, left='<', right='>', erase=None, maxsize=64, encoding='utf-8', backend=None) -> writer object.
+
+    Like :py:class:`ColorWriter`, but for :py:mod:`asyncio` programs: the strings are colored (with the same engine as :py:func:`sprint`)
+    in the event loop, but written without blocking it:
+
+    - if ``writer`` is an :py:class:`asyncio.StreamWriter`, the strings are encoded (with ``encoding``) and written to it,
+      and :py:meth:`write` returns its :py:meth:`~asyncio.StreamWriter.drain` coroutine,
+    - otherwise they are written to the file object ``out`` by a background thread, in the right order.
+      At most ``maxsize`` writes are waiting in the queue of this thread: the strings written when it is full are joined, and queued together
+      when there is room again (so the queue is bounded even if the awaitables are ignored),
+      and awaiting :py:meth:`write` then waits until they are written (*backpressure*).
+      An exception raised when writing to ``out`` is raised again by the next call to :py:meth:`write`, :py:meth:`drain` or :py:meth:`close`.
+
+    The colors are used if the output supports them (see :py:func:`supports_ansi`), unless ``erase`` is ``True`` (or ``False``), or a ``backend`` is given (see :py:class:`Backend`,
+    but not one which writes the text itself, like :py:class:`WindowsConsoleBackend`: it raises :py:exc:`ValueError`).
+    It has to be created with a running event loop (or given one, with ``loop``): ::
+
+        >>> async def handler():  # doctest: +SKIP
+        ...     writer = AsyncColorWriter()
+        ...     await writer.write("<green>OK<reset> request handled\\n")
+        ...     await writer.close()
+    """
+
+    def __init__(self, writer=None, out=None, left='<', right='>', erase=None, maxsize=64, encoding='utf-8', loop=None, backend=None):
+        _check_output(backend, writer='AsyncColorWriter')
+        import asyncio
+        self._asyncio = asyncio
+        if loop is None:
+            loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+        self.loop = loop
+        self.writer = writer
+        self.out = sys.stdout if (out is None and writer is None) else out
+        self.left = left
+        self.right = right
+        self.maxsize = maxsize
+        self.encoding = encoding
+        if erase is None and backend is None:
+            destination = self.out if writer is None else writer.get_extra_info('pipe')
+            erase = destination is None or not supports_ansi(destination)
+        self._substitution = _eraseDict if erase else colorDict if backend is None else _substitution_of(backend)
+        self._executor = None
+        if writer is None:
+            from concurrent.futures import ThreadPoolExecutor
+            # Only one thread, so the strings are written in order
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        #: Number of writes in the queue of the thread.
+        self._queued = 0
+        #: Strings waiting for room in the queue, and the future set when they are written.
+        self._pending = []
+        self._pendingFuture = None
+        #: The first exception raised when writing to ``out``, not raised again yet.
+        self._error = None
+
+    def _future(self):
+        """ A new future of the event loop."""
+        return self.loop.create_future() if hasattr(self.loop, 'create_future') else self._asyncio.Future(loop=self.loop)
+
+    def _done(self):
+        """ An awaitable already done."""
+        future = self._future()
+        future.set_result(None)
+        return future
+
+    def _raise_error(self):
+        """ Raise (once) the exception raised when writing to ``out``, if any."""
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _submit(self, output, done=None):
+        """ Queue the writing of ``output`` in the thread, then set the future ``done`` (if any)."""
+        self._queued += 1
+        future = self.loop.run_in_executor(self._executor, self.out.write, output)
+        future.add_done_callback(lambda future: self._written(future, done))
+
+    def _written(self, future, done):
+        """ Called in the event loop when a write is done: keep its exception, and queue the pending strings."""
+        self._queued -= 1
+        error = future.exception() if not future.cancelled() else None
+        if error is not None and self._error is None:
+            self._error = error
+        if done is not None and not done.done():
+            done.set_result(None)
+        if self._pending and self._queued < self.maxsize:
+            self._submit_pending()
+
+    def _submit_pending(self):
+        """ Queue all the pending strings, in one write."""
+        output, done = ''.join(self._pending), self._pendingFuture
+        self._pending, self._pendingFuture = [], None
+        self._submit(output, done)
+
+    def _write(self, output):
+        """ Write an already colored string, and return an awaitable (see :py:meth:`write`)."""
+        self._raise_error()
+        if self.writer is not None:
+            self.writer.write(output.encode(self.encoding))
+            return self.writer.drain()
+        if self._pending or self._queued >= self.maxsize:
+            # The queue is full: wait for room, with the other pending strings
+            self._pending.append(output)
+            if self._pendingFuture is None:
+                self._pendingFuture = self._future()
+            return self._pendingFuture
+        self._submit(output)
+        return self._done()
+
+    def write(self, chainWithTags):
+        """ write(chainWithTags) -> awaitable
+
+        Color the string ``chainWithTags`` and write it (in the background). Awaiting the result waits only if too many strings are waiting to be written.
+        """
+        return self._write(_render(chainWithTags, self.left, self.right, self._substitution))
+
+    def _flush(self):
+        """ Queue the pending strings and a flush of ``out``, and return a future set when they are done, or with the exception raised when writing."""
+        if self._pending:
+            self._submit_pending()
+        done = self._future()
+
+        def flushed(future):
+            error = self._error or (future.exception() if not future.cancelled() else None)
+            self._error = None
+            if error is not None:
+                done.set_exception(error)
+            else:
+                done.set_result(None)
+        self.loop.run_in_executor(self._executor, self.out.flush).add_done_callback(flushed)
+        return done
+
+    def drain(self):
+        """ drain() -> awaitable
+
+        Wait until all the strings are written.
+        """
+        self._raise_error()
+        if self.writer is not None:
+            return self.writer.drain()
+        return self._flush()
+
+    def close(self):
+        """ close() -> awaitable
+
+        Write and flush all the strings, and stop the background thread (``out`` itself is **not** closed).
+        """
+        self._raise_error()
+        if self.writer is not None:
+            return self.writer.drain()
+        future = self._flush()
+        self._executor.shutdown(wait=False)
+        return future
+
+
+#: The default :py:class:`AsyncColorWriter` of each event loop and each output (weakly referenced if possible, or by its id), used by :py:func:`aprintc`.
+_asyncWriters = weakref.WeakKeyDictionary()
+
+
+def aprintc(chainWithTags, *objects, **kwargs):
+    """ aprintc(chainWithTags, *objects, left='<', right='>', sep=' ', end='\\n', erase=False, file=sys.stdout, writer=None) -> awaitable
+
+    Asynchronous version of :py:func:`printc`, for :py:mod:`asyncio` programs: ``await aprintc(...)`` colors its arguments exactly like :py:func:`printc`,
+    and writes them with the :py:class:`AsyncColorWriter` ``writer`` (default is one for the running event loop and the file ``file``), without blocking the event loop: ::
+
+        >>> async def handler(n):  # doctest: +SKIP
+        ...     await aprintc("<green>OK<reset> n =", n, "<blue>items<reset>")
+    """
+    left = kwargs.pop('left') if 'left' in kwargs else '<'
+    right = kwargs.pop('right') if 'right' in kwargs else '>'
+    sep = kwargs.pop('sep') if 'sep' in kwargs else ' '
+    end = kwargs.pop('end') if 'end' in kwargs else '\n'
+    doerase = kwargs.pop('erase') if 'erase' in kwargs else False
+    out = kwargs.pop('file') if 'file' in kwargs else None
+    writer = kwargs.pop('writer') if 'writer' in kwargs else None
+    if kwargs:
+        raise TypeError("aprintc() got unexpected keyword arguments: %s" % ', '.join(sorted(kwargs)))
+    if writer is None:
+        import asyncio
+        loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+        weakWriters, writers = _asyncWriters.setdefault(loop, (weakref.WeakKeyDictionary(), {}))
+        out = sys.stdout if out is None else out
+        try:
+            writer = weakWriters.get(out)
+            if writer is None:
+                # The writer only refers to out weakly, so out (and then its writer) can be garbage collected
+                writer = weakWriters[out] = AsyncColorWriter(out=weakref.proxy(out), left=left, right=right, loop=loop)
+        except TypeError:  # Not weakly referenceable: kept alive by its writer, so its id is not reused
+            if id(out) not in writers:
+                writers[id(out)] = AsyncColorWriter(out=out, left=left, right=right, loop=loop)
+            writer = writers[id(out)]
+    substitution = _eraseDict if doerase else writer._substitution
+    objects = _render_objects((chainWithTags,) + objects, left, right, substitution)
+    return writer._write(sep.join(str(s) for s in objects) + end)
+
+
+def clearScreen():
+    """ clearScreen() -> unit
+
+    **Try to** clear the screen using ANSI code :py:data:`clear`.
+    """
+    writec("<clear>")
+
+
+def clearLine():
+    """ clearLine() -> unit
+
+    **Try to** clear the current line using ANSI code :py:data:`el`.
+    """
+    writec("<el>")
+
+
+def Reset():
+    """ Reset() -> unit
+
+    **Try to** reset the current ANSI codes buffer, using :py:data:`reset`.
+    """
+    writec("<reset>")
+
+
+# Other tools for the interface
+
+def notify(msg="", obj="Notification sent by ansicolortags.notify", icon=None, verb=False):
+    """ notify(msg='', obj='Notification sent by ansicolortags.notify', icon=None, verb=False) -> bool
+
+    Notification using :py:mod:`subprocess` and ``notify-send`` (GNU/Linux command-line program).
+    Also print the informations directly to the screen (only if verb=True).
+
+    .. warning::
+
+       This does not use any *ANSI escape* codes, but the common *notify-send* GNU/Linux command line program.
+       It will probably fail (but cleanly) on Windows or Mac OS X.
+
+    - Return True if and only if the title have been correctly changed.
+    - Fails simply if ``notify-send`` is not found.
+    """
+    from subprocess import Popen
+    try:
+        if icon:
+            Popen(['notify-send', obj, msg, "--icon = %s/%s" % (os.getcwd(), icon)])
+            if verb:
+                print("ansicolortags.notify(): A notification have been sent, with obj = %s, msg = %s, and icon = %s." % (obj, msg, icon))
+        else:
+            Popen(['notify-send', obj, msg])
+            if verb:
+                print("ansicolortags.notify(): A notification have been sent, with obj = %s, and msg = %s." % (obj, msg))
+        return 0
+    except Exception as e:
+        if verb:
+            print("ansicolortags.notify(): notify-send : not-found ! Returned exception is %s." % e)
+        return -1
+
+
+def xtitle(new_title="", verb=False):
+    """ xtitle(new_title="", verb=False) -> 0 or 1
+
+    **Modify the current terminal title**.
+    Returns 0 if one of the two solutions worked, 1 otherwise.
+
+    An experimental try is with **ANSI escape code**,
+    if the simple way by calling the ``xtitle`` program does not work (or if it is not installed).
+
+    .. note::
+
+       The second solution simply uses the two *ANSI* Tags ``<title>`` (:py:data:`title`) and ``<bell>`` (:py:data:`bell`).
+       So, you can also do it with: ::
+
+           >>> ansicolortags.writec("<title>This is the new title of the terminal<bell>")
+
+
+    But this function *xtitle* is better: it tries two ways, and returns a signal to inform about his success.
+    """
+    from subprocess import Popen
+    try:
+        Popen(['xtitle', new_title])
         if verb:
             print("ansicolortags.xtitle(): The title of the current terminal has been set to '%s'." % new_title)
     except Exception as e:
@@ -768,10 +3627,99 @@ def xtitle(new_title="", verb=False):
     return 0
 
 
+# %% Exports of the color table
+
+#: Header of the files generated by :py:func:`export_colors` with the ``'sh'`` format (and by the ``--generate`` option).
+_shHeader = """#!/bin/sh
+#
+# From ansicolortags.py module, auto generated with the --generate command
+# More information on https://bitbucket.org/lbesson/ansicolortags.py/
+#
+# About the convention for the names of the colors :
+# * for the eight colors black, red, green, yellow, blue, magenta, cyan, white:
+#   + the name in minuscule is for color **with bold** (example 'yellow'),
+#   + the name starting with 'B' is for color **without bold** (example 'Byellow'),
+#   + the name starting with a capital letter is for the background color (example 'Yellow').
+# * for the special effects (blink, italic, bold, underline, negative), **not always supported** :
+#   + the name in minuscule is to **turn on** the effect,
+#   + the name starting in capital letter is to **turn off** the effect.
+# * for the other special effects (nocolors, default, Default, clear, el), the effect is **immediate** (and seems to be well supported).
+#
+# About
+# =====
+# Use this file .color.sh in other GNU Bash scripts, simply by sourcing it with:
+# $ [ -f ~/.color.sh ] && source ~/.color.sh
+# And then:
+# $ echo -e "${reset}French flag is ${blue}blue${reset}, ${white}white${reset}, ${red}red${reset}."
+#
+# Copyrigth
+# =========
+# (C) Lilian Besson, 2012-2017.
+#
+# List of colors
+# ==============
+"""
+
+#: The formats of :py:func:`export_colors`.
+exportFormats = ('sh', 'zsh', 'fish', 'json', 'python')
+
+
+def _ansi_c_quote(value, escapes=(('\\', '\\\\'), ("'", "\\'"), ('\x1b', '\\e'), ('\r', '\\r'), ('\007', '\\a'))):
+    """ Escape ``value`` to be used in a ``$'...'`` string (zsh), or in a single quoted string between ``\\e`` etc (fish, with other ``escapes``)."""
+    for character, escape in escapes:
+        value = value.replace(character, escape)
+    return value
+
+
+def _fish_quote(value):
+    """ Quote ``value`` for fish: the special characters are escaped outside of single quotes, the others are single quoted."""
+    special = {'\x1b': '\\e', '\r': '\\r', '\007': '\\a'}
+    return ''.join(special[part] if part in special else "'%s'" % part.replace('\\', '\\\\').replace("'", "\\'")
+                   for part in re.split('([\x1b\r\007])', value) if part) or "''"
+
+
+def export_colors(fmt='sh', colors=None):
+    """ export_colors(fmt='sh', colors=colorDict) -> string
+
+    Export the table of colors ``colors`` (by default, :py:data:`colorDict`) as a file in the format ``fmt``, one of :py:data:`exportFormats`:
+
+    - ``'sh'``: :code:`export NAME="VALUE"` lines for GNU Bash (to be used with ``echo -e``), the ``.color.sh`` file generated by ``--generate``,
+    - ``'zsh'``: :code:`export NAME=$'VALUE'` lines, where the variables contain the real escapes,
+    - ``'fish'``: :code:`set -gx NAME VALUE` lines, where the variables contain the real escapes,
+    - ``'json'``: a JSON object, mapping names to escapes,
+    - ``'python'``: a Python module defining ``colorTable``, a dictionary mapping names to escapes, to embed the colors without importing this module.
+
+    Nothing is printed, and nothing is detected (the escapes are always exported). ::
+
+        >>> print(export_colors('fish', {'red': colorDict['red']}).splitlines()[-1])
+        set -gx red \\e'[01;31m'
+    """
+    if colors is None:
+        colors = colorDict
+    if fmt == 'sh':
+        lines = ['export %s="%s"' % (name, value.replace('\x1b', '\\033').replace('\r', '\\r').replace('\007', '\\007'))
+                 for name, value in colors.items()]
+        return _shHeader + '\n'.join(lines) + '\n# DONE\n\n'
+    header = "Table of colors, generated by the ansicolortags.py module (version %s), with: python -m ansicolortags --generate --format %s" % (__version__, fmt)
+    if fmt == 'zsh':
+        lines = ["export %s=$'%s'" % (name, _ansi_c_quote(value)) for name, value in colors.items()]
+    elif fmt == 'fish':
+        lines = ["set -gx %s %s" % (name, _fish_quote(value)) for name, value in colors.items()]
+    elif fmt == 'json':
+        import json
+        return json.dumps(OrderedDict(colors.items()), indent=2) + '\n'
+    elif fmt == 'python':
+        return '# -*- coding: utf-8 -*-\n"""\n%s\n"""\n\n#: Mapping of the names of the tags to their ANSI codes.\ncolorTable = {\n%s}\n' % (
+            header, ''.join('    %r: %r,\n' % (str(name), str(value)) for name, value in colors.items()))
+    else:
+        raise ValueError("unknown format %r, should be one of %s" % (fmt, ', '.join(exportFormats)))
+    return '# %s\n%s\n' % (header, '\n'.join(lines))
+
+
 # %% Script part
 
-def _generate_color_sh(file_name=None):
-    """ _generate_color_sh(file_name=None) -> string | unit.
+def _generate_color_sh(file_name=None, fmt='sh'):
+    """ _generate_color_sh(file_name=None, fmt='sh') -> string | unit.
 
     Used to print or generate (if file_name is present and is a valid URI address)
     a profile of all the colors defined in this file.
@@ -781,6 +3729,8 @@ def _generate_color_sh(file_name=None):
     and now you can easily colorized your Bash script with :code:`. color.sh` to import all colors.
 
     The file is a list of :code:`export NAME="VALUE"`, to be used with GNU Bash.
+    Other formats can be used (``fmt``), see :py:func:`export_colors`.
+    The listing of the colors is animated only when writing to a file from a terminal.
 
 
     .. note::
@@ -813,70 +3763,90 @@ def _generate_color_sh(file_name=None):
 
           [ -f ~/.color.sh ] && . ~/.color.sh
     """
-    if file_name:
+    if file_name and getattr(sys.stdout, 'isatty', lambda: False)():
+        from time import sleep
         writec("<green> The file %s is creating.<reset> (C) Lilian Besson, 2012-2017.\t" % file_name)
-    writec("<blue><u>Listing of all ANSI colors...<reset>")
-    sleep(0.5)
-    writec("<el>...")
-    for s in colorList:
-        writec("<green><u>%s<reset>..." % s)
-        sleep(0.05)
+        writec("<blue><u>Listing of all ANSI colors...<reset>")
+        sleep(0.5)
         writec("<el>...")
-    writec("<reset>Listing of all ANSI colors...><red><u> DONE !<reset>...")
-    sleep(0.5)
-    writec("<el>")
+        for s in colorList:
+            writec("<green><u>%s<reset>..." % s)
+            sleep(0.05)
+            writec("<el>...")
+        writec("<reset>Listing of all ANSI colors...><red><u> DONE !<reset>...")
+        sleep(0.5)
+        writec("<el>")
     if file_name:
         mfile = open(file_name, 'w')
     else:
         mfile = sys.stdout
-    mfile.write("""#!/bin/sh
-#
-# From ansicolortags.py module, auto generated with the --generate command
-# More information on https://bitbucket.org/lbesson/ansicolortags.py/
-#
-# About the convention for the names of the colors :
-# * for the eight colors black, red, green, yellow, blue, magenta, cyan, white:
-#   + the name in minuscule is for color **with bold** (example 'yellow'),
-#   + the name starting with 'B' is for color **without bold** (example 'Byellow'),
-#   + the name starting with a capital letter is for the background color (example 'Yellow').
-# * for the special effects (blink, italic, bold, underline, negative), **not always supported** :
-#   + the name in minuscule is to **turn on** the effect,
-#   + the name starting in capital letter is to **turn off** the effect.
-# * for the other special effects (nocolors, default, Default, clear, el), the effect is **immediate** (and seems to be well supported).
-#
-# About
-# =====
-# Use this file .color.sh in other GNU Bash scripts, simply by sourcing it with:
-# $ [ -f ~/.color.sh ] && source ~/.color.sh
-# And then:
-# $ echo -e "${reset}French flag is ${blue}blue${reset}, ${white}white${reset}, ${red}red${reset}."
-#
-# Copyrigth
-# =========
-# (C) Lilian Besson, 2012-2017.
-#
-# List of colors
-# ==============
-""")
-    # FIXED it appeared to be failing on Python 3, now with this colorDict it works very well!
-    res = ""
-    for s in colorDict:
-        res = colorDict[s]
-        # print("""DEBUG: exec("res = ('%%s' %% %s)""" % s.replace('\x1b', '\\\\x1b'))
-        # exec("res = ('%%s' %% %s)" % s.replace('\x1b', '\\\\x1b'))  # Bad to use exec !
-        # Unescaping special characters.
-        res = res.replace('\x1b', '\\033').replace('\r', '\\r').replace('\007', '\\007')
-        # print("DEBUG 1: res =", res)
-        mfile.write("export %s=\"%s\"\n" % (s, res))
-        # print("""DEBUG 2: mfile.write("export %s=\\"%s\\"\\n" """ % (s, res))
-        # mfile.write("export %s=\"%s\"\n" % (s, (r"%s" % res)))
-        # the r"%s" above is important ?
-    mfile.write("# DONE\n\n")
+    mfile.write(export_colors(fmt))
     if file_name:
         writec("<green> The file %s have been creating.<reset> (C) Lilian Besson 2012-2017.\n" % file_name)
         sys.exit(0)
 
 
+def _filter_files(file_names=(), erase=False, left='<', right='>', blocksize=1 << 20, jobs=1, mmap=False, html=None):
+    """ _filter_files(file_names=(), erase=False, left='<', right='>', blocksize=1 << 20, jobs=1, mmap=False, html=None) -> unit.
+
+    Used by the ``--render`` and ``--strip`` options: read the files ``file_names`` (or the standard input, also named ``-``) by blocks of ``blocksize`` bytes,
+    and write them to the standard output, with their color tags interpreted by :py:func:`sprint` (or erased by :py:func:`erase` if ``erase=True``).
+
+    The input is read and written in binary mode, with an output buffer of ``blocksize`` bytes, and it is rendered as bytes (see :py:func:`sprint_bytes`),
+    so this is almost as fast as :code:`cat`. Bytes which are not valid UTF-8 are kept unmodified.
+
+    With ``jobs > 1``, the blocks are rendered in parallel by ``jobs`` processes, see :py:func:`iter_render_parallel`.
+    With ``mmap=True``, the files (but not the standard input) are mapped in memory instead, see :py:func:`sprint_file`.
+    With ``html='class'`` or ``html='style'``, the files are rendered to HTML instead, by only one process, see :py:func:`iter_sprint_html`.
+    """
+    import codecs
+    import io
+    errors = 'surrogateescape' if sys.version_info >= (3, ) else 'strict'
+    sys.stdout.flush()
+    out = io.open(sys.stdout.fileno(), 'wb', buffering=blocksize, closefd=False)
+    for file_name in (file_names or ['-']):
+        if file_name == '-':
+            inp = getattr(sys.stdin, 'buffer', sys.stdin)
+        elif mmap and not html:
+            _render_file(file_name, out, left=left, right=right, escapes=None if erase else _encoded_colors(colorDict))
+            continue
+        else:
+            inp = io.open(file_name, 'rb')
+        decoder = codecs.getincrementaldecoder('utf-8')(errors)
+        try:
+            if html:
+                chunks = (decoder.decode(block) for block in iter(lambda: inp.read(blocksize), b''))
+                for output in iter_sprint_html(chunks, left=left, right=right, mode=html):
+                    out.write(output.encode('utf-8', errors))
+                out.write(decoder.decode(b'', True).encode('utf-8', errors))
+            elif jobs > 1:
+                chunks = (decoder.decode(block) for block in iter(lambda: inp.read(blocksize), b''))
+                for output in iter_render_parallel(chunks, left=left, right=right, erase=erase, jobs=jobs, blocksize=4 * blocksize):
+                    out.write(output.encode('utf-8', errors))
+                out.write(decoder.decode(b'', True).encode('utf-8', errors))
+            else:
+                escapes = None if erase else _encoded_colors(colorDict)
+                # The tags can be closed in a later block
+                style = None if erase else _StyleStack()
+                pattern = _tag_pattern_bytes(left, right)
+                maxlen = len(left.encode('utf-8')) + _maxTagNameLength + len(right.encode('utf-8'))
+                pending = b''
+                for block in iter(lambda: inp.read(blocksize), b''):
+                    # The end of the block is kept as long as it may be the beginning of a tag
+                    text = pending + block if pending else block
+                    cut = _safe_cut(text, pattern, maxlen)
+                    if cut <= 0:
+                        pending = text
+                        continue
+                    pending = text[cut:]
+                    _render_bytes(memoryview(text)[:cut], left, right, escapes, out, style)
+                _render_bytes(pending, left, right, escapes, out, style)
+        finally:
+            if inp is not getattr(sys.stdin, 'buffer', sys.stdin):
+                inp.close()
+    out.flush()
+
+
 def _run_complete_tests():
     """ _run_complete_tests() -> unit.
 
@@ -895,7 +3865,7 @@ if __name__ == '__main__':
     #:  * erase: to print with no colors.
     #:  * sprint: to print with colors.
     # preprocessor = __builtin__.str, if you wanna to *see* the tags.
-    mypreprocessor = sprint if ANSISupported else erase
+    mypreprocessor = sprint if supports_ansi(sys.stdout) else erase
     #: Generate the parser, with another module.
     myparser = _parser_default(
         description='<green>ANSI Colors utility <red>module<reset> and <blue>script<reset> (ansicolortags.py).',
@@ -926,12 +3896,24 @@ The reference page for ANSI code is : <u>https://en.wikipedia.org/wiki/ANSI_esca
     #: So, here become the interesting part.
     group = myparser.add_mutually_exclusive_group()
     group.add_argument("-t", "--test", help="Launch a complete test of all ANSI Colors code defined here.", action="store_true")
+    group.add_argument("-r", "--render", "--filter", help="Read the files FILE (or the standard input), and write them on the standard output with their color tags interpreted.", action="store_true")
+    group.add_argument("-s", "--strip", help="Read the files FILE (or the standard input), and write them on the standard output with their color tags erased.", action="store_true")
+    group.add_argument("--html", help="Read the files FILE (or the standard input), and write them on the standard output as HTML.", action="store_true")
+
+    #: Options for --render and --strip.
+    group = myparser.add_argument_group('Filtering of texts with color tags (--render, --strip and --html)')
+    group.add_argument("files", nargs='*', metavar='FILE', help="Files to read, with --render, --strip or --html options (default is '-', the standard input).")
+    group.add_argument("-j", "--jobs", type=int, default=1, metavar='N', help="Number of processes used to render the files (default is 1).")
+    group.add_argument("-m", "--mmap", help="Map the files in memory instead of reading them (faster for huge files).", action="store_true")
+    group.add_argument("--html-mode", choices=htmlModes, default='class', help="With --html, use CSS classes or inline styles (default is 'class').")
+    group.add_argument("-d", "--delimiters", nargs=2, metavar=('LEFT', 'RIGHT'), default=('<', '>'), help="Delimiters of the tags (default is '<' and '>').")
 
     #: Description for the part with '--file' and '--generate' options.
     group = myparser.add_argument_group('Generation of a GNU Bash color aliases file')
     # Add lats two options
     group.add_argument("-g", "--generate", help="Print all ANSI Colors as 'export name=\"value\"'.", action="store_true")  # , required = True)
     group.add_argument("-f", "--file", help="If present, and with --generate option, don't print the values, but export them in the file FILE (e.g. FILE = ~/.color.sh)", default=None)
+    group.add_argument("--format", choices=exportFormats, default='sh', help="Format of the generated file (default is 'sh').")
 
     #: The parser is done.
     #: Use it to extract the args from the command line.
@@ -940,13 +3922,19 @@ The reference page for ANSI code is : <u>https://en.wikipedia.org/wiki/ANSI_esca
     #: Use those args.
     if args.generate:
         if args.file:
-            _generate_color_sh(args.file)
+            _generate_color_sh(args.file, fmt=args.format)
         else:
-            _generate_color_sh()
+            _generate_color_sh(fmt=args.format)
             sys.exit(0)
     if args.test:
         _run_complete_tests()
         sys.exit(0)
+    if args.render or args.strip:
+        _filter_files(args.files, erase=args.strip or not supports_ansi(sys.stdout), left=args.delimiters[0], right=args.delimiters[1], jobs=args.jobs, mmap=args.mmap)
+        sys.exit(0)
+    if args.html:
+        _filter_files(args.files, left=args.delimiters[0], right=args.delimiters[1], html=args.html_mode)
+        sys.exit(0)
     # Otherwise, print help and exit
     myparser.print_help()
     sys.exit(1)
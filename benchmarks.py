@@ -0,0 +1,643 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+Benchmarks for the ansicolortags module.
+
+- ``python benchmarks.py run``: run the benchmarks of the workloads (see :py:data:`WORKLOADS`),
+  and print their latency percentiles, throughput and memory allocations.
+  All the workloads are run ``--rounds`` times, one round of each after the other, and the round with the best median is kept for each of them,
+  so a round disturbed by another process is ignored.
+  With ``--save FILE``, save the results in a JSON file; with ``--compare FILE``, compare them to a previous run
+  (like the reference file ``benchmarks-baseline.json``) and fail if the median time of one workload is more than ``--threshold`` times its reference
+  (the workloads missing from the reference are only listed: save it again to add them).
+
+- ``python benchmarks.py scaling``: measure :py:func:`ansicolortags.sprint` and :py:func:`ansicolortags.erase` on logs of growing sizes
+  (from 1 kB to 100 MB by default, ``--sizes 0.001 1 10`` in MB for instance), to check that their time grows linearly.
+
+- ``python benchmarks.py pertag``: measure the cost of each tag on a tag-dense input (``--tags`` tags),
+  with the original algorithm (two ``split`` and a scan of a list of names, see :py:func:`split_sprint`) and with :py:func:`ansicolortags.sprint`.
+
+- ``python benchmarks.py syscalls``: count the calls to ``write`` and ``flush`` (the system calls of a real file) needed to write ``--lines`` colored lines,
+  with :py:func:`ansicolortags.writec` and with :py:class:`ansicolortags.ColorWriter` and each of its flush policies.
+
+- ``python benchmarks.py parallel``: measure the scaling of :py:func:`ansicolortags.render_parallel` on a long log (``--size`` MB),
+  from 1 to N processes (``--jobs 1 2 4 8`` for instance).
+
+- ``python benchmarks.py mmap``: measure the erasure of the tags of a huge synthetic file (``--size`` MB, 5 GB by default),
+  with :py:func:`ansicolortags.erase_file` (memory-mapped) and with the command line filter, with or without ``--mmap``.
+
+- ``python benchmarks.py threads``: measure the throughput of :py:class:`ansicolortags.SharedColorWriter`, from 1 to 64 threads
+  (``--threads 1 4 16`` for instance), against :py:func:`ansicolortags.printc` protected by a lock.
+
+- ``python benchmarks.py importtime``: measure the time needed to import the module, with ``python -X importtime`` (Python 3.7+),
+  and fail if it is over the budget (in milliseconds, option ``--budget``).
+
+All the timings use :py:func:`timeit.default_timer`, and the allocations are measured with :py:mod:`tracemalloc` (Python 3.4+).
+
+.. (c) Lilian Besson 2012-2017
+"""
+
+from __future__ import print_function, division
+
+import atexit
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from timeit import default_timer
+
+#: The directory of this file, containing ansicolortags.py.
+_directory = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _directory)
+
+import ansicolortags  # noqa: E402
+
+#: Default budget for the import time of the module, in milliseconds (it includes the import of its dependencies, like re).
+IMPORT_BUDGET_MS = 15.0
+
+#: The reference results, used by ``--compare`` by default.
+BASELINE = os.path.join(_directory, 'benchmarks-baseline.json')
+
+
+# %% Inputs
+
+#: A short string, with a lot of tags.
+denseText = "<reset><green>OK<reset> <b>GET<B> /api/v1/<u>users<U> in <blue>12 ms<reset> <yellow>[cache]<reset> <red>!<reset>"
+
+#: The same kind of string, with nested closing tags.
+nestedText = "<green>OK</green> <b>GET <u>/api/v1/<blue>users</blue></u></b> in <blue>12 <italic>ms</italic></blue> <yellow>[cache <red>!</red>]</yellow>"
+
+#: One line of a log, with only a few tags.
+logLine = "2017-08-09T10:33:39 worker-3 processed request 4f2a9c in 12 ms, payload of 2048 bytes, everything is fine\n"
+
+#: A long log (about 1 MB), with only a few tags.
+longLog = ''.join(("<green>OK<reset> " + logLine) if i % 16 == 0 else logLine for i in range(10000))
+
+
+def _sprint_dense():
+    return ansicolortags.sprint(denseText)
+
+
+def _sprint_nested():
+    return ansicolortags.sprint(nestedText)
+
+
+def _sprint_long():
+    return ansicolortags.sprint(longLog)
+
+
+def _html_long():
+    return ansicolortags.sprint_html(longLog)
+
+
+def _erase_long():
+    return ansicolortags.erase(longLog)
+
+
+def _optimize_dense():
+    return ansicolortags.optimize_escapes(ansicolortags.sprint(denseText))
+
+
+_delimitedText = denseText.replace('<', '[[').replace('>', ']]')
+
+
+def _sprint_delimiters():
+    return ansicolortags.sprint(_delimitedText, left='[[', right=']]')
+
+
+longLogBytes = longLog.encode('utf-8')
+
+
+def _sprint_bytes_long():
+    return ansicolortags.sprint_bytes(longLogBytes)
+
+
+#: The long log, colored (computed once, when ANSI codes are forced).
+_coloredLog = []
+
+
+def _colored_log():
+    if not _coloredLog:
+        _coloredLog.append(ansicolortags.sprint(longLog))
+    return _coloredLog[0]
+
+
+def _from_ansi_long():
+    return ansicolortags.from_ansi(_colored_log())
+
+
+def _strip_ansi_long():
+    return ansicolortags.strip_ansi(_colored_log())
+
+
+#: Cells of a table (20000 cells, many of them identical).
+tableCells = [("<green>OK<reset>", "<red>KO<reset>", "<b>%d<B>" % (i % 300), "row %d" % i)[i % 4] for i in range(20000)]
+
+
+def _sprint_cells_loop():
+    return [ansicolortags.sprint(cell) for cell in tableCells]
+
+
+def _sprint_many_cells():
+    return ansicolortags.sprint_many(tableCells)
+
+
+_devnull = io.StringIO()
+
+
+def _printc_arguments():
+    _devnull.seek(0)
+    _devnull.truncate()
+    ansicolortags.printc("<green>OK<reset>", 17, "<blue>items", 1 + 5j, "<reset>in", 12.5, "<u>ms<U>", None, "<red>!<reset>", file=_devnull)
+
+
+class _Pipe(object):
+    """ A pipe, emptied by a thread, to write to it like to a real slow output."""
+
+    def __init__(self):
+        read, write = os.pipe()
+        self.reader = os.fdopen(read, 'rb')
+        self.writer = os.fdopen(write, 'w')
+        self.thread = threading.Thread(target=self._drain)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _drain(self):
+        while self.reader.read(1 << 16):
+            pass
+
+
+_pipe = None
+
+
+def _writec_pipe():
+    global _pipe
+    if _pipe is None:
+        _pipe = _Pipe()
+    ansicolortags.writec("<el><green>%d<reset> files processed..." % 42, out=_pipe.writer)
+
+
+_cliFile = None
+
+
+def _cli_render():
+    global _cliFile
+    if _cliFile is None:
+        _cliFile = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False)
+        for _ in range(10):
+            _cliFile.write(longLog)
+        _cliFile.close()
+        atexit.register(os.remove, _cliFile.name)
+    with open(os.devnull, 'wb') as devnull:
+        subprocess.check_call([sys.executable, os.path.join(_directory, 'ansicolortags.py'), '--render', '--ANSI', _cliFile.name], stdout=devnull)
+
+
+#: All the workloads: name -> (function, size in characters of its input, number of calls).
+WORKLOADS = {
+    'sprint-dense': (_sprint_dense, len(denseText), 20000),
+    'sprint-nested': (_sprint_nested, len(nestedText), 20000),
+    'sprint-long-log': (_sprint_long, len(longLog), 50),
+    'erase-long-log': (_erase_long, len(longLog), 50),
+    'html-long-log': (_html_long, len(longLog), 50),
+    'from-ansi-long-log': (_from_ansi_long, len(longLog), 50),
+    'strip-ansi-long-log': (_strip_ansi_long, len(longLog), 50),
+    'sprint-bytes-long-log': (_sprint_bytes_long, len(longLogBytes), 50),
+    'optimize-dense': (_optimize_dense, len(denseText), 20000),
+    'sprint-delimiters': (_sprint_delimiters, len(_delimitedText), 20000),
+    'sprint-cells-loop': (_sprint_cells_loop, sum(len(cell) for cell in tableCells), 20),
+    'sprint-many-cells': (_sprint_many_cells, sum(len(cell) for cell in tableCells), 20),
+    'printc-arguments': (_printc_arguments, 0, 20000),
+    'writec-pipe': (_writec_pipe, 0, 20000),
+    'cli-render': (_cli_render, 10 * len(longLog), 5),
+}
+
+
+# %% Measures
+
+def _percentile(sortedValues, percent):
+    """ Nearest-rank percentile of a sorted list."""
+    index = min(len(sortedValues) - 1, int(round(percent / 100.0 * (len(sortedValues) - 1))))
+    return sortedValues[index]
+
+
+def _allocations(function):
+    """ Peak of memory allocated (in kB) by one call of function, or None if tracemalloc is not available."""
+    try:
+        import tracemalloc
+    except ImportError:
+        return None
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+
+def bench_workload(name, scale=1.0):
+    """ bench_workload(name, scale=1.0) -> dict
+
+    Run the workload ``name`` (``scale`` times its default number of calls), and return its results:
+    latency percentiles, mean and minimum (in microseconds), throughput (in MB/s, if it has an input) and allocations (peak in kB).
+    """
+    function, size, number = WORKLOADS[name]
+    number = max(3, int(number * scale))
+    function()  # warm up: compile the tag scanners, fill the caches etc
+    timings = []
+    for _ in range(number):
+        start = default_timer()
+        function()
+        timings.append(default_timer() - start)
+    total = sum(timings)
+    timings.sort()
+    return {
+        'calls': number,
+        'min_us': 1e6 * timings[0],
+        'mean_us': 1e6 * total / number,
+        'p50_us': 1e6 * _percentile(timings, 50),
+        'p90_us': 1e6 * _percentile(timings, 90),
+        'p99_us': 1e6 * _percentile(timings, 99),
+        'mb_per_s': (size * number / total / 1e6) if size else None,
+        'peak_kb': _allocations(function),
+    }
+
+
+def bench_workloads(names, scale=1.0, rounds=5):
+    """ bench_workloads(names, scale=1.0, rounds=5) -> dict
+
+    Run all the workloads ``names`` (see :py:func:`bench_workload`) ``rounds`` times, one round of each after the other,
+    and keep the results of the round with the best median for each of them:
+    a slow period of the machine (another process, a change of frequency) spoils only one round of each workload.
+    """
+    results = {}
+    for _ in range(max(1, rounds)):
+        for name in names:
+            result = bench_workload(name, scale=scale)
+            if name not in results or result['p50_us'] < results[name]['p50_us']:
+                results[name] = result
+    for result in results.values():
+        result['rounds'] = max(1, rounds)
+    return results
+
+
+def bench_importtime(repeat=7):
+    """ bench_importtime(repeat=7) -> float
+
+    Smallest cumulative time (in milliseconds) to import ansicolortags, measured with ``python -X importtime`` in ``repeat`` fresh interpreters.
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPATH'] = _directory
+    times = []
+    for _ in range(repeat + 1):
+        output = subprocess.check_output([sys.executable, '-X', 'importtime', '-c', 'import ansicolortags'],
+                                         stderr=subprocess.STDOUT, env=env, cwd=_directory)
+        for line in output.decode('utf-8').splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == 'ansicolortags':
+                times.append(int(fields[1]) / 1000.0)
+    # The first one also compiled the module
+    return min(times[1:])
+
+
+def _log_of_size(size):
+    """ A log of about ``size`` MB (at least one line), made of the lines of :py:data:`longLog`."""
+    lines = longLog.splitlines(True)
+    count = max(1, int(size * 1e6 / len(longLog) * len(lines)))
+    whole, rest = divmod(count, len(lines))
+    return longLog * whole + ''.join(lines[:rest])
+
+
+def bench_scaling(sizes=(0.001, 0.01, 0.1, 1, 10, 100)):
+    """ bench_scaling(sizes=(0.001, 0.01, 0.1, 1, 10, 100)) -> list of (size in MB, seconds for sprint, seconds for erase)
+
+    Best time of :py:func:`ansicolortags.sprint` and :py:func:`ansicolortags.erase` on a log of about each of ``sizes`` MB
+    (repeated a few times on the small ones): the time per MB must stay about constant, the scan of the tags is linear.
+    """
+    results = []
+    for size in sizes:
+        text = _log_of_size(size)
+        number = max(1, min(1000, int(1.0 / size)))
+        timings = []
+        for function in (ansicolortags.sprint, ansicolortags.erase):
+            function(text)  # warm up
+            best = None
+            for _ in range(3 if size < 50 else 1):
+                start = default_timer()
+                for _ in range(number):
+                    function(text)
+                elapsed = (default_timer() - start) / number
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best)
+        results.append((len(text) / 1e6, timings[0], timings[1]))
+    return results
+
+
+#: The list of the tag names, scanned for each piece of the text by the original algorithm.
+_nameList = list(ansicolortags.colorList)
+
+
+def split_sprint(chainWithTags, left='<', right='>'):
+    """ split_sprint(chainWithTags, left='<', right='>') -> string
+
+    The original algorithm of :py:func:`ansicolortags.sprint` (before the single-pass scanner and the registry of the tags),
+    kept only as a reference for the benchmarks: split on ``left``, then on ``right``, and look each name up in a list.
+    """
+    ls = chainWithTags.split(left)
+    lls = list()
+    for s2 in ls:
+        inte = s2.split(right)
+        if inte[0] in _nameList:
+            inte[0] = ansicolortags.colorDict[inte[0]]
+        else:
+            if len(inte) > 1:
+                inte[0] = left + inte[0] + right
+        lls.append(inte)
+    res = ""
+    for llsii in lls:
+        for llsiij in llsii:
+            res += llsiij
+    return res
+
+
+def bench_pertag(tags=100000, repeat=5):
+    """ bench_pertag(tags=100000, repeat=5) -> list of (method, nanoseconds per tag)
+
+    Best time per tag (over ``repeat`` runs) on a tag-dense input of about ``tags`` tags,
+    for the original algorithm :py:func:`split_sprint`, and for :py:func:`ansicolortags.sprint` and :py:func:`ansicolortags.erase`.
+    """
+    text = denseText * max(1, tags // denseText.count('<'))
+    count = text.count('<')
+    results = []
+    for name, function in (('split/split (before)', split_sprint), ('sprint', ansicolortags.sprint), ('erase', ansicolortags.erase)):
+        function(text)  # warm up
+        best = None
+        for _ in range(repeat):
+            start = default_timer()
+            function(text)
+            elapsed = default_timer() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append((name, 1e9 * best / count))
+    return results
+
+
+class _CountingFile(object):
+    """ A fake file object, counting the calls to its methods ``write`` and ``flush`` (each one would be a system call on a real unbuffered file)."""
+
+    def __init__(self):
+        self.writes = 0
+        self.flushes = 0
+        self.size = 0
+
+    def write(self, data):
+        self.writes += 1
+        self.size += len(data)
+
+    def flush(self):
+        self.flushes += 1
+
+
+def bench_syscalls(lines=10000, size=65536):
+    """ bench_syscalls(lines=10000, size=65536) -> list of (method, writes, flushes, seconds)
+
+    Number of calls to ``write`` and ``flush`` of a fake file, and time, to write ``lines`` short colored lines
+    with :py:func:`ansicolortags.writec`, and with a :py:class:`ansicolortags.ColorWriter` for each flush policy (buffering at most ``size`` characters).
+    """
+    chains = ["<green>%d<reset> files processed in <blue>12 ms<reset>\n" % i for i in range(lines)]
+    results = []
+    out = _CountingFile()
+    start = default_timer()
+    for chain in chains:
+        ansicolortags.writec(chain, out=out)
+    results.append(('writec', out.writes, out.flushes, default_timer() - start))
+    for policy in ansicolortags.ColorWriter.policies:
+        out = _CountingFile()
+        start = default_timer()
+        with ansicolortags.ColorWriter(out, flush=policy, size=size) as writer:
+            for chain in chains:
+                writer.write(chain)
+        results.append(('ColorWriter ' + policy, out.writes, out.flushes, default_timer() - start))
+    return results
+
+
+def bench_parallel(size=64, jobs=(1, 2, 4), erase=True):
+    """ bench_parallel(size=64, jobs=(1, 2, 4), erase=True) -> list of (jobs, seconds)
+
+    Time of :py:func:`ansicolortags.render_parallel` on a log of about ``size`` MB, for each number of processes in ``jobs``.
+    """
+    text = longLog * max(1, int(size * 1e6 / len(longLog)))
+    results = []
+    for number in jobs:
+        start = default_timer()
+        ansicolortags.render_parallel(text, erase=erase, jobs=number)
+        results.append((number, default_timer() - start))
+    return results
+
+
+def bench_mmap(size=5000, blocksize=1 << 18):
+    """ bench_mmap(size=5000, blocksize=1 << 18) -> list of (method, seconds, peak of memory allocated in kB)
+
+    Time needed to erase the tags of a synthetic log of about ``size`` MB (written in a temporary file, and removed after),
+    with :py:func:`ansicolortags.erase_file` and :py:func:`ansicolortags.sprint_file` (memory-mapped),
+    and with the command line filter ``--strip``, reading the file by blocks or mapping it in memory (``--mmap``).
+    """
+    block = longLogBytes * 16
+    with tempfile.NamedTemporaryFile(suffix='.log', delete=False) as logFile:
+        for _ in range(max(1, int(size * 1e6 / len(block)))):
+            logFile.write(block)
+    results = []
+    try:
+        with open(os.devnull, 'wb') as devnull:
+            for name, function in (('erase_file', ansicolortags.erase_file), ('sprint_file', ansicolortags.sprint_file)):
+                start = default_timer()
+                function(logFile.name, devnull, blocksize=blocksize)
+                elapsed = default_timer() - start
+                # Measured on another run, tracemalloc slows down the allocations
+                results.append((name, elapsed, _allocations(lambda: function(logFile.name, devnull, blocksize=blocksize))))
+            for name, options in (('--strip', []), ('--strip --mmap', ['--mmap'])):
+                start = default_timer()
+                subprocess.check_call([sys.executable, os.path.join(_directory, 'ansicolortags.py'), '--strip'] + options + [logFile.name], stdout=devnull)
+                results.append((name, default_timer() - start, None))
+    finally:
+        os.remove(logFile.name)
+    return results
+
+
+def _run_threads(threads, records, work):
+    """ Time of ``threads`` threads, each calling ``work(i)`` for about ``records / threads`` values of ``i``."""
+    def target():
+        for i in range(records // threads):
+            work(i)
+    workers = [threading.Thread(target=target) for _ in range(threads)]
+    start = default_timer()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return default_timer() - start
+
+
+def bench_threads(records=200000, threads=(1, 2, 4, 8, 16, 32, 64)):
+    """ bench_threads(records=200000, threads=(1, 2, 4, 8, 16, 32, 64)) -> list of (threads, seconds with a SharedColorWriter, seconds with a lock)
+
+    Time needed to write ``records`` colored lines to a pipe from each number of ``threads``,
+    with one :py:class:`ansicolortags.SharedColorWriter`, and with :py:func:`ansicolortags.printc` protected by a lock.
+    """
+    pipe = _Pipe()
+    lock = threading.Lock()
+
+    def locked(i):
+        with lock:
+            ansicolortags.printc("<green>OK<reset> request", i, "<blue>in", 12, "ms<reset>", file=pipe.writer)
+            pipe.writer.flush()
+
+    results = []
+    for number in threads:
+        writer = ansicolortags.SharedColorWriter(out=pipe.writer)
+
+        def shared(i):
+            writer.printc("<green>OK<reset> request", i, "<blue>in", 12, "ms<reset>")
+        sharedTime = _run_threads(number, records, shared)
+        start = default_timer()
+        writer.close()  # Wait for the records still in the queue
+        sharedTime += default_timer() - start
+        results.append((number, sharedTime, _run_threads(number, records, locked)))
+    return results
+
+
+# %% Reports
+
+def _format(value, pattern="%10.2f"):
+    return (" " * 10) if value is None else (pattern % value)
+
+
+def report(results, baseline=None):
+    """ Print the results (and their ratio to the baseline, if any)."""
+    print("%-18s %10s %10s %10s %10s %10s %10s %10s" % ("workload", "min (us)", "mean (us)", "p50 (us)", "p90 (us)", "p99 (us)", "MB/s", "peak (kB)"), end='')
+    print("  vs baseline" if baseline else "")
+    for name in sorted(results):
+        result = results[name]
+        print("%-18s" % name, end='')
+        for key in ('min_us', 'mean_us', 'p50_us', 'p90_us', 'p99_us', 'mb_per_s', 'peak_kb'):
+            print(" " + _format(result[key]), end='')
+        if baseline and name in baseline:
+            print("  x%.2f" % (result['p50_us'] / baseline[name]['p50_us']), end='')
+        print()
+
+
+def compare(results, baseline, threshold=1.5):
+    """ compare(results, baseline, threshold=1.5) -> list of names
+
+    Names of the workloads whose median time is more than ``threshold`` times their median time in ``baseline``
+    (the median of the best round, less sensitive to the noise than the mean).
+    """
+    return [name for name in sorted(results)
+            if name in baseline and results[name]['p50_us'] > threshold * baseline[name]['p50_us']]
+
+
+def main(argv=None):
+    """ Command line interface of the benchmarks."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmarks for the ansicolortags module.")
+    subparsers = parser.add_subparsers(dest='benchmark')
+    run = subparsers.add_parser('run', help="Run the benchmarks of the workloads.")
+    run.add_argument('workloads', nargs='*', metavar='WORKLOAD', help="Workloads to run (default: all of them, %s)." % ', '.join(sorted(WORKLOADS)))
+    run.add_argument('--scale', type=float, default=1.0, help="Multiply the number of calls of each workload (default %(default)s).")
+    run.add_argument('--save', metavar='FILE', help="Save the results in this JSON file.")
+    run.add_argument('--compare', metavar='FILE', nargs='?', const=BASELINE, help="Compare the results to this JSON file (default %s)." % os.path.basename(BASELINE))
+    run.add_argument('--rounds', type=int, default=5, help="Run each workload this number of times, and keep the round with the best median (default %(default)s).")
+    run.add_argument('--threshold', type=float, default=1.5, help="With --compare, fail if the median time of a workload is more than this ratio of its reference (default %(default)s).")
+    scaling = subparsers.add_parser('scaling', help="Measure the time of sprint and erase on logs of growing sizes.")
+    scaling.add_argument('--sizes', type=float, nargs='+', default=[0.001, 0.01, 0.1, 1, 10, 100], help="Sizes of the logs, in MB (default %(default)s).")
+    pertag = subparsers.add_parser('pertag', help="Measure the cost of each tag on a tag-dense input, before and after the registry of the tags.")
+    pertag.add_argument('--tags', type=int, default=100000, help="Number of tags in the input (default %(default)s).")
+    syscalls = subparsers.add_parser('syscalls', help="Count the calls to write and flush with writec and ColorWriter.")
+    syscalls.add_argument('--lines', type=int, default=10000, help="Number of lines to write (default %(default)s).")
+    syscalls.add_argument('--size', type=int, default=65536, help="Size of the buffer of ColorWriter, in characters (default %(default)s).")
+    parallel = subparsers.add_parser('parallel', help="Measure the scaling of render_parallel from 1 to N processes.")
+    parallel.add_argument('--size', type=float, default=64, help="Size of the log, in MB (default %(default)s).")
+    parallel.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4], help="Numbers of processes (default %(default)s).")
+    parallel.add_argument('--sprint', action='store_true', help="Interpret the tags instead of erasing them.")
+    mmap = subparsers.add_parser('mmap', help="Measure the erasure of the tags of a huge file, mapped in memory or not.")
+    mmap.add_argument('--size', type=float, default=5000, help="Size of the file, in MB (default %(default)s).")
+    mmap.add_argument('--blocksize', type=int, default=1 << 18, help="Size of the pieces, in bytes (default %(default)s).")
+    threads = subparsers.add_parser('threads', help="Measure the throughput of SharedColorWriter from 1 to N threads.")
+    threads.add_argument('--records', type=int, default=200000, help="Number of lines to write (default %(default)s).")
+    threads.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64], help="Numbers of threads (default %(default)s).")
+    importtime = subparsers.add_parser('importtime', help="Measure the import time of the module, and check it against a budget.")
+    importtime.add_argument('--budget', type=float, default=IMPORT_BUDGET_MS, help="Budget in milliseconds (default %(default)s).")
+    importtime.add_argument('--repeat', type=int, default=7, help="Number of fresh interpreters (default %(default)s).")
+    args = parser.parse_args(argv)
+
+    if args.benchmark == 'run':
+        # Always measure the colored output, whatever the output is
+        ansicolortags.ANSISupported = True
+        results = bench_workloads(args.workloads or sorted(WORKLOADS), scale=args.scale, rounds=args.rounds)
+        baseline = None
+        if args.compare:
+            with open(args.compare) as baselineFile:
+                baseline = json.load(baselineFile)
+        report(results, baseline)
+        if args.save:
+            with open(args.save, 'w') as resultsFile:
+                json.dump(results, resultsFile, indent=2, sort_keys=True)
+        if baseline:
+            missing = sorted(set(results) - set(baseline))
+            if missing:
+                print("Not in the baseline: %s" % ', '.join(missing))
+            slower = compare(results, baseline, threshold=args.threshold)
+            if slower:
+                print("Slower than the baseline (x%.2f): %s" % (args.threshold, ', '.join(slower)))
+                return 1
+        return 0
+    if args.benchmark == 'scaling':
+        ansicolortags.ANSISupported = True
+        print("%12s %12s %12s %14s %14s" % ("size (MB)", "sprint (s)", "erase (s)", "sprint (s/MB)", "erase (s/MB)"))
+        for size, sprintTime, eraseTime in bench_scaling(sizes=args.sizes):
+            print("%12.3f %12.6f %12.6f %14.6f %14.6f" % (size, sprintTime, eraseTime, sprintTime / size, eraseTime / size))
+        return 0
+    if args.benchmark == 'pertag':
+        ansicolortags.ANSISupported = True
+        print("%22s %12s" % ("method", "ns / tag"))
+        for name, elapsed in bench_pertag(tags=args.tags):
+            print("%22s %12.1f" % (name, elapsed))
+        return 0
+    if args.benchmark == 'syscalls':
+        ansicolortags.ANSISupported = True
+        print("%22s %10s %10s %10s" % ("method", "writes", "flushes", "time (s)"))
+        for name, writes, flushes, elapsed in bench_syscalls(lines=args.lines, size=args.size):
+            print("%22s %10d %10d %10.4f" % (name, writes, flushes, elapsed))
+        return 0
+    if args.benchmark == 'parallel':
+        ansicolortags.ANSISupported = True
+        results = bench_parallel(size=args.size, jobs=args.jobs, erase=not args.sprint)
+        reference = results[0][1] * results[0][0]
+        print("%6s %10s %10s %10s" % ("jobs", "time (s)", "speedup", "MB/s"))
+        for number, elapsed in results:
+            print("%6d %10.3f %10.2f %10.1f" % (number, elapsed, reference / elapsed, args.size / elapsed))
+        return 0
+    if args.benchmark == 'mmap':
+        ansicolortags.ANSISupported = True
+        print("%16s %10s %10s %12s" % ("method", "time (s)", "MB/s", "peak (kB)"))
+        for name, elapsed, peak in bench_mmap(size=args.size, blocksize=args.blocksize):
+            print("%16s %10.2f %10.1f %12s" % (name, elapsed, args.size / elapsed, "-" if peak is None else "%.0f" % peak))
+        return 0
+    if args.benchmark == 'threads':
+        ansicolortags.ANSISupported = True
+        print("%8s %14s %14s" % ("threads", "shared (l/s)", "lock (l/s)"))
+        for number, sharedTime, lockedTime in bench_threads(records=args.records, threads=args.threads):
+            print("%8d %14.0f %14.0f" % (number, args.records / sharedTime, args.records / lockedTime))
+        return 0
+    if args.benchmark == 'importtime':
+        elapsed = bench_importtime(repeat=args.repeat)
+        print("import ansicolortags: %.2f ms (budget %.2f ms)" % (elapsed, args.budget))
+        return 0 if elapsed <= args.budget else 1
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+""" Configuration of the tests: import ansicolortags.py from the parent directory, and always use the ANSI codes (but in the tests marked with ``detect``)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ansicolortags  # noqa: E402
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "detect: detect if the outputs support the ANSI codes, instead of forcing them (with a clean environment)")
+
+
+@pytest.fixture(autouse=True)
+def ansi(request, monkeypatch):
+    """ Force the ANSI codes, whatever the output is, and start each test without cache nor optimizer.
+
+    The tests marked with ``detect`` start instead with the detection enabled, without its previous results, and without the variables and options changing it.
+    """
+    if request.node.get_closest_marker('detect') is None:
+        monkeypatch.setattr(ansicolortags, 'ANSISupported', True)
+    else:
+        monkeypatch.setattr(ansicolortags, 'ANSISupported', None)
+        for name in ('NO_COLOR', 'FORCE_COLOR', 'COLORTERM'):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setenv('TERM', 'xterm')
+        monkeypatch.setattr(sys, 'argv', [sys.argv[0]])
+        ansicolortags.reset_ansi_detection()
+    ansicolortags.disable_cache()
+    ansicolortags.disable_optimizer()
+    yield
+    ansicolortags.disable_cache()
+    ansicolortags.disable_optimizer()
+    ansicolortags.reset_ansi_detection()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+""" The conversion of the escape sequences back to tags: from_ansi and strip_ansi."""
+
+import pytest
+
+import ansicolortags
+from ansicolortags import from_ansi, strip_ansi
+
+
+#: An OSC 8 hyperlink, ended by BEL.
+LINK = "\033]8;;http://x\007link\033]8;;\007"
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("\033[01;32mOK\033[0;39;49m in \033[1;34;4m12 ms\033[0m", "<green>OK<reset> in <blue><u>12 ms<nocolors>"),
+    ("\033[1;31;44mx", "<red><Blue>x"),
+    ("\033[38;5;208mx\033[1;38;2;1;2;3my", "\033[38;5;208mx<b>\033[38;2;1;2;3my"),
+    ("\033]0;build\007x", "<title>build<bell>x"),
+    ("a\r\033[Kb\007", "a<el>b<bell>"),
+    (LINK + " and \033[01;31mred", LINK + " and <red>red"),
+    ("plain", "plain"),
+])
+def test_from_ansi(text, expected):
+    assert from_ansi(text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    "\033[01;32mOK\033[0m in \033[01;34m\033[4m12 ms\033[0m\r\033[Kdone\007",
+    LINK + " and \033[01;31mred\033[0m",
+    "\033]0;build\007\033[38;5;208mx\033[K",
+])
+def test_round_trip(text):
+    assert ansicolortags.sprint(from_ansi(text)) == text
+    assert ansicolortags.sprint(from_ansi(text, '[[', ']]'), '[[', ']]') == text
+
+
+def test_erase_keeps_the_hyperlinks_terminated():
+    assert ansicolortags.erase(from_ansi(LINK + " and \033[01;31mred\a")) == LINK + " and red"
+
+
+def test_from_ansi_follows_colordict(monkeypatch):
+    monkeypatch.setitem(ansicolortags.colorDict, 'alarm', "\007\007")
+    assert from_ansi("x\007\007y\007") == "x<alarm>y<bell>"
+
+
+def test_strip_ansi():
+    assert strip_ansi("\033[01;32mOK\033[0m in \033[38;5;208m12 ms\033[K") == "OK in 12 ms"
+    assert strip_ansi(LINK + "!") == "link!"
+    assert strip_ansi(ansicolortags.sprint("<title>T<bell><red>x<reset>")) == "x"
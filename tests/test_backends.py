@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+""" The backends: the tags given as events (styles, texts and controls) to HTMLBackend and the custom backends."""
+
+import io
+import re
+
+import pytest
+
+import ansicolortags
+
+
+@pytest.mark.parametrize('name, text', [('ERROR', 'ERROR'), ('WARNING', 'WARNING'), ('INFO', 'INFO'), ('warning', '/!\\'), ('question', '/?\\')])
+def test_text_of_alias_tags_is_kept(name, text):
+    html = ansicolortags.sprint_html("<%s> disk full" % name)
+    assert html.startswith('<span class="ansi-bold')
+    assert ansicolortags._html_escape(text) + "</span> disk full" in html
+    assert re.sub('<[^>]*>', '', html) == ansicolortags._html_escape(text) + " disk full"
+
+
+def test_style_after_text_of_alias_tag():
+    # The tag ends with reset: the text after it is not styled
+    assert ansicolortags.sprint_html("<red>a<ERROR>b") == '<span class="ansi-bold ansi-red">aERROR</span>b'
+    assert ansicolortags.sprint_html("<u><warning>x") == '<span class="ansi-bold ansi-underline ansi-red">/!\\</span>x'
+
+
+@pytest.mark.parametrize('text', ["<title>T<bell>x", "<title>T<red>U</red><bell>x", "<title>T<el>U<bell>x"])
+def test_title_is_dropped(text):
+    assert ansicolortags.sprint_html(text) == "x"
+
+
+def test_title_across_chunks():
+    assert ''.join(ansicolortags.iter_sprint_html(["<title>bu", "ild", "<bell>x"])) == "x"
+    # Not terminated: dropped until the end of the text only
+    assert ''.join(ansicolortags.iter_sprint_html(["<title>build"])) == ""
+    backend = ansicolortags.HTMLBackend()
+    assert backend.render("<title>T") == "" and backend.render("x") == "x"
+
+
+def test_blink_in_both_modes():
+    stylesheet = ansicolortags.html_stylesheet()
+    assert '.ansi-blink { animation: ansi-blink 1s step-end infinite; }' in stylesheet
+    assert ansicolortags.sprint_html("<blink>x") == '<span class="ansi-blink">x</span>'
+    assert ansicolortags.sprint_html("<blink>x", mode='style') == '<span style="animation: ansi-blink 1s step-end infinite">x</span>'
+    assert ansicolortags.sprint_html("<u><blink>x", mode='style') == '<span style="text-decoration: underline; animation: ansi-blink 1s step-end infinite">x</span>'
+
+
+# %% Custom backends
+
+class MarkdownBackend(ansicolortags.Backend):
+    """ The bold text in Markdown, and the controls shown by their names."""
+
+    def style(self, before, after):
+        return '**' if before.bold != after.bold else ''
+
+    def control(self, name, escape):
+        return '{%s}' % name
+
+    def finish(self, style):
+        return '**' if style.bold else ''
+
+
+def test_custom_backend_with_alias_tags():
+    backend = MarkdownBackend()
+    assert ansicolortags.sprint("<ERROR> disk full", backend=backend) == "**ERROR** disk full"
+    assert ansicolortags.sprint("<warning>x<INFO>y", backend=backend) == "**/!\\**x**INFO**y"
+    assert ansicolortags.sprint("a<el>b<title>T<bell>c", backend=backend) == "a{el}b{title}c"
+    assert ''.join(ansicolortags.iter_sprint(["<ER", "ROR> disk", " full<b>!"], backend=backend)) == "**ERROR** disk full**!**"
+
+
+def test_base_backend_erases_the_styles_and_controls():
+    backend = ansicolortags.Backend()
+    assert ansicolortags.sprint("<red>a</red><el>b<ERROR>", backend=backend) == "abERROR"
+    assert not backend.writes
+
+
+def test_plain_backend_is_erase():
+    text = "<red>a</red><el>b<ERROR><fg:208>c"
+    assert ansicolortags.sprint(text, backend=ansicolortags.PlainBackend()) == ansicolortags.erase(text) == "abc"
+
+
+def test_ansi_backend_uses_all_the_colors(monkeypatch):
+    monkeypatch.setattr(ansicolortags, 'ColorDepth', 16)
+    backend = ansicolortags.ANSIBackend()
+    assert ansicolortags.sprint("<fg:208>x", backend=backend) == "\033[38;5;208mx"
+    assert ansicolortags.sprint("<rgb(255,128,0)>x</rgb(255,128,0)>y", backend=backend) == "\033[38;2;255;128;0mx\033[0my"
+    assert ansicolortags.sprint("<fg:208>x") == "\033[33mx"
+    assert ''.join(ansicolortags.iter_sprint(["<fg:", "208>x"], backend=backend)) == "\033[38;5;208mx"
+    assert ansicolortags.sprint("<red>x", backend=ansicolortags.ANSIBackend(colors={'red': '[RED]'})) == "[RED]x"
+
+
+def test_html_backend():
+    with pytest.raises(ValueError):
+        ansicolortags.HTMLBackend(mode='inline')
+    assert ansicolortags.sprint("<red>a & b</red> <c>", backend=ansicolortags.HTMLBackend()) == '<span class="ansi-bold ansi-red">a &amp; b</span> &lt;c&gt;'
+    assert ansicolortags.sprint("<b>x", backend=ansicolortags.HTMLBackend(prefix='c-')) == '<span class="c-bold">x</span>'
+
+
+# %% Windows console
+
+class FakeConsole(io.StringIO):
+    """ A Windows console, recording the text written and the attributes set (after flushing the text)."""
+
+    def __init__(self):
+        io.StringIO.__init__(self)
+        self.events = []
+
+    def set(self, attributes):
+        self.events.append(('text', self.getvalue()))
+        self.events.append(('attributes', attributes))
+
+
+@pytest.fixture
+def console(monkeypatch):
+    console = FakeConsole()
+    monkeypatch.setattr(ansicolortags, '_windows_console', lambda out: (out.set, 0x07))
+    return console
+
+
+def test_windows_console_backend(console):
+    backend = ansicolortags.WindowsConsoleBackend(console)
+    assert backend.writes
+    assert backend.render("a<red>b</red>c<neg>d") == ''
+    assert console.getvalue() == "abcd"
+    # Bright red (bold) on the default background, then the default, then swapped, then restored at the end
+    assert console.events == [('text', 'a'), ('attributes', 0x0C), ('text', 'ab'), ('attributes', 0x07),
+                               ('text', 'abc'), ('attributes', 0x70), ('text', 'abcd'), ('attributes', 0x07)]
+
+
+def test_windows_console_backend_not_a_console(monkeypatch):
+    def fail(out):
+        raise OSError("not a console")
+    monkeypatch.setattr(ansicolortags, '_windows_console', fail)
+    with pytest.raises(OSError):
+        ansicolortags.WindowsConsoleBackend(io.StringIO())
+
+
+def test_windows_console_backend_with_printc_and_writers(console):
+    backend = ansicolortags.WindowsConsoleBackend(console)
+    ansicolortags.printc("<red>KO", 17, backend=backend, file=console, flush=True)
+    ansicolortags.writec("<ERROR>!", out=console, backend=backend)
+    writer = ansicolortags.ColorWriter(console, backend=backend)
+    writer.write("w")
+    assert console.getvalue() == "KO 17\nERROR!w"
+    other = io.StringIO()
+    with pytest.raises(ValueError):
+        ansicolortags.printc("x", backend=backend, file=other)
+    with pytest.raises(ValueError):
+        ansicolortags.writec("x", out=other, backend=backend)
+    with pytest.raises(ValueError):
+        ansicolortags.ColorWriter(other, backend=backend)
+    with pytest.raises(ValueError):
+        ansicolortags.ColorizingWriter(other, backend=backend)
+    assert other.getvalue() == ''
+
+
+def test_threaded_writers_refuse_windows_console_backend(console):
+    backend = ansicolortags.WindowsConsoleBackend(console)
+    with pytest.raises(ValueError):
+        ansicolortags.SharedColorWriter(out=console, backend=backend)
+
+    async def main():
+        with pytest.raises(ValueError):
+            ansicolortags.AsyncColorWriter(out=console, backend=backend)
+    import asyncio
+    asyncio.run(main())
+
+
+# %% Backends of the writers
+
+def test_each_writer_has_its_backend():
+    text = "<red>KO</red> <ERROR>"
+    html = ansicolortags.sprint_html(text)
+    outputs = [io.StringIO() for _ in range(6)]
+    ansicolortags.printc(text, backend=ansicolortags.HTMLBackend(), file=outputs[0], end='')
+    ansicolortags.writec(text, out=outputs[1], backend=ansicolortags.PlainBackend())
+    writer = ansicolortags.ColorWriter(outputs[2], backend=ansicolortags.HTMLBackend())
+    writer.write(text)
+    with ansicolortags.ColorizingWriter(outputs[3], backend=ansicolortags.HTMLBackend()) as writer:
+        writer.write(text[:5])
+        writer.write(text[5:])
+    with ansicolortags.SharedColorWriter(out=outputs[4], backend=ansicolortags.HTMLBackend()) as writer:
+        writer.write(text)
+    # Without a backend, the colors of the output (ANSI codes in the tests)
+    ansicolortags.writec(text, out=outputs[5])
+    assert [output.getvalue() for output in outputs] == [html, "KO ", html, html, html, ansicolortags.sprint(text)]
+
+
+def test_ansi_backend_is_cached(monkeypatch):
+    monkeypatch.setattr(ansicolortags, 'ColorDepth', 16)
+    ansicolortags.enable_cache()
+    backend = ansicolortags.ANSIBackend()
+    assert backend.substitution is ansicolortags.ANSIBackend().substitution
+    for _ in range(3):
+        assert ansicolortags.sprint("<fg:208>x", backend=backend) == "\033[38;5;208mx"
+        assert ansicolortags.sprint("<fg:208>x") == "\033[33mx"
+    info = ansicolortags.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (4, 2, 2)
+    monkeypatch.setitem(ansicolortags.colorDict, 'red', '[RED]')
+    assert ansicolortags.sprint("<red>x", backend=backend) == "[RED]x"
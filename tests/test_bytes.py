@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+""" The bytes: sprint_bytes and erase_bytes, returned or written into a bytearray, a memoryview or a file."""
+
+import io
+
+import pytest
+
+import ansicolortags
+
+
+TEXT = u"<red>Rouge <b>gras</b><reset> et <fg:208>orange</fg:208> été.\n"
+DATA = TEXT.encode('utf-8')
+
+
+@pytest.mark.parametrize('data', [DATA, bytearray(DATA), memoryview(DATA)])
+def test_sprint_bytes_is_sprint(data):
+    assert ansicolortags.sprint_bytes(data) == ansicolortags.sprint(TEXT).encode('utf-8')
+    assert ansicolortags.erase_bytes(data) == ansicolortags.erase(TEXT).encode('utf-8')
+
+
+@pytest.mark.parametrize('function', [ansicolortags.sprint_bytes, ansicolortags.erase_bytes])
+def test_bytes_appended_to_a_bytearray(function):
+    expected = function(DATA)
+    out = bytearray(b"Log: ")
+    assert function(DATA, out=out) == len(expected)
+    assert bytes(out) == b"Log: " + expected
+    # Appended again, after the previous output
+    assert function(DATA, out=out) == len(expected)
+    assert bytes(out) == b"Log: " + expected + expected
+
+
+@pytest.mark.parametrize('function', [ansicolortags.sprint_bytes, ansicolortags.erase_bytes])
+def test_bytes_copied_into_a_memoryview(function):
+    expected = function(DATA)
+    buffer = bytearray(b"." * (len(expected) + 10))
+    assert function(DATA, out=memoryview(buffer)) == len(expected)
+    # At the beginning, the rest of the buffer is left untouched
+    assert bytes(buffer) == expected + b"." * 10
+    # A buffer of the exact size is enough
+    exact = bytearray(len(expected))
+    assert function(DATA, out=memoryview(exact)) == len(expected)
+    assert bytes(exact) == expected
+
+
+@pytest.mark.parametrize('function', [ansicolortags.sprint_bytes, ansicolortags.erase_bytes])
+def test_bytes_into_a_too_small_memoryview(function):
+    expected = function(DATA)
+    buffer = bytearray(b"." * (len(expected) - 1))
+    with pytest.raises(ValueError, match="too small"):
+        function(DATA, out=memoryview(buffer))
+    # Nothing is written
+    assert bytes(buffer) == b"." * (len(expected) - 1)
+
+
+def test_bytes_into_a_read_only_memoryview():
+    with pytest.raises(TypeError):
+        ansicolortags.sprint_bytes(DATA, out=memoryview(bytes(len(DATA) * 2)))
+
+
+def test_bytes_written_to_a_file():
+    expected = ansicolortags.sprint_bytes(DATA)
+    out = io.BytesIO()
+    assert ansicolortags.sprint_bytes(DATA, out=out) == len(expected)
+    assert out.getvalue() == expected
+    # A text file is written through its buffer
+    text = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+    assert ansicolortags.sprint_bytes(DATA, out=text) == len(expected)
+    assert text.buffer.getvalue() == expected
+
+
+def test_bytes_with_bytes_delimiters():
+    data = TEXT.replace(u'<', u'[').replace(u'>', u']').encode('utf-8')
+    assert ansicolortags.sprint_bytes(data, b'[', b']') == ansicolortags.sprint_bytes(DATA)
+    assert ansicolortags.sprint_bytes(data, '[', ']') == ansicolortags.sprint_bytes(DATA)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+""" The cache of sprint and erase: statistics, eviction, invalidation, and use by many threads."""
+
+import sys
+import threading
+
+import ansicolortags
+
+
+def test_cache_info():
+    assert ansicolortags.cache_info() is None
+    ansicolortags.enable_cache(maxsize=8, maxbytes=1000)
+    assert ansicolortags.sprint("<red>x") == ansicolortags.sprint("<red>x") == ansicolortags.red + "x"
+    ansicolortags.erase("<red>x")
+    info = ansicolortags.cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize, info.maxbytes) == (1, 2, 8, 2, 1000)
+    assert info.nbytes == 2 * len("<red>x") + len(ansicolortags.red + "x") + len("x")
+    ansicolortags.cache_clear()
+    assert ansicolortags.cache_info()[:4] == (0, 0, 8, 0)
+
+
+def test_cache_eviction_by_count():
+    ansicolortags.enable_cache(maxsize=3)
+    for text in ("a", "b", "c"):
+        ansicolortags.sprint(text)
+    ansicolortags.sprint("a")  # The most recently used now, "b" is the least recently used
+    ansicolortags.sprint("d")
+    assert ansicolortags.cache_info().currsize == 3
+    ansicolortags.sprint("a")
+    ansicolortags.sprint("b")
+    info = ansicolortags.cache_info()
+    assert (info.hits, info.misses) == (2, 5)
+
+
+def test_cache_eviction_by_bytes():
+    ansicolortags.enable_cache(maxbytes=20)
+    ansicolortags.sprint("x" * 5)
+    ansicolortags.sprint("y" * 5)
+    assert ansicolortags.cache_info().nbytes == 20
+    ansicolortags.sprint("z" * 5)
+    info = ansicolortags.cache_info()
+    assert (info.currsize, info.nbytes) == (2, 20)
+    # Too long to be stored at all
+    ansicolortags.sprint("w" * 11)
+    assert ansicolortags.cache_info().currsize == 2
+
+
+def test_cache_invalidation(monkeypatch):
+    ansicolortags.enable_cache()
+    assert ansicolortags.sprint("<red>x") == ansicolortags.red + "x"
+    monkeypatch.setitem(ansicolortags.colorDict, 'red', '[RED]')
+    assert ansicolortags.sprint("<red>x") == "[RED]x"
+    monkeypatch.setattr(ansicolortags, 'ANSISupported', False)
+    assert ansicolortags.sprint("<red>x") == "x"
+    assert ansicolortags.cache_info().hits == 0
+
+
+def test_cache_with_threads():
+    # Switch between the threads as often as possible
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        _work_with_threads()
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def _work_with_threads():
+    ansicolortags.enable_cache(maxsize=16, maxbytes=400)
+    texts = ["<red>%d<reset>" % i for i in range(40)]
+    errors = []
+
+    def work(n):
+        for i in range(2000):
+            text = texts[(i * (n + 1)) % len(texts)]
+            if ansicolortags.sprint(text) != ansicolortags.red + text[5:-7] + ansicolortags.reset:
+                errors.append(text)
+    threads = [threading.Thread(target=work, args=(n, )) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    info = ansicolortags.cache_info()
+    entries = ansicolortags._cache._entries
+    assert info.currsize == len(entries) <= 16
+    assert info.nbytes == sum(len(chain) + len(value) for (chain, _, _, _), value in entries.items()) <= 400
+    assert info.hits + info.misses == 8 * 2000
+    # It still stores the new strings
+    ansicolortags.sprint("<b>new")
+    assert ("<b>new", '<', '>', 'sprint') in ansicolortags._cache._entries
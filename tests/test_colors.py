@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+""" The tags with parameters: 256 colors and true colors."""
+
+import pytest
+
+import ansicolortags
+
+
+@pytest.fixture
+def depth(monkeypatch):
+    """ Set the color depth, and forget the detected one after."""
+    def setDepth(value):
+        monkeypatch.setattr(ansicolortags, 'ColorDepth', value)
+    yield setDepth
+    ansicolortags.reset_ansi_detection()
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('<fg:208>x', '\033[38;5;208mx'),
+    ('<bg:0>x', '\033[48;5;0mx'),
+    ('<fg:008>x', '\033[38;5;8mx'),
+    ('<fg:255>x', '\033[38;5;255mx'),
+    ('<fg:#ff8700>x', '\033[38;5;208mx'),
+    ('<rgb(255, 0, 0)>x', '\033[38;5;196mx'),
+    ('<bg:rgb(0,0,0)>x', '\033[48;5;16mx'),
+])
+def test_256_colors(depth, text, expected):
+    depth(256)
+    assert ansicolortags.sprint(text) == expected
+    assert ansicolortags.erase(text) == 'x'
+
+
+def test_true_colors_and_16_colors(depth):
+    depth(ansicolortags.TRUECOLOR)
+    assert ansicolortags.sprint('<rgb(255,128,0)>x') == '\033[38;2;255;128;0mx'
+    assert ansicolortags.sprint('<fg:9>x') == '\033[38;5;9mx'
+    depth(16)
+    assert ansicolortags.sprint('<fg:9>x</fg:9>') == '\033[91mx\033[0m'
+
+
+@pytest.mark.parametrize('text', ['<fg:256>x', '<fg:999>x', '<bg:256>x', '<fg:2555>x', '<rgb(300,0,0)>x', '<rgb(0, 256, 0)>x', '<bg:rgb(0,0,1000)>x', '<fg:#ff870>x', '<fg:>x'])
+def test_out_of_range_are_not_tags(depth, text):
+    depth(256)
+    assert ansicolortags.sprint(text) == text
+    assert ansicolortags.erase(text) == text
+    assert ansicolortags.sprint_bytes(text.encode('ascii')) == text.encode('ascii')
+
+
+def test_detected_depth_invalidates_the_cache(monkeypatch):
+    ansicolortags.enable_cache()
+    monkeypatch.setenv('COLORTERM', 'truecolor')
+    ansicolortags.reset_ansi_detection()
+    assert ansicolortags.sprint('<rgb(255,128,0)>x') == '\033[38;2;255;128;0mx'
+    monkeypatch.delenv('COLORTERM')
+    monkeypatch.setenv('TERM', 'xterm-256color')
+    ansicolortags.reset_ansi_detection()
+    assert ansicolortags.sprint('<rgb(255,128,0)>x') == '\033[38;5;208mx'
+    monkeypatch.setenv('TERM', 'xterm')
+    ansicolortags.reset_ansi_detection()
+    assert ansicolortags.sprint('<rgb(255,128,0)>x') == '\033[33mx'
+    ansicolortags.reset_ansi_detection()
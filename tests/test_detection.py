@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+""" The detection of the support of the ANSI codes (for each output) and of the color depth."""
+
+import io
+import sys
+
+import pytest
+
+import ansicolortags
+
+pytestmark = pytest.mark.detect
+
+
+class FakeTerminal(io.StringIO):
+    """ A file which says it is a terminal."""
+
+    def isatty(self):
+        return True
+
+
+class BrokenFile(io.StringIO):
+    def isatty(self):
+        raise RuntimeError("broken")
+
+
+def test_terminal_and_file():
+    terminal, log = FakeTerminal(), io.StringIO()
+    assert ansicolortags.supports_ansi(terminal)
+    assert not ansicolortags.supports_ansi(log)
+    # Each output gets its own colors
+    ansicolortags.printc("<red>KO", file=terminal)
+    ansicolortags.printc("<red>KO", file=log)
+    ansicolortags.writec("<red>KO", out=terminal)
+    ansicolortags.writec("<red>KO", out=log)
+    assert terminal.getvalue() == ansicolortags.red + "KO\n" + ansicolortags.red + "KO"
+    assert log.getvalue() == "KO\nKO"
+
+
+def test_no_isatty():
+    assert not ansicolortags.supports_ansi(object())
+
+
+@pytest.mark.parametrize('term', [None, 'unknown'])
+def test_term(monkeypatch, term):
+    if term is None:
+        monkeypatch.delenv('TERM')
+    else:
+        monkeypatch.setenv('TERM', term)
+    assert not ansicolortags.supports_ansi(FakeTerminal())
+
+
+def test_no_color(monkeypatch):
+    monkeypatch.setenv('NO_COLOR', '1')
+    monkeypatch.setenv('FORCE_COLOR', '1')  # NO_COLOR wins
+    assert not ansicolortags.supports_ansi(FakeTerminal())
+    monkeypatch.setenv('NO_COLOR', '')  # Empty: ignored
+    ansicolortags.reset_ansi_detection()
+    assert ansicolortags.supports_ansi(FakeTerminal())
+
+
+@pytest.mark.parametrize('value, expected', [('1', True), ('true', True), ('0', False)])
+def test_force_color(monkeypatch, value, expected):
+    monkeypatch.setenv('FORCE_COLOR', value)
+    assert ansicolortags.supports_ansi(io.StringIO()) == expected
+    assert ansicolortags.supports_ansi(FakeTerminal())
+
+
+@pytest.mark.parametrize('option, expected', [('--noANSI', False), ('--ANSI', True)])
+def test_command_line_options(monkeypatch, option, expected):
+    monkeypatch.setattr(sys, 'argv', [sys.argv[0], option])
+    monkeypatch.setenv('NO_COLOR', '1')
+    monkeypatch.setenv('FORCE_COLOR', '1')
+    assert ansicolortags.supports_ansi(FakeTerminal()) == ansicolortags.supports_ansi(io.StringIO()) == expected
+
+
+def test_ansi_supported_overrides_the_detection(monkeypatch):
+    monkeypatch.setattr(ansicolortags, 'ANSISupported', False)
+    assert not ansicolortags.supports_ansi(FakeTerminal())
+    monkeypatch.setattr(ansicolortags, 'ANSISupported', True)
+    assert ansicolortags.supports_ansi(io.StringIO())
+
+
+def test_results_are_cached(monkeypatch):
+    terminal = FakeTerminal()
+    assert ansicolortags.supports_ansi(terminal)
+    monkeypatch.setenv('NO_COLOR', '1')
+    assert ansicolortags.supports_ansi(terminal)  # Still the cached result
+    assert not ansicolortags.supports_ansi(FakeTerminal())  # Another output
+    ansicolortags.reset_ansi_detection()
+    assert not ansicolortags.supports_ansi(terminal)
+
+
+def test_broken_output(capsys):
+    assert not ansicolortags.supports_ansi(BrokenFile())
+    assert "broken" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('colorterm, term, depth', [('truecolor', 'xterm', ansicolortags.TRUECOLOR), ('24bit', 'xterm', ansicolortags.TRUECOLOR),
+                                                    ('', 'xterm-256color', 256), ('', 'xterm', 16)])
+def test_color_depth(monkeypatch, colorterm, term, depth):
+    monkeypatch.setenv('COLORTERM', colorterm)
+    monkeypatch.setenv('TERM', term)
+    assert ansicolortags.color_depth() == depth
+    monkeypatch.setattr(ansicolortags, 'ColorDepth', 256)
+    assert ansicolortags.color_depth() == 256
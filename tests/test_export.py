@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+""" The export of the table of colors, in all the formats of export_colors."""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+import ansicolortags
+from ansicolortags import export_colors
+
+
+#: Known tags, a custom tag (with a quote and a bell) and a true color.
+COLORS = {
+    'red': ansicolortags.red,
+    'el': ansicolortags.el,
+    'alert': "\033[05m'!'\007",
+    'orange': "\033[38;2;255;128;0m",
+}
+
+
+@pytest.fixture
+def custom(monkeypatch):
+    """ colorDict with the custom tag and the true color."""
+    for name in ('alert', 'orange'):
+        monkeypatch.setitem(ansicolortags.colorDict, name, COLORS[name])
+
+
+def test_sh():
+    lines = export_colors('sh', COLORS).splitlines()
+    assert 'export red="\\033[01;31m"' in lines
+    assert 'export el="\\r\\033[K"' in lines
+    assert 'export alert="\\033[05m\'!\'\\007"' in lines
+    assert 'export orange="\\033[38;2;255;128;0m"' in lines
+
+
+def test_zsh():
+    lines = export_colors('zsh', COLORS).splitlines()
+    assert lines[0].startswith('# Table of colors')
+    assert "export red=$'\\e[01;31m'" in lines
+    assert "export el=$'\\r\\e[K'" in lines
+    assert "export alert=$'\\e[05m\\'!\\'\\a'" in lines
+    assert "export orange=$'\\e[38;2;255;128;0m'" in lines
+
+
+def test_fish():
+    lines = export_colors('fish', COLORS).splitlines()
+    assert "set -gx red \\e'[01;31m'" in lines
+    assert "set -gx el \\r\\e'[K'" in lines
+    assert "set -gx alert \\e'[05m\\'!\\''\\a" in lines
+    assert "set -gx orange \\e'[38;2;255;128;0m'" in lines
+
+
+def test_json():
+    assert json.loads(export_colors('json', COLORS)) == COLORS
+
+
+def test_python():
+    namespace = {}
+    exec(export_colors('python', COLORS), namespace)
+    assert namespace['colorTable'] == COLORS
+
+
+def test_default_table_has_custom_tags(custom):
+    assert json.loads(export_colors('json')) == dict(ansicolortags.colorDict)
+    assert "export orange=$'\\e[38;2;255;128;0m'" in export_colors('zsh').splitlines()
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason="bash is needed")
+@pytest.mark.parametrize('fmt, command', [('sh', 'echo -ne "$%s"'), ('zsh', 'printf %%s "$%s"')])
+def test_bash_reads_the_values(tmp_path, fmt, command):
+    path = tmp_path / 'colors'
+    path.write_text(export_colors(fmt, COLORS))
+    for name, value in COLORS.items():
+        output = subprocess.check_output(['bash', '-c', '. %s; %s' % (path, command % name)])
+        assert output.decode('utf-8') == value, name
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        export_colors('csv')
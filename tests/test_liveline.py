@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+""" LiveLine, checked against a small terminal emulator: the incremental redraws must show the same line as drawing it again from scratch."""
+
+import io
+import random
+import re
+
+import pytest
+
+import ansicolortags
+
+
+# %% A small terminal emulator (one line)
+
+#: The escapes understood by the emulator: SGR, cursor moves and erasing the end of the line.
+_escape = re.compile('\033\\[([0-9;]*)([mDCK])|\r|\n')
+
+
+class Terminal(object):
+    """ One line of a terminal: the characters with their style, the cursor, and the current style (a dict of SGR attributes)."""
+
+    def __init__(self):
+        self.cells = []
+        self.cursor = 0
+        self.style = {}
+
+    def _sgr(self, codes):
+        codes = [int(code or 0) for code in codes.split(';')]
+        index = 0
+        while index < len(codes):
+            code = codes[index]
+            if code == 0:
+                self.style = {}
+            elif code in (1, 2):
+                self.style['bold' if code == 1 else 'faint'] = True
+            elif code == 22:
+                self.style.pop('bold', None)
+                self.style.pop('faint', None)
+            elif code in (3, 4, 5, 7):
+                self.style[code] = True
+            elif code in (23, 24, 25, 27):
+                self.style.pop(code - 20, None)
+            elif code in (38, 48):
+                length = 3 if codes[index + 1] == 5 else 5
+                self.style['fg' if code == 38 else 'bg'] = tuple(codes[index:index + length])
+                index += length - 1
+            elif 30 <= code <= 37 or 90 <= code <= 97:
+                self.style['fg'] = code
+            elif 40 <= code <= 47 or 100 <= code <= 107:
+                self.style['bg'] = code
+            elif code == 39:
+                self.style.pop('fg', None)
+            elif code == 49:
+                self.style.pop('bg', None)
+            index += 1
+
+    def write(self, data):
+        position = 0
+        for match in _escape.finditer(data):
+            self._characters(data[position:match.start()])
+            position = match.end()
+            piece = match.group(0)
+            if piece == '\r':
+                self.cursor = 0
+            elif piece == '\n':
+                self.cells, self.cursor = [], 0
+            elif match.group(2) == 'm':
+                self._sgr(match.group(1))
+            elif match.group(2) == 'D':
+                self.cursor = max(0, self.cursor - int(match.group(1) or 1))
+            elif match.group(2) == 'C':
+                self.cursor += int(match.group(1) or 1)
+            else:
+                del self.cells[self.cursor:]
+        self._characters(data[position:])
+
+    def _characters(self, text):
+        assert '\033' not in text, text
+        for character in text:
+            while len(self.cells) < self.cursor:
+                self.cells.append((' ', ()))
+            cell = (character, tuple(sorted(self.style.items(), key=str)))
+            if self.cursor < len(self.cells):
+                self.cells[self.cursor] = cell
+            else:
+                self.cells.append(cell)
+            self.cursor += 1
+
+    def flush(self):
+        pass
+
+
+def fresh_screen(chainWithTags):
+    """ The line showing ``chainWithTags``, drawn from scratch."""
+    terminal = Terminal()
+    terminal.write('\r\033[K' + ansicolortags.reset + ansicolortags.sprint(chainWithTags))
+    return terminal.cells
+
+
+# %% Tests
+
+WORDS = ['a', 'b', 'ab', 'file', ' ', '%', '<red>', '<green>', '<b>', '<u>', '<reset>', '</red>', '<fg:208>', '<Blue>', '<neg>']
+
+
+def random_content(generator):
+    return ''.join(generator.choice(WORDS) for _ in range(generator.randint(0, 10)))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_redraws_show_the_content(seed):
+    generator = random.Random(seed)
+    terminal = Terminal()
+    line = ansicolortags.LiveLine(terminal, fps=0)
+    for _ in range(100):
+        content = random_content(generator)
+        line.update(content)
+        assert terminal.cells == fresh_screen(content), content
+
+
+@pytest.mark.parametrize('before, after', [
+    ("<green>Processing<reset> file 1/9", "<green>Processing<reset> file 2/9"),  # Equal length
+    ("file 10/99 <red>!", "file 9/99"),  # Shorter
+    ("file 9/99", "file 10/99 <red>!"),  # Longer
+    ("<red>abc<blue>def", "<red>abc<green>def"),  # Color change in the middle
+    ("<red>abc</red>def", "<red>abcdef"),
+])
+def test_redraw(before, after):
+    terminal = Terminal()
+    line = ansicolortags.LiveLine(terminal, fps=0)
+    line.update(before)
+    written = line.written
+    line.update(after)
+    assert terminal.cells == fresh_screen(after)
+    # Never more than drawing it again from scratch, like writec("<el>...")
+    assert line.written - written <= len('\r\033[K' + ansicolortags.reset + ansicolortags.sprint(after))
+    written = line.written
+    line.update(after)  # Nothing changed, nothing written
+    assert line.written == written
+
+
+def test_equal_length_writes_only_the_changed_characters():
+    out = io.StringIO()
+    line = ansicolortags.LiveLine(out, fps=0)
+    line.update("<green>Processing<reset> file 1/9...")
+    start = len(out.getvalue())
+    line.update("<green>Processing<reset> file 2/9...")
+    assert out.getvalue()[start:] == "\033[6D2"
+
+
+def test_fps_limit(monkeypatch):
+    now = [100.0]
+    out = io.StringIO()
+    line = ansicolortags.LiveLine(out, fps=10)
+    monkeypatch.setattr(line, '_clock', lambda: now[0])
+    line.update("1")
+    drawn = out.getvalue()
+    now[0] += 0.05
+    line.update("2")
+    line.update("3")
+    assert out.getvalue() == drawn  # Too soon, kept for later
+    now[0] += 0.06
+    line.update("4")
+    assert out.getvalue().endswith("\r4")
+    line.update("5")
+    line.refresh()  # Drawn anyway
+    assert out.getvalue().endswith("\r5")
+    line.close()
+    assert out.getvalue().endswith("5" + ansicolortags.reset + "\n")
+
+
+def test_plain_output(monkeypatch):
+    monkeypatch.setattr(ansicolortags, 'ANSISupported', None)
+    monkeypatch.delenv('FORCE_COLOR', raising=False)
+    out = io.StringIO()  # Not a terminal
+    with ansicolortags.LiveLine(out, fps=0) as line:
+        line.update("<green>OK<reset> 1<el>")
+        line.update("<green>OK<reset> 1")
+        line.update("<red>KO<reset> 2")
+    assert out.getvalue() == "OK 1\nKO 2\n"
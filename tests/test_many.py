@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+""" The batches of strings: sprint_many and erase_many."""
+
+import io
+
+import pytest
+
+import ansicolortags
+
+
+CELLS = ["<green>OK<reset>", "<red>KO<reset>", "<green>OK<reset>", "", "<red>a", "b</red>c", "<b>x", "</b>y", "<fg:208>z</fg:208>", "plain", "<green>OK<reset>"]
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """ The strings given to the render engine."""
+    calls = []
+    substitute = ansicolortags._substitute
+
+    def spy(chainWithTags, *args, **kwargs):
+        calls.append(chainWithTags)
+        return substitute(chainWithTags, *args, **kwargs)
+    monkeypatch.setattr(ansicolortags, '_substitute', spy)
+    return calls
+
+
+def test_sprint_many_is_sprint():
+    assert ansicolortags.sprint_many(CELLS) == [ansicolortags.sprint(cell) for cell in CELLS]
+    assert ansicolortags.erase_many(CELLS) == [ansicolortags.erase(cell) for cell in CELLS]
+    assert ansicolortags.sprint_many([]) == ansicolortags.erase_many([]) == []
+
+
+def test_identical_strings_are_rendered_once(calls):
+    ansicolortags.sprint_many(CELLS)
+    # Only one call to the engine, for the different strings joined
+    assert len(calls) == 1
+    assert calls[0].split('\0') == ["<green>OK<reset>", "<red>KO<reset>", "", "<red>a", "b</red>c", "<b>x", "</b>y", "<fg:208>z</fg:208>", "plain"]
+
+
+def test_separator_in_a_string(calls):
+    cells = ["<red>a\0b", "<red>a\0b", "c"]
+    assert ansicolortags.sprint_many(cells) == [ansicolortags.red + "a\0b", ansicolortags.red + "a\0b", "c"]
+    assert ansicolortags.erase_many(cells) == ["a\0b", "a\0b", "c"]
+    # Joined first, then rendered one by one (each different string once)
+    assert calls[1:3] == ["<red>a\0b", "c"]
+
+
+def test_separator_in_a_value(monkeypatch):
+    monkeypatch.setitem(ansicolortags.colorDict, 'red', '[\0RED]')
+    assert ansicolortags.sprint_many(["<red>a", "b"]) == ["[\0RED]a", "b"]
+
+
+def test_separator_in_the_delimiters(calls):
+    cells = ["\0red\0x", "y\0b\0"]
+    expected = [ansicolortags.red + "x", "y" + ansicolortags.b]
+    assert [ansicolortags.sprint(cell, '\0', '\0') for cell in cells] == expected
+    del calls[:]
+    assert ansicolortags.sprint_many(cells, left='\0', right='\0') == expected
+    assert calls == cells  # Not joined
+
+
+def test_out():
+    out = io.StringIO()
+    assert ansicolortags.sprint_many(CELLS, out=out) is None
+    assert out.getvalue() == ''.join(ansicolortags.sprint(cell) for cell in CELLS)
+    out = io.StringIO()
+    assert ansicolortags.erase_many(CELLS, out=out) is None
+    assert out.getvalue() == ''.join(ansicolortags.erase(cell) for cell in CELLS)
+
+
+def test_out_without_ansi(monkeypatch):
+    monkeypatch.setattr(ansicolortags, 'ANSISupported', None)
+    monkeypatch.delenv('FORCE_COLOR', raising=False)
+    out = io.StringIO()  # Not a terminal: the tags are erased
+    ansicolortags.sprint_many(CELLS, out=out)
+    assert out.getvalue() == ''.join(ansicolortags.erase(cell) for cell in CELLS)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+""" The optimizer of the SGR escapes."""
+
+import pytest
+
+import ansicolortags
+from ansicolortags import optimize_escapes
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('\033[1m\033[2mx', '\033[1;2mx'),  # Bold and faint at the same time
+    ('\033[2m\033[1mx', '\033[1;2mx'),
+    ('\033[1mx\033[22my', '\033[1mx\033[22my'),
+    ('\033[1m\033[2mx\033[22m\033[1my', '\033[1;2mx\033[22;1my'),  # 22 resets both, bold is set again
+    ('\033[1m\033[2mx\033[1my', '\033[1;2mxy'),
+    ('\033[0m\033[01;31mx\033[02;32my', '\033[0;1;31mx\033[2;32my'),
+    ('\033[31m\033[31mx\033[31my', '\033[31mxy'),
+    ('\033[0m\033[0mx\033[39my', '\033[0mxy'),
+    ('\033[8mx\033[8my', '\033[8mx\033[8my'),  # Unknown code, kept
+])
+def test_optimize_escapes(text, expected):
+    assert optimize_escapes(text) == expected
+
+
+def test_bold_and_faint_styles():
+    style = ansicolortags._style_of(ansicolortags._sgr_effect(ansicolortags._sgrDefaultState, '\033[1m\033[2m')[0])
+    assert style.bold and style.faint
+    assert ansicolortags.sprint('<b><B>x</B>y</b>z') == '\033[1m\033[2mx\033[0;1my\033[0mz'
+
+
+def test_optimizer_is_used_by_sprint():
+    ansicolortags.enable_optimizer()
+    assert ansicolortags.sprint('<reset><red><red>x<b>y') == '\033[0;1;31mxy'
+    assert ansicolortags.optimizer_info().calls == 1
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+""" The render engine against the functions it replaced: sprint, erase, printc and writec must give byte-identical outputs."""
+
+import io
+import random
+import re
+
+import pytest
+
+import ansicolortags
+
+
+#: The names of the tags of the first version of the module (the registry has the same ones).
+ORIGINAL_NAMES = ['black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan', 'white', 'Bblack', 'Bred', 'Bgreen', 'Byellow', 'Bblue', 'Bmagenta', 'Bcyan', 'Bwhite', 'Black', 'Red', 'Green', 'Yellow', 'Blue', 'Magenta', 'Cyan', 'White', 'blink', 'Blink', 'nocolors', 'default', 'Default', 'italic', 'Italic', 'b', 'B', 'u', 'U', 'neg', 'Neg', 'clear', 'el', 'reset', 'bell', 'title', 'warning', 'question', 'ERROR', 'WARNING', 'INFO']
+
+#: Pairs of delimiters, the default ones and custom ones (longer, or sharing characters with the text).
+DELIMITERS = [('<', '>'), ('[[', ']]'), ('{', '}'), ('<span color=', '</span>'), ('%', '%')]
+
+
+# %% The reference functions, as they were before the render engine
+
+def _reference_pattern(left, right):
+    names = '|'.join(re.escape(name) for name in sorted(ORIGINAL_NAMES, key=lambda name: (-len(name), name)))
+    return re.compile('%s(%s)%s' % (re.escape(left), names, re.escape(right)))
+
+
+def reference_sprint(chainWithTags, left='<', right='>'):
+    parts = _reference_pattern(left, right).split(chainWithTags)
+    parts[1::2] = [getattr(ansicolortags, name) for name in parts[1::2]]
+    return ''.join(parts)
+
+
+def reference_erase(chainWithTags, left='<', right='>'):
+    return _reference_pattern(left, right).sub('', chainWithTags)
+
+
+def reference_printc(chainWithTags, *objects, **kwargs):
+    left = kwargs.pop('left', '<')
+    right = kwargs.pop('right', '>')
+    sep = kwargs.pop('sep', ' ')
+    end = kwargs.pop('end', '\n')
+    render = reference_erase if kwargs.pop('erase', False) else reference_sprint
+    # Only change: with only one argument, erase=True erases the tags too (it used sprint)
+    print(*(render(s, left, right) if isinstance(s, str) else s for s in (chainWithTags,) + objects), sep=sep, end=end, **kwargs)
+
+
+def reference_writec(chainWithTags, out, left='<', right='>', flush=True):
+    out.write(reference_sprint(chainWithTags, left, right))
+    if flush:
+        out.flush()
+
+
+# %% Inputs
+
+def random_strings(left, right, number=1500, seed=42):
+    """ Random strings mixing known tags, unknown tags, lonely delimiters, and plain text."""
+    generator = random.Random(seed)
+    words = ['', ' ', 'x', 'OK', 'this', 'angry', 'é', '\n', '<', '>', '[', ']', '{', '}', '%', left, right, left + right,
+             left + 'this' + right, left + 'Red' + left, right + 'red' + right, left + left + 'b' + right + right]
+    words += [left + name + right for name in ORIGINAL_NAMES]
+    words += [left + name[:-1] for name in ('reset', 'blue', 'ERROR')] + [name + right for name in ('reset', 'u', 'INFO')]
+    return [''.join(generator.choice(words) for _ in range(generator.randint(0, 12))) for _ in range(number)]
+
+
+MATRIX = [(left, right, text) for left, right in DELIMITERS for text in random_strings(left, right)]
+
+
+@pytest.fixture(params=[False, True], ids=['no-cache', 'cache'])
+def cache(request):
+    if request.param:
+        ansicolortags.enable_cache(maxsize=64)
+    yield request.param
+
+
+# %% Tests
+
+def test_sprint_erase_matrix(cache):
+    for left, right, text in MATRIX:
+        assert ansicolortags.sprint(text, left, right) == reference_sprint(text, left, right), (left, right, text)
+        assert ansicolortags.erase(text, left, right) == reference_erase(text, left, right), (left, right, text)
+
+
+@pytest.mark.parametrize('erase', [False, True])
+def test_printc_matrix(cache, erase):
+    generator = random.Random(erase)
+    for index in range(0, len(MATRIX) - 3, 3):
+        (left, right, text), (_, _, second), (_, _, third) = MATRIX[index:index + 3]
+        objects = [(), (second, ), (17, second, 1 + 5j, third, None)][index % 3]
+        sep = generator.choice([' ', '', left, ', '])
+        end = generator.choice(['\n', '', right])
+        expected, output = io.StringIO(), io.StringIO()
+        reference_printc(text, *objects, left=left, right=right, sep=sep, end=end, erase=erase, file=expected)
+        ansicolortags.printc(text, *objects, left=left, right=right, sep=sep, end=end, erase=erase, file=output)
+        assert output.getvalue() == expected.getvalue(), (left, right, text, objects)
+
+
+def test_writec_matrix(cache):
+    for left, right, text in MATRIX:
+        expected, output = io.StringIO(), io.StringIO()
+        reference_writec(text, expected, left, right)
+        ansicolortags.writec(text, out=output, left=left, right=right)
+        assert output.getvalue() == expected.getvalue(), (left, right, text)
+
+
+@pytest.mark.parametrize('text', ['<', '>', '<<', '>>', '><', '<red', 'red>', '<red>>', '<<red>', '< red>', '<Red >', 'a < b > c', '<this>', '<<this>>'])
+def test_lonely_delimiters_are_kept(text):
+    assert ansicolortags.sprint(text) == reference_sprint(text)
+    assert ansicolortags.erase(text) == reference_erase(text)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+""" Texts rendered by pieces: iter_sprint, ColorizingWriter, render_parallel, sprint_file and the command line filter must give the same output as sprint."""
+
+import io
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+import ansicolortags
+
+
+#: A text with tags closed far after they are opened, many lines after.
+TEXT = ''.join("<b>line %d\n" % i if i % 7 == 0 else "line %d</b> plain <red>x <u>y</u> <fg:208>z</fg:208></red>\n" % i if i % 7 == 3 else "line %d <green>OK<reset>\n" % i
+               for i in range(2000))
+
+
+def random_chunks(text, seed=0, maxsize=40):
+    generator = random.Random(seed)
+    chunks, position = [], 0
+    while position < len(text):
+        size = generator.randint(1, maxsize)
+        chunks.append(text[position:position + size])
+        position += size
+    return chunks
+
+
+@pytest.fixture
+def depth(monkeypatch):
+    monkeypatch.setattr(ansicolortags, 'ColorDepth', 256)
+
+
+def test_colorizing_writer_closes_tags_of_previous_chunks():
+    out = io.StringIO()
+    with ansicolortags.ColorizingWriter(out) as writer:
+        writer.write("<b>line1\n")
+        writer.write("line2</b> plain\n")
+    assert out.getvalue() == ansicolortags.sprint("<b>line1\nline2</b> plain\n") == "\033[1mline1\nline2\033[0m plain\n"
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_iter_sprint_is_sprint(depth, seed):
+    chunks = random_chunks(TEXT, seed)
+    assert ''.join(ansicolortags.iter_sprint(chunks)) == ansicolortags.sprint(TEXT)
+    assert ''.join(ansicolortags.iter_sprint(chunks, erase=True)) == ansicolortags.erase(TEXT)
+    assert ''.join(ansicolortags.iter_sprint(chunks, backend=ansicolortags.ANSIBackend())) == ansicolortags.sprint(TEXT, backend=ansicolortags.ANSIBackend())
+
+
+def test_stream_renderer_can_be_used_again():
+    renderer = ansicolortags._StreamRenderer()
+    first = renderer.feed("<red>a") + renderer.finish()
+    assert renderer.feed("b</red>") + renderer.finish() == "b"
+    assert first == ansicolortags.red + "a"
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_render_parallel_closes_tags_of_previous_blocks(jobs):
+    text = "<red>" + "x" * 300000 + "</red>tail"
+    output = ansicolortags.render_parallel(text, jobs=jobs, blocksize=1 << 16)
+    assert output == ansicolortags.sprint(text)
+    assert output.endswith("x\033[0mtail")
+
+
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_render_parallel_is_sprint(depth, jobs):
+    text = TEXT * 5
+    assert ansicolortags.render_parallel(text, jobs=jobs, blocksize=1 << 12) == ansicolortags.sprint(text)
+    assert ansicolortags.render_parallel(text, jobs=jobs, blocksize=1 << 12, erase=True) == ansicolortags.erase(text)
+
+
+@pytest.fixture
+def logFile(tmp_path):
+    path = tmp_path / 'log.txt'
+    # Longer than the blocks of the command line filter (1 MB, and 4 MB with --jobs)
+    path.write_bytes(("<red>" + "x" * (5 << 20) + "</red>tail\n" + TEXT).encode('utf-8'))
+    return str(path)
+
+
+def test_sprint_file_closes_tags_of_previous_pieces(depth, logFile):
+    out = io.BytesIO()
+    ansicolortags.sprint_file(logFile, out, blocksize=1 << 16)
+    with io.open(logFile, encoding='utf-8') as inputFile:
+        assert out.getvalue() == ansicolortags.sprint(inputFile.read()).encode('utf-8')
+
+
+@pytest.mark.parametrize('options', [[], ['--mmap'], ['--jobs', '2']])
+def test_filter_closes_tags_of_previous_blocks(logFile, options):
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, COLORTERM='', TERM='xterm-256color')
+    output = subprocess.check_output([sys.executable, os.path.join(directory, 'ansicolortags.py'), '--render', '--ANSI'] + options + [logFile], env=env)
+    ansicolortags.ColorDepth = 256
+    try:
+        with io.open(logFile, encoding='utf-8') as inputFile:
+            assert output == ansicolortags.sprint(inputFile.read()).encode('utf-8')
+    finally:
+        ansicolortags.ColorDepth = None
+
+
+@pytest.mark.parametrize('left, right', [(b'[[', b']]'), ('[[', b']]'), ('«', '»'.encode('utf-8'))])
+def test_sprint_file_with_bytes_delimiters(tmp_path, left, right):
+    textLeft, textRight = [delimiter.decode('utf-8') if isinstance(delimiter, bytes) else delimiter for delimiter in (left, right)]
+    text = ''.join("%sred%sline %d%s/red%s é\n" % (textLeft, textRight, i, textLeft, textRight) for i in range(2000))
+    path = tmp_path / 'log.txt'
+    path.write_bytes(text.encode('utf-8'))
+    out, erased = io.BytesIO(), io.BytesIO()
+    ansicolortags.sprint_file(str(path), out, left=left, right=right, blocksize=1 << 10)
+    ansicolortags.erase_file(str(path), erased, left=left, right=right, blocksize=1 << 10)
+    assert out.getvalue() == ansicolortags.sprint(text, textLeft, textRight).encode('utf-8')
+    assert out.getvalue() == ansicolortags.sprint_bytes(text.encode('utf-8'), left, right)
+    assert erased.getvalue() == ansicolortags.erase(text, textLeft, textRight).encode('utf-8')
+
+
+@pytest.mark.parametrize('method', ['fork', 'spawn'])
+def test_render_parallel_with_optimizer(monkeypatch, depth, method):
+    import multiprocessing
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip("no %s start method" % method)
+    monkeypatch.setattr(multiprocessing, 'Pool', multiprocessing.get_context(method).Pool)
+    text = ''.join("<reset><red>%d <red><b>x</b> y <fg:208>z\n" % i for i in range(2000))
+    plain = ansicolortags.sprint(text)
+    ansicolortags.enable_optimizer()
+    serial = ansicolortags.render_parallel(text, jobs=1, blocksize=1 << 12)
+    calls = ansicolortags.optimizer_info().calls
+    assert ansicolortags.render_parallel(text, jobs=2, blocksize=1 << 12) == serial
+    # The blocks optimized by the workers are counted too
+    assert ansicolortags.optimizer_info().calls - calls == calls
+    # The blocks are optimized one by one, so the escapes around the cuts may be merged only by optimizing again
+    assert ansicolortags.optimize_escapes(serial) == ansicolortags.sprint(text)
+    assert len(serial) < len(plain)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+""" The templates parsed once: compile and ColorTemplate."""
+
+import io
+
+import pytest
+
+import ansicolortags
+
+
+TEMPLATE = "<green>OK<reset> %s in <blue>%d ms</blue> {} <fg:208>{name}</fg:208>"
+
+
+@pytest.fixture
+def depth(monkeypatch):
+    monkeypatch.setattr(ansicolortags, 'ColorDepth', 256)
+
+
+def test_render_and_plain(depth):
+    template = ansicolortags.compile(TEMPLATE)
+    assert isinstance(template, ansicolortags.ColorTemplate)
+    assert template.render() == ansicolortags.sprint(TEMPLATE)
+    assert template.plain() == ansicolortags.erase(TEMPLATE) == "OK %s in %d ms {} {name}"
+    assert repr(template) == "ColorTemplate(%r, left='<', right='>')" % TEMPLATE
+
+
+def test_custom_delimiters():
+    template = ansicolortags.compile("[[red]]x[[/red]] <red>", left='[[', right=']]')
+    assert template.render() == ansicolortags.sprint("[[red]]x[[/red]] <red>", '[[', ']]') == ansicolortags.red + "x\033[0m <red>"
+    assert template.plain() == "x <red>"
+
+
+def test_format_and_mod(depth):
+    template = ansicolortags.compile(TEMPLATE)
+    assert template % ('/index', 12) == ansicolortags.sprint(TEMPLATE) % ('/index', 12)
+    template = ansicolortags.compile("<green>{}<reset> in {:d} ms {name}")
+    # The arguments are not interpreted as tags
+    assert template.format('<red>', 12, name='x') == ansicolortags.green + "<red>" + ansicolortags.reset + " in 12 ms x"
+
+
+def test_colordict_changes_are_honored(monkeypatch):
+    template = ansicolortags.compile("<red>x<reset>")
+    monkeypatch.setitem(ansicolortags.colorDict, 'red', '[RED]')
+    assert template.render() == "[RED]x" + ansicolortags.reset
+    monkeypatch.setattr(ansicolortags, 'colorDict', dict(ansicolortags.colorDict, reset='[/]'))
+    assert template.render() == "[RED]x[/]"
+
+
+def test_ansi_supported_toggled_after_compile(monkeypatch):
+    template = ansicolortags.compile("<red>x<reset>")
+    assert template.render() == ansicolortags.red + "x" + ansicolortags.reset
+    monkeypatch.setattr(ansicolortags, 'ANSISupported', False)
+    assert template.render() == template % () == template.format() == "x"
+    monkeypatch.setattr(ansicolortags, 'ANSISupported', None)
+    monkeypatch.delenv('FORCE_COLOR', raising=False)
+    monkeypatch.delenv('NO_COLOR', raising=False)
+    assert template.render(out=io.StringIO()) == "x"  # Not a terminal
+    monkeypatch.setattr(ansicolortags, 'ANSISupported', True)
+    assert template.render(out=io.StringIO()) == ansicolortags.red + "x" + ansicolortags.reset
+
+
+def test_optimizer():
+    ansicolortags.enable_optimizer()
+    assert ansicolortags.compile("<reset><red><red>x<b>y").render() == ansicolortags.sprint("<reset><red><red>x<b>y") == "\033[0;1;31mxy"
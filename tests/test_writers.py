@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+""" The writers: ColorWriter, SharedColorWriter and AsyncColorWriter."""
+
+import io
+import threading
+
+import pytest
+
+import ansicolortags
+
+
+class FailingFile(io.StringIO):
+    """ A file failing to write, after ``failAfter`` calls to write."""
+
+    def __init__(self, failAfter=0):
+        io.StringIO.__init__(self)
+        self.failAfter = failAfter
+
+    def write(self, data):
+        if self.failAfter <= 0:
+            raise IOError("disk full")
+        self.failAfter -= 1
+        return io.StringIO.write(self, data)
+
+
+# %% SharedColorWriter
+
+def test_shared_writer_threads():
+    out = io.StringIO()
+    writer = ansicolortags.SharedColorWriter(out=out, erase=True)
+
+    def work(n):
+        for i in range(100):
+            writer.printc("<green>Thread", n, "<reset>line", i)
+    threads = [threading.Thread(target=work, args=(n, )) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 800
+    assert sorted(lines) == sorted("Thread %d line %d" % (n, i) for n in range(8) for i in range(100))
+
+
+def test_shared_writer_flush():
+    out = io.StringIO()
+    with ansicolortags.SharedColorWriter(out=out) as writer:
+        writer.write("<red>KO")
+        writer.flush()
+        assert out.getvalue() == ansicolortags.red + "KO" + ansicolortags.reset
+
+
+def test_shared_writer_flush_after_close():
+    writer = ansicolortags.SharedColorWriter(out=io.StringIO())
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.flush()
+    writer.close()  # Closing again does nothing
+
+
+def test_shared_writer_error_is_raised_again():
+    writer = ansicolortags.SharedColorWriter(out=FailingFile())
+    writer.write("<red>lost")
+    with pytest.raises(IOError, match="disk full"):
+        writer.flush()
+    assert not writer._thread.is_alive()
+    with pytest.raises(IOError, match="disk full"):
+        writer.close()
+
+
+def test_shared_writer_flush_when_thread_is_dead():
+    writer = ansicolortags.SharedColorWriter(out=FailingFile())
+    writer.write("lost")
+    writer._thread.join(5)
+    assert not writer._thread.is_alive()
+    writer._error = None
+    writer.flush()  # Nobody can write the records any more, but it does not block
+
+
+# %% AsyncColorWriter
+
+class SlowFile(io.StringIO):
+    """ A file whose writes wait for an event."""
+
+    def __init__(self):
+        io.StringIO.__init__(self)
+        self.writes = 0
+        self.go = threading.Event()
+
+    def write(self, data):
+        self.go.wait(5)
+        self.writes += 1
+        return io.StringIO.write(self, data)
+
+
+def run(coroutine):
+    import asyncio
+    return asyncio.run(coroutine)
+
+
+def test_async_writer_queue_is_bounded():
+    out = SlowFile()
+
+    async def main():
+        writer = ansicolortags.AsyncColorWriter(out=out, erase=True, maxsize=4)
+        awaitables = [writer.write("<red>%d\n" % i) for i in range(1000)]  # Never awaited before the end
+        assert writer._queued == 4
+        assert len(writer._pending) == 996
+        out.go.set()
+        await awaitables[-1]
+        await writer.close()
+    run(main())
+    assert out.getvalue() == ''.join("%d\n" % i for i in range(1000))
+    assert out.writes == 5
+
+
+def test_async_writer_error_is_raised_again():
+    import asyncio
+
+    async def main():
+        writer = ansicolortags.AsyncColorWriter(out=FailingFile(), erase=True)
+        await writer.write("lost")
+        await asyncio.sleep(0.1)  # The write failed in the background
+        with pytest.raises(IOError, match="disk full"):
+            writer.write("again")
+        writer.write("again")  # Raised only once
+        with pytest.raises(IOError, match="disk full"):
+            await writer.close()
+    run(main())
+
+
+def test_aprintc_default_writers():
+    import asyncio
+    import gc
+
+    async def main():
+        out = io.StringIO()
+        await ansicolortags.aprintc("<green>OK<reset>", 17, file=out, erase=True)
+        await ansicolortags.aprintc("<red>KO", file=out, erase=True)
+        loop = asyncio.get_running_loop()
+        weakWriters, writers = ansicolortags._asyncWriters[loop]
+        writer = weakWriters[out]
+        await writer.drain()
+        assert out.getvalue() == "OK 17\nKO\n"
+        del out, writer
+        gc.collect()
+        assert len(weakWriters) == 0 and len(writers) == 0
+    run(main())